@@ -4,7 +4,8 @@ from .models import (
     User, StudyGroup, Subject, TeachingAssignment, EvaluationType, 
     StudentPerformance, AbsenceReason, 
     TimeSlot, ScheduleTemplate, Lesson,
-    Classroom, GradingScale, GradeRule, BuildingAccessLog
+    Classroom, GradingScale, GradeRule, BuildingAccessLog,
+    StudentRiskScore, Holiday, TeacherUnavailability, ScheduleVersion, OutboxMessage
 )
 from .forms import UserAdminForm
 
@@ -96,7 +97,7 @@ class SubjectAdmin(admin.ModelAdmin):
             'fields': ('name', 'code', 'description')
         }),
         ('Навчальне навантаження', {
-            'fields': ('credits', 'semester', 'hours_total', 'hours_lectures', 'hours_practicals')
+            'fields': ('credits', 'semester', 'hours_total', 'hours_lectures', 'hours_practicals', 'required_classroom_type')
         }),
         ('Системна інформація', {
             'fields': ('is_active', 'created_at', 'updated_at'),
@@ -208,7 +209,7 @@ class TeachingAssignmentAdmin(admin.ModelAdmin):
             'fields': ('subject', 'teacher', 'group')
         }),
         ('Навчальний період', {
-            'fields': ('academic_year', 'semester', 'start_date', 'end_date')
+            'fields': ('academic_year', 'semester', 'start_date', 'end_date', 'weekly_lessons')
         }),
         ('Примітки', {
             'fields': ('notes',),
@@ -267,14 +268,28 @@ class TimeSlotAdmin(admin.ModelAdmin):
     
     readonly_fields = ('created_at', 'updated_at')
 
+@admin.register(Holiday)
+class HolidayAdmin(admin.ModelAdmin):
+    list_display = ('date', 'name')
+    search_fields = ('name',)
+    ordering = ('date',)
+    date_hierarchy = 'date'
+
+@admin.register(TeacherUnavailability)
+class TeacherUnavailabilityAdmin(admin.ModelAdmin):
+    list_display = ('teacher', 'day_of_week', 'lesson_number', 'reason')
+    list_filter = ('day_of_week', 'teacher')
+    search_fields = ('teacher__full_name', 'reason')
+    ordering = ('teacher', 'day_of_week', 'lesson_number')
+
 # ==========================================
 # 8. ШАБЛОНИ РОЗКЛАДУ
 # ==========================================
 
 @admin.register(ScheduleTemplate)
 class ScheduleTemplateAdmin(admin.ModelAdmin):
-    list_display = ('get_group', 'get_day', 'lesson_number', 'get_subject', 'get_teacher', 'start_time', 'classroom', 'is_active')
-    list_filter = ('is_active', 'group', 'day_of_week', 'subject', 'teacher', 'week_type')
+    list_display = ('get_group', 'get_day', 'lesson_number', 'get_subject', 'get_teacher', 'start_time', 'classroom', 'is_pinned', 'is_active')
+    list_filter = ('is_active', 'is_pinned', 'group', 'day_of_week', 'subject', 'teacher', 'week_type')
     search_fields = ('group__name', 'subject__name', 'teacher__full_name', 'notes')
     ordering = ('group', 'day_of_week', 'lesson_number')
     
@@ -286,7 +301,7 @@ class ScheduleTemplateAdmin(admin.ModelAdmin):
             'fields': ('subject', 'teacher', 'teaching_assignment')
         }),
         ('Розклад', {
-            'fields': ('start_time', 'duration_minutes', 'classroom', 'week_type')
+            'fields': ('start_time', 'duration_minutes', 'classroom', 'week_type', 'is_pinned')
         }),
         ('Дійсність', {
             'fields': ('valid_from', 'valid_to')
@@ -328,6 +343,44 @@ class ScheduleTemplateAdmin(admin.ModelAdmin):
             )
         super().save_model(request, obj, form, change)
 
+
+@admin.register(ScheduleVersion)
+class ScheduleVersionAdmin(admin.ModelAdmin):
+    """Історія розкладу лише для перегляду: версії створюються при збереженні шаблонів."""
+    list_display = ('group', 'valid_from', 'valid_to', 'get_slots', 'created_by', 'created_at')
+    list_filter = ('group',)
+    ordering = ('group', '-valid_from')
+    readonly_fields = ('group', 'valid_from', 'valid_to', 'slots', 'checksum', 'created_by', 'created_at')
+
+    def get_slots(self, obj):
+        return len(obj.slots)
+    get_slots.short_description = 'Пар'
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(OutboxMessage)
+class OutboxMessageAdmin(admin.ModelAdmin):
+    """Черга сповіщень і SMS: перегляд стану та повернення невдалих у чергу."""
+    list_display = ('id', 'kind', 'status', 'attempts', 'available_at', 'created_at', 'processed_at')
+    list_filter = ('status', 'kind')
+    ordering = ('-id',)
+    readonly_fields = ('kind', 'payload', 'status', 'attempts', 'available_at', 'last_error', 'created_at', 'processed_at')
+    actions = ['requeue_messages']
+
+    @admin.action(description='Повернути в чергу')
+    def requeue_messages(self, request, queryset):
+        from main.services.outbox_service import requeue
+        count = requeue(queryset.values_list('id', flat=True))
+        self.message_user(request, f"Повернуто в чергу: {count}")
+
+    def has_add_permission(self, request):
+        return False
+
 # ==========================================
 # 9. УРОКИ
 # ==========================================
@@ -342,7 +395,7 @@ class LessonAdmin(admin.ModelAdmin):
     
     fieldsets = (
         ('Основна інформація', {
-            'fields': ('group', 'subject', 'teacher', 'evaluation_type')
+            'fields': ('group', 'subject', 'teacher', 'replaced_teacher', 'evaluation_type')
         }),
         ('Розклад', {
             'fields': ('date', 'start_time', 'end_time', 'classroom')
@@ -472,5 +525,25 @@ class BuildingAccessLogAdmin(admin.ModelAdmin):
         return obj.student.full_name
     get_student.short_description = 'Студент'
 
+@admin.register(StudentRiskScore)
+class StudentRiskScoreAdmin(admin.ModelAdmin):
+    list_display = ('get_student', 'group', 'course', 'score', 'unexcused_absences',
+                    'grade_trend', 'missing_homework', 'weighted_grade', 'updated_at')
+    list_filter = ('course', 'group')
+    search_fields = ('student__full_name',)
+    ordering = ('-score',)
+    list_select_related = ('student', 'group')
+
+    # Таблиця підтримується risk_service — лише перегляд
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def get_student(self, obj):
+        return obj.student.full_name
+    get_student.short_description = 'Студент'
+
 # Реєструємо User окремо
 admin.site.register(User, UserAdmin)
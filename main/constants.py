@@ -63,7 +63,8 @@ class DayOfWeek(int, Enum):
         return names.get(day, '')
 
 
-# Стандартний розклад дзвінків
+# Стандартний розклад дзвінків (запасний, поки TimeSlot не налаштовано;
+# у коді використовуйте bell_schedule_service.get_bell_schedule())
 # Формат: номер_пари -> (час_початку, час_кінця)
 # 3 пари зранку (8:00-10:50), велика перерва, 3 пари після (12:00-14:50), +7-а за потреби
 DEFAULT_TIME_SLOTS = {
@@ -76,18 +77,6 @@ DEFAULT_TIME_SLOTS = {
     7: (time(15, 0), time(15, 50)),
 }
 
-# Альтернативний формат (для зворотної сумісності)
-# ПОПЕРЕДЖЕННЯ: Використовуйте DEFAULT_TIME_SLOTS для нових розробок
-DEFAULT_LESSON_TIMES = {
-    1: "08:00",
-    2: "09:00",
-    3: "10:00",
-    4: "12:00",
-    5: "13:00",
-    6: "14:00",
-    7: "15:00",
-}
-
 # Тривалість стандартної пари (хвилини)
 DEFAULT_LESSON_DURATION = 50
 
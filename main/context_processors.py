@@ -0,0 +1,14 @@
+"""
+Контекст-процесори шаблонів.
+"""
+from django.conf import settings
+
+
+def notifications(request):
+    """Чи підписуватись дзвіночку на потік SSE (лише під ASGI), чи опитувати."""
+    from main.services.notification_service import UNREAD_POLL_INTERVAL
+
+    return {
+        'NOTIFICATIONS_SSE': settings.NOTIFICATIONS_SSE,
+        'NOTIFICATIONS_POLL_MS': UNREAD_POLL_INTERVAL * 1000,
+    }
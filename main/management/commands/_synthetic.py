@@ -0,0 +1,220 @@
+"""
+Детермінований синтетичний набір даних для бенчмарків.
+
+Будує "великий" навчальний заклад (десятки груп, тисячі студентів,
+семестр занять з оцінками та пропусками) через bulk_create.
+Модуль починається з "_", тому Django не реєструє його як команду.
+
+Використовується бенчмарк-командами всередині тестової БД — ніколи
+не запускайте build_synthetic_dataset() на робочій базі.
+"""
+import random
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+
+from django.contrib.auth.hashers import make_password
+from django.utils import timezone
+
+from main.constants import DEFAULT_TIME_SLOTS
+from main.models import (
+    AbsenceReason,
+    Classroom,
+    EvaluationType,
+    Lesson,
+    ScheduleTemplate,
+    StudentPerformance,
+    StudyGroup,
+    Subject,
+    TeachingAssignment,
+    TimeSlot,
+    User,
+)
+
+BATCH_SIZE = 5000
+
+
+@dataclass
+class SyntheticConfig:
+    groups: int = 40
+    students: int = 10_000
+    teachers: int = 60
+    subjects: int = 12
+    subjects_per_group: int = 6
+    classrooms: int = 45
+    weeks: int = 16
+    lessons_per_week: int = 10
+    grade_density: float = 0.25
+    absence_rate: float = 0.12
+    seed: int = 2024
+
+
+def _flush(model, objects: list) -> None:
+    if objects:
+        model.objects.bulk_create(objects, batch_size=BATCH_SIZE)
+        objects.clear()
+
+
+def build_synthetic_dataset(config: SyntheticConfig) -> dict:
+    """
+    Побудова набору даних. Повертає словник з кількістю створених записів.
+
+    Семестр закінчується поточним тижнем, тому тижневі звіти теж
+    отримують дані. Усі випадкові величини беруться з random.Random(seed),
+    отже два запуски з однаковим конфігом дають ідентичні таблиці.
+    """
+    rng = random.Random(config.seed)
+    password = make_password('benchmark')
+
+    # 1. Довідники
+    for num, (start, end) in DEFAULT_TIME_SLOTS.items():
+        TimeSlot.objects.get_or_create(
+            lesson_number=num, defaults={'start_time': start, 'end_time': end}
+        )
+    reasons = [
+        AbsenceReason.objects.get_or_create(code='Н', defaults={'description': 'Неповажна', 'is_respectful': False})[0],
+        AbsenceReason.objects.get_or_create(code='Б', defaults={'description': 'Хвороба', 'is_respectful': True})[0],
+        AbsenceReason.objects.get_or_create(code='ПП', defaults={'description': 'Поважна', 'is_respectful': True})[0],
+    ]
+
+    Subject.objects.bulk_create([
+        Subject(name=f"BENCH Предмет {i:02d}") for i in range(config.subjects)
+    ])
+    subject_ids = list(Subject.objects.filter(name__startswith='BENCH ').order_by('id').values_list('id', flat=True))
+
+    StudyGroup.objects.bulk_create([
+        StudyGroup(name=f"BENCH-{i:03d}", course=1 + i % 4, specialty=f"Спеціальність {i % 5}")
+        for i in range(config.groups)
+    ])
+    group_ids = list(StudyGroup.objects.filter(name__startswith='BENCH-').order_by('id').values_list('id', flat=True))
+
+    Classroom.objects.bulk_create([
+        Classroom(
+            name=f"BENCH-{i:03d}",
+            building=f"Корпус {1 + i % 3}",
+            floor=1 + i % 4,
+            capacity=rng.choice([20, 30, 60, 120]),
+            type=rng.choice(['lecture', 'computer', 'lab', 'other']),
+        )
+        for i in range(config.classrooms)
+    ])
+    classroom_ids = list(Classroom.objects.filter(name__startswith='BENCH-').order_by('id').values_list('id', flat=True))
+
+    # 2. Користувачі
+    User.objects.bulk_create([
+        User(email=f"bench.teacher{i}@example.com", full_name=f"Викладач {i:03d}",
+             role='teacher', password=password)
+        for i in range(config.teachers)
+    ], batch_size=BATCH_SIZE)
+    teacher_ids = list(
+        User.objects.filter(email__startswith='bench.teacher').order_by('id').values_list('id', flat=True)
+    )
+
+    User.objects.bulk_create([
+        User(email=f"bench.student{i}@example.com", full_name=f"Студент {i:05d}",
+             role='student', password=password, group_id=group_ids[i % len(group_ids)])
+        for i in range(config.students)
+    ], batch_size=BATCH_SIZE)
+    students_by_group: dict[int, list[int]] = {gid: [] for gid in group_ids}
+    for sid, gid in User.objects.filter(email__startswith='bench.student').values_list('id', 'group_id'):
+        students_by_group[gid].append(sid)
+
+    # 3. Навантаження та типи оцінювання
+    assignments = []
+    for gid in group_ids:
+        for sub_id in rng.sample(subject_ids, min(config.subjects_per_group, len(subject_ids))):
+            assignments.append(TeachingAssignment(
+                group_id=gid, subject_id=sub_id, teacher_id=rng.choice(teacher_ids),
+            ))
+    TeachingAssignment.objects.bulk_create(assignments, batch_size=BATCH_SIZE)
+    assignment_rows = list(
+        TeachingAssignment.objects.filter(group_id__in=group_ids)
+        .order_by('id').values_list('id', 'group_id', 'subject_id', 'teacher_id')
+    )
+
+    EvaluationType.objects.bulk_create([
+        EvaluationType(assignment_id=aid, name=name, weight_percent=weight, is_homework_type=is_hw)
+        for aid, _, _, _ in assignment_rows
+        for name, weight, is_hw in (('Практика', 50, False), ('Екзамен', 20, False), ('Домашнє Завдання', 30, True))
+    ], batch_size=BATCH_SIZE)
+    eval_types: dict[int, list[int]] = {}
+    for etid, aid in (
+        EvaluationType.objects.filter(assignment__group_id__in=group_ids, is_homework_type=False)
+        .order_by('id').values_list('id', 'assignment_id')
+    ):
+        eval_types.setdefault(aid, []).append(etid)
+
+    by_group: dict[int, list[tuple]] = {}
+    for row in assignment_rows:
+        by_group.setdefault(row[1], []).append(row)
+
+    # 4. Тижневий шаблон розкладу
+    slot_numbers = sorted(DEFAULT_TIME_SLOTS)
+    weekly_slots = [
+        (1 + k % 5, slot_numbers[(k // 5) % len(slot_numbers)])
+        for k in range(min(config.lessons_per_week, 5 * len(slot_numbers)))
+    ]
+    templates = []
+    for gid in group_ids:
+        group_assignments = by_group[gid]
+        for k, (day, num) in enumerate(weekly_slots):
+            aid, _, sub_id, teacher_id = group_assignments[k % len(group_assignments)]
+            templates.append(ScheduleTemplate(
+                teaching_assignment_id=aid, group_id=gid, subject_id=sub_id, teacher_id=teacher_id,
+                day_of_week=day, lesson_number=num, start_time=DEFAULT_TIME_SLOTS[num][0],
+                duration_minutes=50, classroom_id=rng.choice(classroom_ids),
+            ))
+    ScheduleTemplate.objects.bulk_create(templates, batch_size=BATCH_SIZE)
+
+    # 5. Семестр занять
+    today = date.today()
+    first_monday = today - timedelta(days=today.weekday()) - timedelta(weeks=config.weeks - 1)
+    lessons = []
+    for t in templates:
+        for week in range(config.weeks):
+            lesson_date = first_monday + timedelta(weeks=week, days=t.day_of_week - 1)
+            start, end = DEFAULT_TIME_SLOTS[t.lesson_number]
+            lessons.append(Lesson(
+                group_id=t.group_id, subject_id=t.subject_id, teacher_id=t.teacher_id,
+                date=lesson_date, start_time=start, end_time=end, classroom_id=t.classroom_id,
+                evaluation_type_id=rng.choice(eval_types[t.teaching_assignment_id]),
+            ))
+        if len(lessons) >= BATCH_SIZE:
+            _flush(Lesson, lessons)
+    _flush(Lesson, lessons)
+
+    # 6. Оцінки та пропуски (лише минулі заняття)
+    performances = []
+    performance_count = 0
+    lesson_rows = (
+        Lesson.objects.filter(group_id__in=group_ids, date__lte=today)
+        .order_by('id').values_list('id', 'group_id', 'teacher_id', 'date', 'start_time')
+    )
+    for lesson_id, gid, teacher_id, lesson_date, start in lesson_rows.iterator(chunk_size=BATCH_SIZE):
+        graded_at = timezone.make_aware(datetime.combine(lesson_date, start))
+        for sid in students_by_group[gid]:
+            if rng.random() >= config.grade_density:
+                continue
+            if rng.random() < config.absence_rate:
+                performances.append(StudentPerformance(
+                    lesson_id=lesson_id, student_id=sid, absence=rng.choice(reasons),
+                ))
+            else:
+                performances.append(StudentPerformance(
+                    lesson_id=lesson_id, student_id=sid, earned_points=rng.randint(1, 12),
+                    graded_by_id=teacher_id, graded_at=graded_at,
+                ))
+            if len(performances) >= BATCH_SIZE:
+                performance_count += len(performances)
+                _flush(StudentPerformance, performances)
+    performance_count += len(performances)
+    _flush(StudentPerformance, performances)
+
+    return {
+        'groups': len(group_ids),
+        'students': config.students,
+        'teachers': len(teacher_ids),
+        'assignments': len(assignment_rows),
+        'schedule_templates': len(templates),
+        'lessons': Lesson.objects.filter(group_id__in=group_ids).count(),
+        'performances': performance_count,
+    }
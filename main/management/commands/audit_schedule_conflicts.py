@@ -0,0 +1,53 @@
+"""
+Management command: audit_schedule_conflicts
+Глобальна перевірка шаблонів розкладу: перетини груп, викладачів та
+аудиторій одним проходом sweep line (спільні пари не вважаються конфліктом).
+
+Результат — JSON (у stdout або у файл). З --fail-on-conflicts команда
+завершується з помилкою, якщо конфлікти знайдено (зручно для cron/CI).
+
+Приклади:
+    python manage.py audit_schedule_conflicts
+    python manage.py audit_schedule_conflicts --kind teacher --kind classroom --output conflicts.json
+    python manage.py audit_schedule_conflicts --fail-on-conflicts
+"""
+import json
+from datetime import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+
+from main.services.schedule_audit import audit_schedule
+from main.services.schedule_index import RESOURCE_KINDS
+
+
+class Command(BaseCommand):
+    help = 'Пошук конфліктів у шаблонах розкладу (групи, викладачі, аудиторії) з виводом у JSON'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--kind', action='append', choices=RESOURCE_KINDS,
+                            help='Вид ресурсу (можна кілька разів; за замовчуванням — усі)')
+        parser.add_argument('--include-inactive', action='store_true', help='Перевіряти й неактивні шаблони')
+        parser.add_argument('--output', '-o', help='Файл для JSON (за замовчуванням — stdout)')
+        parser.add_argument('--fail-on-conflicts', action='store_true',
+                            help='Завершитись з помилкою, якщо є конфлікти')
+
+    def handle(self, *args, **options):
+        report = audit_schedule(
+            kinds=options['kind'] or RESOURCE_KINDS,
+            active_only=not options['include_inactive'],
+        )
+        payload = {'generated_at': datetime.now().isoformat(timespec='seconds'), **report}
+
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as fh:
+                json.dump(payload, fh, ensure_ascii=False, indent=2)
+            summary = ', '.join(f"{kind}: {count}" for kind, count in report['by_kind'].items())
+            self.stdout.write(
+                f"Перевірено {report['templates']} шаблонів, конфліктів {len(report['conflicts'])} ({summary}). "
+                f"Результати збережено у {options['output']}"
+            )
+        else:
+            self.stdout.write(json.dumps(payload, ensure_ascii=False, indent=2))
+
+        if options['fail_on_conflicts'] and report['conflicts']:
+            raise CommandError(f"Знайдено конфліктів у розкладі: {len(report['conflicts'])}")
@@ -0,0 +1,186 @@
+"""
+Management command: benchmark_reports
+Регресійний бенчмарк адмін-звітів на синтетичному наборі даних.
+
+Команда створює окрему тестову БД (як `manage.py test`), наповнює її
+детермінованим "великим" закладом, заміряє час та кількість SQL-запитів
+кожного звіту і записує результати в JSON. Якщо передано --baseline,
+результати порівнюються з попереднім запуском, і команда завершується
+з помилкою при регресії.
+
+Приклади:
+    python manage.py benchmark_reports --output bench.json
+    python manage.py benchmark_reports --students 2000 --groups 10 --baseline bench.json
+"""
+import json
+import platform
+import statistics
+import time
+from dataclasses import asdict
+from datetime import datetime
+from urllib.parse import urlencode
+
+import django
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, setup_test_environment, teardown_test_environment
+from django.urls import reverse
+
+from main.models import StudyGroup, User
+
+from ._synthetic import SyntheticConfig, build_synthetic_dataset
+
+# (назва, url name, GET-параметри)
+BENCHMARK_CASES = [
+    ('report_absences', 'report_absences', {}),
+    ('report_absences_group', 'report_absences', {'group': '{group_id}'}),
+    ('report_absences_csv', 'report_absences', {'export': 'csv'}),
+    ('report_rating', 'report_rating', {}),
+    ('report_rating_group', 'report_rating', {'group': '{group_id}'}),
+    ('report_rating_csv', 'report_rating', {'export': 'csv'}),
+    ('report_weekly_absences', 'report_weekly_absences', {}),
+]
+
+# Абсолютні "запобіжники", які діють навіть без baseline-файлу
+DEFAULT_MAX_MS = 30_000
+
+
+class Command(BaseCommand):
+    help = 'Бенчмарк звітів (час + кількість запитів) на синтетичному наборі даних'
+
+    def add_arguments(self, parser):
+        defaults = SyntheticConfig()
+        parser.add_argument('--output', '-o', default='bench_reports.json', help='Файл для результатів (JSON)')
+        parser.add_argument('--baseline', help='Попередній файл результатів для порівняння')
+        parser.add_argument('--time-tolerance', type=float, default=0.25,
+                            help='Допустиме сповільнення відносно baseline (0.25 = +25%%)')
+        parser.add_argument('--max-ms', type=float, default=DEFAULT_MAX_MS,
+                            help='Абсолютний ліміт медіанного часу одного звіту')
+        parser.add_argument('--repeat', type=int, default=3)
+        parser.add_argument('--students', type=int, default=defaults.students)
+        parser.add_argument('--groups', type=int, default=defaults.groups)
+        parser.add_argument('--weeks', type=int, default=defaults.weeks)
+        parser.add_argument('--lessons-per-week', type=int, default=defaults.lessons_per_week)
+        parser.add_argument('--grade-density', type=float, default=defaults.grade_density)
+        parser.add_argument('--seed', type=int, default=defaults.seed)
+        parser.add_argument('--keepdb', action='store_true', help='Не видаляти тестову БД після запуску')
+
+    def handle(self, *args, **options):
+        config = SyntheticConfig(
+            students=options['students'],
+            groups=options['groups'],
+            weeks=options['weeks'],
+            lessons_per_week=options['lessons_per_week'],
+            grade_density=options['grade_density'],
+            seed=options['seed'],
+        )
+
+        baseline = None
+        if options['baseline']:
+            try:
+                with open(options['baseline'], encoding='utf-8') as fh:
+                    baseline = {r['name']: r for r in json.load(fh)['results']}
+            except (OSError, ValueError, KeyError) as e:
+                raise CommandError(f"Не вдалося прочитати baseline: {e}")
+
+        setup_test_environment()
+        old_name = connection.settings_dict['NAME']
+        connection.creation.create_test_db(verbosity=0, autoclobber=True, keepdb=options['keepdb'])
+        try:
+            self.stdout.write('Генерація синтетичного набору даних...')
+            started = time.perf_counter()
+            dataset = build_synthetic_dataset(config)
+            self.stdout.write(
+                f"  {dataset['students']} студентів, {dataset['groups']} груп, "
+                f"{dataset['lessons']} занять, {dataset['performances']} оцінок "
+                f"({time.perf_counter() - started:.1f} с)"
+            )
+            results = self._run_cases(options['repeat'])
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0, keepdb=options['keepdb'])
+            teardown_test_environment()
+
+        failures = self._check(results, baseline, options['time_tolerance'], options['max_ms'])
+
+        payload = {
+            'generated_at': datetime.now().isoformat(timespec='seconds'),
+            'django': django.get_version(),
+            'python': platform.python_version(),
+            'database': connection.vendor,
+            'config': asdict(config),
+            'dataset': dataset,
+            'results': results,
+            'failures': failures,
+        }
+        with open(options['output'], 'w', encoding='utf-8') as fh:
+            json.dump(payload, fh, ensure_ascii=False, indent=2)
+
+        for r in results:
+            self.stdout.write(f"  {r['name']:<28} {r['median_ms']:>9.1f} ms  {r['queries']:>6} запитів")
+        self.stdout.write(f"Результати збережено у {options['output']}")
+
+        if failures:
+            for failure in failures:
+                self.stderr.write(self.style.ERROR(f"  ✗ {failure}"))
+            raise CommandError(f"Виявлено регресію продуктивності ({len(failures)})")
+
+        self.stdout.write(self.style.SUCCESS('Регресій не виявлено'))
+
+    def _run_cases(self, repeat: int) -> list[dict]:
+        admin = User.objects.create_user(
+            email='bench.admin@example.com', password='benchmark', full_name='Benchmark Admin', role='admin'
+        )
+        client = Client()
+        client.force_login(admin)
+        group_id = StudyGroup.objects.order_by('id').values_list('id', flat=True).first()
+
+        results = []
+        for name, url_name, params in BENCHMARK_CASES:
+            query = {k: v.format(group_id=group_id) for k, v in params.items()}
+            url = reverse(url_name) + (f"?{urlencode(query)}" if query else '')
+
+            client.get(url)  # прогрів (шаблони, кеші)
+            timings = []
+            queries = 0
+            for _ in range(max(repeat, 1)):
+                with CaptureQueriesContext(connection) as ctx:
+                    started = time.perf_counter()
+                    response = client.get(url)
+                    if response.streaming:
+                        b''.join(response.streaming_content)
+                    timings.append((time.perf_counter() - started) * 1000)
+                queries = len(ctx.captured_queries)
+
+            if response.status_code != 200:
+                raise CommandError(f"{name}: HTTP {response.status_code} для {url}")
+
+            results.append({
+                'name': name,
+                'url': url,
+                'median_ms': round(statistics.median(timings), 2),
+                'min_ms': round(min(timings), 2),
+                'max_ms': round(max(timings), 2),
+                'queries': queries,
+            })
+        return results
+
+    @staticmethod
+    def _check(results: list[dict], baseline, tolerance: float, max_ms: float) -> list[str]:
+        failures = []
+        for r in results:
+            if r['median_ms'] > max_ms:
+                failures.append(f"{r['name']}: {r['median_ms']} ms > ліміт {max_ms} ms")
+
+            previous = baseline.get(r['name']) if baseline else None
+            if not previous:
+                continue
+            if r['queries'] > previous['queries']:
+                failures.append(f"{r['name']}: запитів {r['queries']} > baseline {previous['queries']}")
+            allowed_ms = previous['median_ms'] * (1 + tolerance)
+            if r['median_ms'] > allowed_ms:
+                failures.append(
+                    f"{r['name']}: {r['median_ms']} ms > baseline {previous['median_ms']} ms "
+                    f"(+{tolerance:.0%})"
+                )
+        return failures
@@ -0,0 +1,209 @@
+"""
+Management command: benchmark_timetable
+Бенчмарк генератора розкладу на синтетичному закладі (за замовчуванням 40 груп).
+
+Як і benchmark_reports, команда працює в окремій тестовій БД. До
+синтетичного набору додаються тижневі потреби навантажень, вимоги до
+типу аудиторії та недоступність частини викладачів, після чого
+заміряються три сценарії:
+- full: розклад усіх груп з нуля;
+- pinned: повторна генерація, коли частина слотів закріплена;
+- single_group: перегенерація однієї групи при зафіксованих інших.
+
+Команда завершується з помилкою, якщо лишились нерозміщені пари, є
+жорсткі конфлікти або перевищено ліміт часу.
+
+Приклади:
+    python manage.py benchmark_timetable --output bench_timetable.json
+    python manage.py benchmark_timetable --groups 20 --time-budget 5
+"""
+import json
+import platform
+import random
+import time
+from dataclasses import asdict
+from datetime import datetime
+
+import django
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import CaptureQueriesContext, setup_test_environment, teardown_test_environment
+
+from main.models import ScheduleTemplate, StudyGroup, Subject, TeacherUnavailability, TeachingAssignment
+from main.services.timetable_solver import apply_timetable, find_hard_conflicts, generate_timetable
+
+from ._synthetic import SyntheticConfig, build_synthetic_dataset
+
+# Предмети з вимогою до типу аудиторії: кожен 4-й — комп'ютерний, наступний — лабораторний
+ROOM_TYPE_BY_SUBJECT_MOD = {1: 'computer', 2: 'lab'}
+
+
+class Command(BaseCommand):
+    help = 'Бенчмарк генератора розкладу на синтетичному закладі'
+
+    def add_arguments(self, parser):
+        defaults = SyntheticConfig()
+        parser.add_argument('--output', '-o', default='bench_timetable.json', help='Файл для результатів (JSON)')
+        parser.add_argument('--groups', type=int, default=defaults.groups)
+        parser.add_argument('--students', type=int, default=1000, help='Студентів у закладі (визначає розмір груп)')
+        parser.add_argument('--teachers', type=int, default=defaults.teachers)
+        parser.add_argument('--classrooms', type=int, default=defaults.classrooms)
+        parser.add_argument('--lessons-per-week', type=int, default=20, help='Тижнева потреба групи (пар)')
+        parser.add_argument('--unavailable-share', type=float, default=0.1,
+                            help='Частка викладачів з одним недоступним днем')
+        parser.add_argument('--pinned-share', type=float, default=0.1,
+                            help='Частка слотів, закріплених у сценарії pinned')
+        parser.add_argument('--time-budget', type=float, default=10.0, help='Бюджет пошуку на сценарій, с')
+        parser.add_argument('--max-ms', type=float, default=None,
+                            help='Ліміт часу сценарію (за замовчуванням бюджет + 50%%)')
+        parser.add_argument('--seed', type=int, default=defaults.seed)
+        parser.add_argument('--keepdb', action='store_true', help='Не видаляти тестову БД після запуску')
+
+    def handle(self, *args, **options):
+        config = SyntheticConfig(
+            groups=options['groups'],
+            students=options['students'],
+            teachers=options['teachers'],
+            classrooms=options['classrooms'],
+            weeks=1,
+            grade_density=0,
+            seed=options['seed'],
+        )
+        max_ms = options['max_ms'] or options['time_budget'] * 1500
+
+        setup_test_environment()
+        old_name = connection.settings_dict['NAME']
+        connection.creation.create_test_db(verbosity=0, autoclobber=True, keepdb=options['keepdb'])
+        try:
+            self.stdout.write('Генерація синтетичного набору даних...')
+            dataset = build_synthetic_dataset(config)
+            dataset.update(self._prepare_demand(config, options))
+            self.stdout.write(
+                f"  {dataset['groups']} груп, {dataset['assignments']} навантажень, "
+                f"{dataset['weekly_lessons']} пар на тиждень"
+            )
+            results = self._run_scenarios(options)
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0, keepdb=options['keepdb'])
+            teardown_test_environment()
+
+        failures = []
+        for r in results:
+            if r['unplaced']:
+                failures.append(f"{r['name']}: не розміщено {r['unplaced']} пар")
+            if r['hard_conflicts']:
+                failures.append(f"{r['name']}: жорстких конфліктів {r['hard_conflicts']}")
+            if r['elapsed_ms'] > max_ms:
+                failures.append(f"{r['name']}: {r['elapsed_ms']} ms > ліміт {max_ms} ms")
+
+        payload = {
+            'generated_at': datetime.now().isoformat(timespec='seconds'),
+            'django': django.get_version(),
+            'python': platform.python_version(),
+            'database': connection.vendor,
+            'config': asdict(config),
+            'dataset': dataset,
+            'time_budget': options['time_budget'],
+            'results': results,
+            'failures': failures,
+        }
+        with open(options['output'], 'w', encoding='utf-8') as fh:
+            json.dump(payload, fh, ensure_ascii=False, indent=2)
+
+        for r in results:
+            self.stdout.write(
+                f"  {r['name']:<14} {r['elapsed_ms']:>9.1f} ms  {r['placed']:>5}/{r['events']} пар  "
+                f"штраф {r['cost']:>5}  {r['queries']:>4} запитів"
+            )
+        self.stdout.write(f"Результати збережено у {options['output']}")
+
+        if failures:
+            for failure in failures:
+                self.stderr.write(self.style.ERROR(f"  ✗ {failure}"))
+            raise CommandError(f"Бенчмарк генератора не пройдено ({len(failures)})")
+        self.stdout.write(self.style.SUCCESS('Усі сценарії розміщено без конфліктів'))
+
+    def _prepare_demand(self, config: SyntheticConfig, options: dict) -> dict:
+        """Потреби навантажень, типи аудиторій та недоступність (детерміновано від seed)."""
+        rng = random.Random(config.seed)
+        for k, subject in enumerate(Subject.objects.filter(name__startswith='BENCH ').order_by('id')):
+            room_type = ROOM_TYPE_BY_SUBJECT_MOD.get(k % 4, '')
+            if room_type:
+                Subject.objects.filter(pk=subject.pk).update(required_classroom_type=room_type)
+
+        # Тижнева потреба групи ділиться між її навантаженнями якомога рівніше
+        by_group: dict[int, list[int]] = {}
+        for aid, gid in TeachingAssignment.objects.order_by('id').values_list('id', 'group_id'):
+            by_group.setdefault(gid, []).append(aid)
+        updates = []
+        for aids in by_group.values():
+            base, extra = divmod(options['lessons_per_week'], len(aids))
+            for k, aid in enumerate(aids):
+                updates.append(TeachingAssignment(id=aid, weekly_lessons=base + (1 if k < extra else 0)))
+        TeachingAssignment.objects.bulk_update(updates, ['weekly_lessons'])
+
+        teacher_ids = sorted(set(TeachingAssignment.objects.values_list('teacher_id', flat=True)))
+        unavailable = rng.sample(teacher_ids, int(len(teacher_ids) * options['unavailable_share']))
+        TeacherUnavailability.objects.bulk_create([
+            TeacherUnavailability(teacher_id=tid, day_of_week=rng.randint(1, 5), reason='benchmark')
+            for tid in unavailable
+        ])
+        # Синтетичні шаблони мають випадкові аудиторії — генератор будує розклад з нуля
+        ScheduleTemplate.objects.all().delete()
+        return {
+            'weekly_lessons': sum(u.weekly_lessons for u in updates),
+            'unavailable_teachers': len(unavailable),
+        }
+
+    def _run_scenarios(self, options: dict) -> list[dict]:
+        budget, seed = options['time_budget'], options['seed']
+        results = []
+
+        result, row = self._measure('full', lambda: generate_timetable(time_budget=budget, seed=seed))
+        results.append(row)
+        if result['unplaced']:
+            return results  # далі нема що закріплювати
+        apply_timetable(result)
+
+        rng = random.Random(seed)
+        template_ids = list(ScheduleTemplate.objects.order_by('id').values_list('id', flat=True))
+        pinned = rng.sample(template_ids, int(len(template_ids) * options['pinned_share']))
+        ScheduleTemplate.objects.filter(id__in=pinned).update(is_pinned=True)
+        _, row = self._measure('pinned', lambda: generate_timetable(time_budget=budget, seed=seed + 1))
+        row['pinned'] = len(pinned)
+        results.append(row)
+
+        group_id = StudyGroup.objects.order_by('id').values_list('id', flat=True).first()
+        _, row = self._measure(
+            'single_group', lambda: generate_timetable(group_ids=[group_id], time_budget=budget, seed=seed)
+        )
+        results.append(row)
+        return results
+
+    @staticmethod
+    def _measure(name: str, run) -> tuple[dict, dict]:
+        with CaptureQueriesContext(connection) as ctx:
+            started = time.perf_counter()
+            result = run()
+            elapsed_ms = (time.perf_counter() - started) * 1000
+
+        # Результат перевіряється разом з усім, що генератор не замінює
+        kept = list(
+            ScheduleTemplate.objects.exclude(group_id__in=result['group_ids'], is_pinned=False).values(
+                'group_id', 'teacher_id', 'classroom_id', 'day_of_week', 'lesson_number',
+            )
+        )
+        stats = result['stats']
+        return result, {
+            'name': name,
+            'groups': len(result['group_ids']),
+            'events': stats['events'],
+            'placed': stats['placed'],
+            'unplaced': stats['unplaced'],
+            'greedy_unplaced': stats['greedy_unplaced'],
+            'cost': stats['cost'],
+            'iterations': stats['iterations'],
+            'hard_conflicts': len(find_hard_conflicts(kept + result['placements'])),
+            'elapsed_ms': round(elapsed_ms, 1),
+            'queries': len(ctx.captured_queries),
+        }
@@ -0,0 +1,58 @@
+"""
+Management command: export_performance
+Вивантажує StudentPerformance разом з вимірами (урок, предмет, група,
+тип оцінювання) у стиснутий колонковий файл для офлайн-аналітики.
+
+Приклади:
+    python manage.py export_performance --output perf.parquet
+    python manage.py export_performance --format ndjson --date-from 2025-09-01
+"""
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from main.services.export_service import (
+    DEFAULT_CHUNK_SIZE,
+    EXPORT_FORMATS,
+    export_file_extension,
+    stream_performance_export,
+)
+
+
+class Command(BaseCommand):
+    help = 'Експорт фактів успішності у Parquet (якщо є pyarrow) або NDJSON.gz'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--output', '-o', help='Шлях до файлу (за замовчуванням performance_<дата>.<ext>)')
+        parser.add_argument('--format', choices=('auto',) + EXPORT_FORMATS, default='auto')
+        parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE)
+        parser.add_argument('--date-from', type=date.fromisoformat)
+        parser.add_argument('--date-to', type=date.fromisoformat)
+        parser.add_argument('--group', type=int, help='ID групи')
+
+    def handle(self, *args, **options):
+        if options['chunk_size'] <= 0:
+            raise CommandError('--chunk-size має бути додатнім')
+
+        try:
+            export_format, stream = stream_performance_export(
+                export_format=options['format'],
+                chunk_size=options['chunk_size'],
+                date_from=options['date_from'],
+                date_to=options['date_to'],
+                group_id=options['group'],
+            )
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        output = options['output'] or f"performance_{date.today()}.{export_file_extension(export_format)}"
+
+        written = 0
+        with open(output, 'wb') as fh:
+            for data in stream:
+                fh.write(data)
+                written += len(data)
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Експортовано у {output} ({export_format}, {written / 1024:.1f} KB)"
+        ))
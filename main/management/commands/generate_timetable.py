@@ -0,0 +1,64 @@
+"""
+Management command: generate_timetable
+Автоматична генерація тижневого шаблону розкладу з навантажень
+(TeachingAssignment.weekly_lessons), аудиторій та недоступності викладачів.
+Закріплені слоти (ScheduleTemplate.is_pinned) та розклад інших груп не змінюються.
+
+Без --apply лише показує результат; з --apply замінює незакріплені шаблони груп.
+
+Приклади:
+    python manage.py generate_timetable
+    python manage.py generate_timetable --group 3 --group 4 --time-budget 30 --apply
+"""
+from django.core.management.base import BaseCommand, CommandError
+
+from main.services.timetable_solver import DEFAULT_TIME_BUDGET, apply_timetable, generate_timetable
+
+
+class Command(BaseCommand):
+    help = 'Генерація безконфліктного тижневого розкладу (жадібно + локальний пошук)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--group', type=int, action='append',
+                            help='ID групи (можна кілька разів; за замовчуванням — усі з потребою)')
+        parser.add_argument('--time-budget', type=float, default=DEFAULT_TIME_BUDGET, help='Секунд на пошук')
+        parser.add_argument('--days', type=int, choices=[5, 6], default=5, help='Навчальних днів на тиждень')
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--apply', action='store_true', help='Зберегти результат у шаблони розкладу')
+
+    def handle(self, *args, **options):
+        if options['time_budget'] <= 0:
+            raise CommandError('--time-budget має бути додатнім')
+
+        result = generate_timetable(
+            group_ids=options['group'],
+            days=range(1, options['days'] + 1),
+            time_budget=options['time_budget'],
+            seed=options['seed'],
+        )
+        stats = result['stats']
+        if not stats['events']:
+            raise CommandError('Немає навантажень з weekly_lessons > 0 для вибраних груп')
+
+        for warning in result['warnings']:
+            self.stdout.write(self.style.WARNING(warning))
+        self.stdout.write(
+            f"Груп: {len(result['group_ids'])}, пар: {stats['events']}, розміщено {stats['placed']} "
+            f"(жадібно не вмістилось {stats['greedy_unplaced']}), штраф {stats['cost']} "
+            f"(до покращення {stats['cost_before_improve']}), {stats['iterations']} ітерацій, "
+            f"{stats['elapsed_ms'] / 1000:.1f} с"
+        )
+        for item in result['unplaced']:
+            self.stdout.write(self.style.ERROR(
+                f"  ✗ навантаження {item['assignment_id']} (група {item['group_id']}, "
+                f"викладач {item['teacher_id']}) — не знайдено слота"
+            ))
+
+        if not options['apply']:
+            self.stdout.write('Результат не збережено (додайте --apply)')
+            return
+
+        outcome = apply_timetable(result)
+        if outcome['status'] != 'success':
+            raise CommandError(outcome['message'])
+        self.stdout.write(self.style.SUCCESS(f"{outcome['message']} (видалено старих: {outcome['deleted']})"))
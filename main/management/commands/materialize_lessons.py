@@ -0,0 +1,65 @@
+"""
+Management command: materialize_lessons
+Розгортає шаблони розкладу (ScheduleTemplate) в конкретні уроки (Lesson)
+на діапазон дат. Повторний запуск змінює лише те, що змінилось у шаблонах.
+
+Приклади:
+    python manage.py materialize_lessons --date-from 2025-09-01 --date-to 2025-12-28
+    python manage.py materialize_lessons --date-from 2025-09-01 --date-to 2025-12-28 --group 3 --dry-run
+"""
+import time
+from datetime import date
+
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management.base import BaseCommand, CommandError
+
+from main.services.materialization_service import DEFAULT_BATCH_SIZE, materialize_lessons
+
+
+class Command(BaseCommand):
+    help = 'Генерація уроків з шаблонів розкладу (ідемпотентно)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--date-from', type=date.fromisoformat, required=True, help='Початок семестру')
+        parser.add_argument('--date-to', type=date.fromisoformat, required=True, help='Кінець семестру (включно)')
+        parser.add_argument('--group', type=int, action='append', help='ID групи (можна кілька разів)')
+        parser.add_argument('--week-anchor', type=date.fromisoformat,
+                            help='Дата з тижня-чисельника (за замовчуванням SEMESTER_START з налаштувань)')
+        parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE)
+        parser.add_argument('--dry-run', action='store_true', help='Лише показати кількість змін')
+
+    def handle(self, *args, **options):
+        if options['date_from'] > options['date_to']:
+            raise CommandError('--date-from має бути не пізніше --date-to')
+        if options['batch_size'] <= 0:
+            raise CommandError('--batch-size має бути додатнім')
+
+        started = time.perf_counter()
+        try:
+            stats = materialize_lessons(
+                date_from=options['date_from'],
+                date_to=options['date_to'],
+                group_ids=options['group'],
+                week_anchor=options['week_anchor'],
+                batch_size=options['batch_size'],
+                dry_run=options['dry_run'],
+            )
+        except ImproperlyConfigured as exc:
+            raise CommandError(f"{exc} (або передайте --week-anchor)")
+        elapsed = time.perf_counter() - started
+
+        prefix = '[dry-run] ' if options['dry_run'] else ''
+        self.stdout.write(self.style.SUCCESS(
+            f"{prefix}Створено {stats['created']}, оновлено {stats['updated']}, "
+            f"видалено {stats['deleted']}, без змін {stats['unchanged']} за {elapsed:.1f} с"
+        ))
+        if stats['kept']:
+            self.stdout.write(f"Збережено {stats['kept']} уроків поза розкладом (мають оцінки, тему чи ДЗ)")
+        if stats['conflicts']:
+            self.stdout.write(self.style.WARNING(
+                f"{stats['conflicts']} ручних уроків з іншим предметом зайняли час пар із шаблонів"
+            ))
+        if stats['skipped_templates']:
+            self.stdout.write(self.style.WARNING(
+                f"{stats['skipped_templates']} шаблонів без викладача пропущено"
+            ))
@@ -0,0 +1,55 @@
+"""
+Management command: prune_notifications
+Видалення застарілих сповіщень згідно з політикою зберігання.
+
+Терміни за типом — settings.NOTIFICATION_RETENTION_DAYS (непрочитані
+зберігаються вдвічі довше). Видалення йде пакетами за первинним ключем,
+тож таблиця не блокується надовго; запускати щоночі з cron.
+
+Приклади:
+    python manage.py prune_notifications --dry-run
+    python manage.py prune_notifications --archive-dir /var/backups/notifications
+    python manage.py prune_notifications --batch-size 5000 --pause 0.2 --outbox-days 14
+"""
+from django.core.management.base import BaseCommand, CommandError
+
+from main.services.notification_retention_service import (
+    DEFAULT_BATCH_SIZE,
+    DEFAULT_OUTBOX_RETENTION_DAYS,
+    prune_notifications,
+    retention_policy,
+)
+
+
+class Command(BaseCommand):
+    help = 'Видалення (та архівування) застарілих сповіщень пакетами'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE, help='Рядків за пакет')
+        parser.add_argument('--archive-dir', help='Каталог для gzip JSONL архіву видалених рядків')
+        parser.add_argument('--pause', type=float, default=0.0, help='Пауза між пакетами, с')
+        parser.add_argument('--outbox-days', type=int, default=DEFAULT_OUTBOX_RETENTION_DAYS,
+                            help='Скільки днів зберігати виконані повідомлення черги')
+        parser.add_argument('--dry-run', action='store_true', help='Лише порахувати, нічого не видаляти')
+
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size має бути додатним')
+
+        policy = retention_policy()
+        self.stdout.write('Політика: ' + ', '.join(f"{t} — {d} дн." for t, d in policy.items()))
+        stats = prune_notifications(
+            batch_size=options['batch_size'],
+            archive_dir=options['archive_dir'],
+            dry_run=options['dry_run'],
+            pause=options['pause'],
+            outbox_days=options['outbox_days'],
+        )
+        verb = 'До видалення' if options['dry_run'] else 'Видалено'
+        personal = ', '.join(f"{t}: {n}" for t, n in stats['personal'].items())
+        self.stdout.write(self.style.SUCCESS(
+            f"{verb}: особистих — {sum(stats['personal'].values())} ({personal}), "
+            f"масових — {stats['broadcasts']}, повідомлень черги — {stats['outbox']}"
+        ))
+        if stats['archive']:
+            self.stdout.write(f"Архів: {stats['archive']}")
@@ -0,0 +1,31 @@
+"""
+Management command: recompute_risk_scores
+Повний перерахунок таблиці StudentRiskScore. Запускається щоночі (cron):
+підхоплює ДЗ, дедлайн яких минув без жодного запису, та зміни ваг типів
+оцінювання, які не тригерять інкрементальне оновлення.
+
+Приклад:
+    python manage.py recompute_risk_scores --batch-size 1000
+"""
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from main.services.risk_service import BATCH_SIZE, recalculate_all_risk
+
+
+class Command(BaseCommand):
+    help = 'Повний перерахунок балів ризику студентів'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        if options['batch_size'] <= 0:
+            raise CommandError('--batch-size має бути додатнім')
+
+        started = time.perf_counter()
+        updated = recalculate_all_risk(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(
+            f'Оновлено {updated} студентів за {time.perf_counter() - started:.1f} с'
+        ))
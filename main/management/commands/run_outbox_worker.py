@@ -0,0 +1,53 @@
+"""
+Management command: run_outbox_worker
+Фоновий обробник черги сповіщень і SMS (OutboxMessage).
+
+Оцінки, пропуски та коментарі лише ставлять повідомлення в чергу в своїй
+транзакції; цей процес доставляє їх пакетами з повторами. Можна запускати
+кілька екземплярів — рядки захоплюються з SKIP LOCKED.
+
+Приклади:
+    python manage.py run_outbox_worker                 # постійно, опитування раз на 2 с
+    python manage.py run_outbox_worker --once          # один прохід (cron)
+    python manage.py run_outbox_worker --batch-size 500 --interval 5
+"""
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from main.services.outbox_service import DEFAULT_BATCH_SIZE, process_batch
+
+
+class Command(BaseCommand):
+    help = 'Обробка черги сповіщень і SMS (outbox)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE, help='Повідомлень за пакет')
+        parser.add_argument('--interval', type=float, default=2.0, help='Пауза між опитуваннями порожньої черги, с')
+        parser.add_argument('--once', action='store_true', help='Обробити все готове й завершитися')
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        totals = {'claimed': 0, 'done': 0, 'retried': 0, 'dead': 0}
+        try:
+            while True:
+                close_old_connections()
+                stats = process_batch(batch_size)
+                for key, value in stats.items():
+                    totals[key] += value
+                if stats['claimed']:
+                    self.stdout.write(
+                        f"Пакет: {stats['claimed']} (виконано {stats['done']}, "
+                        f"повтор {stats['retried']}, помилок {stats['dead']})"
+                    )
+                if stats['claimed'] < batch_size:
+                    if options['once']:
+                        break
+                    time.sleep(options['interval'])
+        except KeyboardInterrupt:
+            pass
+        self.stdout.write(self.style.SUCCESS(
+            f"Оброблено: {totals['claimed']}, виконано: {totals['done']}, "
+            f"відкладено: {totals['retried']}, вичерпано спроби: {totals['dead']}"
+        ))
@@ -0,0 +1,42 @@
+"""
+Management command: snapshot_schedules
+Фіксація поточних шаблонів розкладу як версій (ScheduleVersion).
+
+Збереження розкладу через конструктор, редактор слоту, генератор чи
+адмінку створює версії автоматично. Команда потрібна для початкового
+заповнення історії (--effective-from — з якої дати чинні поточні шаблони,
+напр. початок семестру) та для змін, внесених в обхід моделей.
+
+Приклади:
+    python manage.py snapshot_schedules --effective-from 2026-09-01
+    python manage.py snapshot_schedules --group 12
+"""
+from datetime import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+
+from main.models import StudyGroup
+from main.services.schedule_version_service import record_schedule_versions
+
+
+class Command(BaseCommand):
+    help = 'Фіксація поточних шаблонів розкладу груп як версій'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--group', type=int, action='append', help='ID групи (можна кілька разів)')
+        parser.add_argument('--effective-from', help='Дата початку дії версії, YYYY-MM-DD (за замовчуванням сьогодні)')
+
+    def handle(self, *args, **options):
+        effective_from = None
+        if options['effective_from']:
+            try:
+                effective_from = datetime.strptime(options['effective_from'], '%Y-%m-%d').date()
+            except ValueError:
+                raise CommandError('Дата має бути у форматі YYYY-MM-DD')
+
+        group_ids = options['group'] or list(StudyGroup.objects.values_list('id', flat=True))
+        stats = record_schedule_versions(group_ids, effective_from=effective_from)
+        self.stdout.write(self.style.SUCCESS(
+            f"Нових версій: {stats['created']}, уточнено: {stats['updated']}, "
+            f"повернуто до попередніх: {stats['reverted']}, без змін: {stats['unchanged']}"
+        ))
@@ -0,0 +1,37 @@
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0010_rename_dz_to_homework'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StudentRiskScore',
+            fields=[
+                ('student', models.OneToOneField(limit_choices_to={'role': 'student'}, on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='risk_score', serialize=False, to=settings.AUTH_USER_MODEL, verbose_name='Студент')),
+                ('course', models.PositiveSmallIntegerField(blank=True, null=True, verbose_name='Курс')),
+                ('score', models.FloatField(default=0, verbose_name='Бал ризику')),
+                ('unexcused_absences', models.PositiveIntegerField(default=0, verbose_name='Неповажні пропуски')),
+                ('grade_trend', models.FloatField(default=0, verbose_name='Тренд оцінок (бал/оцінку)')),
+                ('missing_homework', models.PositiveIntegerField(default=0, verbose_name='Пропущені ДЗ')),
+                ('weighted_grade', models.FloatField(blank=True, null=True, verbose_name='Зважений бал')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Оновлено')),
+                ('group', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, to='main.studygroup', verbose_name='Група')),
+            ],
+            options={
+                'verbose_name': 'Ризик студента',
+                'verbose_name_plural': 'Ризики студентів',
+                'db_table': 'student_risk_scores',
+                'indexes': [
+                    models.Index(fields=['-score'], name='risk_score_idx'),
+                    models.Index(fields=['group', '-score'], name='risk_group_score_idx'),
+                    models.Index(fields=['course', '-score'], name='risk_course_score_idx'),
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,31 @@
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0011_student_risk_score'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StudentSummary',
+            fields=[
+                ('student', models.OneToOneField(limit_choices_to={'role': 'student'}, on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='summary', serialize=False, to=settings.AUTH_USER_MODEL, verbose_name='Студент')),
+                ('lessons_count', models.PositiveIntegerField(default=0, verbose_name='Записів у журналі')),
+                ('graded_count', models.PositiveIntegerField(default=0, verbose_name='Кількість оцінок')),
+                ('points_sum', models.DecimalField(decimal_places=2, default=0, max_digits=10, verbose_name='Сума балів')),
+                ('respectful_absences', models.PositiveIntegerField(default=0, verbose_name='Поважні пропуски')),
+                ('unrespectful_absences', models.PositiveIntegerField(default=0, verbose_name='Неповажні пропуски')),
+                ('recent_grades', models.JSONField(blank=True, default=list, verbose_name='Останні оцінки')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Оновлено')),
+            ],
+            options={
+                'verbose_name': 'Зведення студента',
+                'verbose_name_plural': 'Зведення студентів',
+                'db_table': 'student_summaries',
+            },
+        ),
+    ]
@@ -0,0 +1,25 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0012_student_summary'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Holiday',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField(unique=True, verbose_name='Дата')),
+                ('name', models.CharField(max_length=100, verbose_name='Назва')),
+            ],
+            options={
+                'verbose_name': 'Святковий день',
+                'verbose_name_plural': 'Святкові дні',
+                'db_table': 'holidays',
+                'ordering': ['date'],
+            },
+        ),
+    ]
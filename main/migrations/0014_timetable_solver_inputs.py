@@ -0,0 +1,44 @@
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0013_holiday'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='subject',
+            name='required_classroom_type',
+            field=models.CharField(blank=True, choices=[('lecture', 'Лекційна'), ('computer', "Комп'ютерна"), ('lab', 'Лабораторна'), ('other', 'Інша')], help_text='Використовується генератором розкладу; порожнє — будь-яка', max_length=20, verbose_name='Потрібний тип аудиторії'),
+        ),
+        migrations.AddField(
+            model_name='teachingassignment',
+            name='weekly_lessons',
+            field=models.PositiveSmallIntegerField(default=0, help_text='Потреба для генератора розкладу; 0 — не планувати автоматично', verbose_name='Пар на тиждень'),
+        ),
+        migrations.AddField(
+            model_name='scheduletemplate',
+            name='is_pinned',
+            field=models.BooleanField(default=False, help_text='Генератор розкладу не переносить і не видаляє цей слот', verbose_name='Закріплений'),
+        ),
+        migrations.CreateModel(
+            name='TeacherUnavailability',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day_of_week', models.IntegerField(choices=[(1, 'Пн'), (2, 'Вт'), (3, 'Ср'), (4, 'Чт'), (5, 'Пт'), (6, 'Сб'), (7, 'Нд')], verbose_name='День тижня')),
+                ('lesson_number', models.PositiveSmallIntegerField(blank=True, help_text='Порожнє — недоступний увесь день', null=True, verbose_name='Номер пари')),
+                ('reason', models.CharField(blank=True, max_length=255, verbose_name='Причина')),
+                ('teacher', models.ForeignKey(limit_choices_to={'role': 'teacher'}, on_delete=django.db.models.deletion.CASCADE, related_name='unavailability', to=settings.AUTH_USER_MODEL, verbose_name='Викладач')),
+            ],
+            options={
+                'verbose_name': 'Недоступність викладача',
+                'verbose_name_plural': 'Недоступність викладачів',
+                'db_table': 'teacher_unavailability',
+                'ordering': ['teacher', 'day_of_week', 'lesson_number'],
+            },
+        ),
+    ]
@@ -0,0 +1,33 @@
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0014_timetable_solver_inputs'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ScheduleVersion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('valid_from', models.DateField(verbose_name='Діє з')),
+                ('valid_to', models.DateField(blank=True, help_text='Порожнє — чинна версія', null=True, verbose_name='Діє до')),
+                ('slots', models.JSONField(default=list, verbose_name='Слоти')),
+                ('checksum', models.CharField(max_length=32, verbose_name='Контрольна сума слотів')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Дата створення')),
+                ('created_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL, verbose_name='Автор')),
+                ('group', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='schedule_versions', to='main.studygroup', verbose_name='Група')),
+            ],
+            options={
+                'verbose_name': 'Версія розкладу',
+                'verbose_name_plural': 'Версії розкладу',
+                'db_table': 'schedule_versions',
+                'ordering': ['group', '-valid_from'],
+                'constraints': [models.UniqueConstraint(fields=('group', 'valid_from'), name='uniq_schedule_version_start')],
+            },
+        ),
+    ]
@@ -0,0 +1,61 @@
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0015_schedule_versions'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BroadcastNotification',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('notif_type', models.CharField(choices=[('news', 'Новини'), ('comment', 'Коментар'), ('grade', 'Оцінка'), ('absence', 'Пропуск')], max_length=20, verbose_name='Тип')),
+                ('title', models.CharField(max_length=255, verbose_name='Заголовок')),
+                ('message', models.TextField(blank=True, verbose_name='Текст')),
+                ('audience', models.CharField(choices=[('all', 'Усі студенти та викладачі'), ('group', 'Група')], max_length=10, verbose_name='Аудиторія')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('author', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL, verbose_name='Автор')),
+                ('group', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='broadcast_notifications', to='main.studygroup', verbose_name='Група')),
+                ('post', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='broadcasts', to='main.post', verbose_name='Допис')),
+            ],
+            options={
+                'verbose_name': 'Масове сповіщення',
+                'verbose_name_plural': 'Масові сповіщення',
+                'db_table': 'broadcast_notifications',
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['audience', 'group', 'created_at'], name='broadcast_audience_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='NotificationReadCursor',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='notification_cursor', serialize=False, to=settings.AUTH_USER_MODEL, verbose_name='Користувач')),
+                ('read_until', models.DateTimeField(verbose_name='Прочитано до')),
+            ],
+            options={
+                'verbose_name': 'Курсор сповіщень',
+                'verbose_name_plural': 'Курсори сповіщень',
+                'db_table': 'notification_read_cursors',
+            },
+        ),
+        migrations.CreateModel(
+            name='BroadcastRead',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('read_at', models.DateTimeField(auto_now_add=True)),
+                ('broadcast', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='reads', to='main.broadcastnotification', verbose_name='Сповіщення')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL, verbose_name='Користувач')),
+            ],
+            options={
+                'verbose_name': 'Прочитане масове сповіщення',
+                'verbose_name_plural': 'Прочитані масові сповіщення',
+                'db_table': 'broadcast_reads',
+                'constraints': [models.UniqueConstraint(fields=('user', 'broadcast'), name='uniq_broadcast_read')],
+            },
+        ),
+    ]
@@ -0,0 +1,33 @@
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0016_broadcast_notifications'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OutboxMessage',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(max_length=30, verbose_name='Тип')),
+                ('payload', models.JSONField(default=dict, verbose_name='Дані')),
+                ('status', models.CharField(choices=[('pending', 'Очікує'), ('done', 'Виконано'), ('dead', 'Помилка (вичерпано спроби)')], default='pending', max_length=10, verbose_name='Статус')),
+                ('attempts', models.PositiveSmallIntegerField(default=0, verbose_name='Спроб')),
+                ('available_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Доступне з')),
+                ('last_error', models.TextField(blank=True, verbose_name='Остання помилка')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('processed_at', models.DateTimeField(blank=True, null=True, verbose_name='Оброблено')),
+            ],
+            options={
+                'verbose_name': 'Повідомлення черги',
+                'verbose_name_plural': 'Черга повідомлень (outbox)',
+                'db_table': 'outbox_messages',
+                'ordering': ['id'],
+                'indexes': [models.Index(fields=['status', 'available_at'], name='outbox_pending_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,16 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0019_notification_retention_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='calendar_feed_salt',
+            field=models.CharField(blank=True, editable=False, max_length=32, verbose_name='Сіль календарних стрічок'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0020_user_calendar_feed_salt'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='lesson',
+            name='replaced_teacher',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='replaced_lessons', to=settings.AUTH_USER_MODEL, verbose_name='Замінений викладач'),
+        ),
+    ]
@@ -3,6 +3,7 @@ from typing import Optional, Any, List, Union
 from django.contrib.auth.models import AbstractBaseUser, BaseUserManager, PermissionsMixin
 from django.core.validators import MinValueValidator, MaxValueValidator
 from django.core.exceptions import ValidationError
+from django.utils import timezone
 
 # ==========================================
 # 1. БАЗОВІ СУТНОСТІ (АДМІНІСТРАТИВНІ)
@@ -85,6 +86,9 @@ class User(AbstractBaseUser, PermissionsMixin):
     THEME_CHOICES = [('light', 'Світла'), ('dark', 'Темна')]
     theme = models.CharField(max_length=5, choices=THEME_CHOICES, default='light', verbose_name="Тема інтерфейсу")
 
+    # Сіль токенів .ics-стрічок: нове значення відкликає всі видані посилання
+    calendar_feed_salt = models.CharField(max_length=32, blank=True, editable=False, verbose_name="Сіль календарних стрічок")
+
     # Технічні поля Django
     is_active = models.BooleanField(default=True)
     is_staff = models.BooleanField(default=False) # Чи має доступ до адмінки
@@ -122,6 +126,12 @@ class Subject(models.Model):
         validators=[MinValueValidator(1), MaxValueValidator(8)],
         verbose_name="Семестр"
     )
+    required_classroom_type = models.CharField(
+        max_length=20, blank=True,
+        choices=[('lecture', 'Лекційна'), ('computer', 'Комп\'ютерна'), ('lab', 'Лабораторна'), ('other', 'Інша')],
+        verbose_name="Потрібний тип аудиторії",
+        help_text="Використовується генератором розкладу; порожнє — будь-яка"
+    )
     
     # Технічні поля
     is_active = models.BooleanField(default=True, verbose_name="Активний")
@@ -232,6 +242,10 @@ class TeachingAssignment(models.Model):
     )
     start_date = models.DateField(null=True, blank=True, verbose_name="Дата початку")
     end_date = models.DateField(null=True, blank=True, verbose_name="Дата завершення")
+    weekly_lessons = models.PositiveSmallIntegerField(
+        default=0, verbose_name="Пар на тиждень",
+        help_text="Потреба для генератора розкладу; 0 — не планувати автоматично"
+    )
     notes = models.TextField(blank=True, verbose_name="Примітки")
     
     # Технічні поля
@@ -309,6 +323,48 @@ class TimeSlot(models.Model):
         t2 = self.end_time
         return (t2.hour * 60 + t2.minute) - (t1.hour * 60 + t1.minute)
 
+class TeacherUnavailability(models.Model):
+    """Час, коли викладач не може вести пари (для генератора розкладу)."""
+    teacher = models.ForeignKey(
+        User, on_delete=models.CASCADE,
+        limit_choices_to={'role': 'teacher'},
+        related_name='unavailability', verbose_name="Викладач"
+    )
+    day_of_week = models.IntegerField(
+        choices=[(1, 'Пн'), (2, 'Вт'), (3, 'Ср'), (4, 'Чт'), (5, 'Пт'), (6, 'Сб'), (7, 'Нд')],
+        verbose_name="День тижня"
+    )
+    lesson_number = models.PositiveSmallIntegerField(
+        null=True, blank=True, verbose_name="Номер пари",
+        help_text="Порожнє — недоступний увесь день"
+    )
+    reason = models.CharField(max_length=255, blank=True, verbose_name="Причина")
+
+    class Meta:
+        db_table = 'teacher_unavailability'
+        ordering = ['teacher', 'day_of_week', 'lesson_number']
+        verbose_name = "Недоступність викладача"
+        verbose_name_plural = "Недоступність викладачів"
+
+    def __str__(self) -> str:
+        slot = f"пара {self.lesson_number}" if self.lesson_number else "весь день"
+        return f"{self.teacher_id}: {self.get_day_of_week_display()}, {slot}"
+
+
+class Holiday(models.Model):
+    """Святковий / неробочий день: уроки з шаблонів на цю дату не створюються."""
+    date = models.DateField(unique=True, verbose_name="Дата")
+    name = models.CharField(max_length=100, verbose_name="Назва")
+
+    class Meta:
+        db_table = 'holidays'
+        ordering = ['date']
+        verbose_name = "Святковий день"
+        verbose_name_plural = "Святкові дні"
+
+    def __str__(self) -> str:
+        return f"{self.date} — {self.name}"
+
 # ==========================================
 # 3. РОЗКЛАД І ЖУРНАЛ (TIMELORD EDITION)
 # ==========================================
@@ -364,6 +420,10 @@ class ScheduleTemplate(models.Model):
         verbose_name="Тип тижня"
     )
     notes = models.TextField(blank=True, verbose_name="Примітки")
+    is_pinned = models.BooleanField(
+        default=False, verbose_name="Закріплений",
+        help_text="Генератор розкладу не переносить і не видаляє цей слот"
+    )
     
     # Технічні поля
     is_active = models.BooleanField(default=True, verbose_name="Активний")
@@ -393,6 +453,41 @@ class ScheduleTemplate(models.Model):
         
         super().save(*args, **kwargs)
 
+
+class ScheduleVersion(models.Model):
+    """
+    Незмінний знімок тижневого розкладу групи, чинний у [valid_from, valid_to].
+
+    Шаблони (ScheduleTemplate) редагуються на місці, тож історія зберігається
+    тут: кожне збереження розкладу, що змінює його зміст, закриває попередню
+    версію і відкриває нову. Версія ще уточнюється протягом свого першого дня.
+    """
+    group = models.ForeignKey(
+        StudyGroup, on_delete=models.CASCADE, related_name='schedule_versions', verbose_name="Група"
+    )
+    valid_from = models.DateField(verbose_name="Діє з")
+    valid_to = models.DateField(null=True, blank=True, verbose_name="Діє до", help_text="Порожнє — чинна версія")
+    slots = models.JSONField(default=list, verbose_name="Слоти")
+    checksum = models.CharField(max_length=32, verbose_name="Контрольна сума слотів")
+    created_by = models.ForeignKey(
+        User, on_delete=models.SET_NULL, null=True, blank=True, related_name='+', verbose_name="Автор"
+    )
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name="Дата створення")
+
+    class Meta:
+        db_table = 'schedule_versions'
+        ordering = ['group', '-valid_from']
+        verbose_name = "Версія розкладу"
+        verbose_name_plural = "Версії розкладу"
+        constraints = [
+            # Індекс (group, valid_from) обслуговує і пошук "чинна на дату"
+            models.UniqueConstraint(fields=['group', 'valid_from'], name='uniq_schedule_version_start'),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.group_id}: {self.valid_from} — {self.valid_to or '…'}"
+
+
 class Lesson(models.Model):
     """
     Конкретний урок у календарі.
@@ -422,6 +517,15 @@ class Lesson(models.Model):
         blank=True, 
         verbose_name="Джерело (шаблон)"
     )
+    # Заміна: викладач за розкладом; поки задано, генерація уроків не повертає його в teacher
+    replaced_teacher = models.ForeignKey(
+        User,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='replaced_lessons',
+        verbose_name="Замінений викладач"
+    )
     
     # Додаткові поля
     homework = models.TextField(blank=True, verbose_name="Домашнє завдання")
@@ -449,12 +553,9 @@ class Lesson(models.Model):
 
     @property
     def lesson_number(self) -> int:
-        """Повертає номер пари на основі часу початку."""
-        from main.constants import DEFAULT_TIME_SLOTS
-        for num, (start, _) in DEFAULT_TIME_SLOTS.items():
-            if self.start_time == start:
-                return num
-        return 0
+        """Повертає номер пари на основі часу початку (0 — поза розкладом дзвінків)."""
+        from main.services.bell_schedule_service import get_bell_schedule
+        return get_bell_schedule().number_for(self.start_time)
 
 # ==========================================
 # 4. УСПІШНІСТЬ СТУДЕНТА
@@ -556,6 +657,10 @@ class Post(models.Model):
     class Meta:
         db_table = 'news_posts'
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['-created_at', '-id'], name='news_post_feed_idx'),
+            models.Index(fields=['group', '-created_at', '-id'], name='news_post_group_feed_idx'),
+        ]
         verbose_name = 'Допис'
         verbose_name_plural = 'Дописи'
 
@@ -573,6 +678,7 @@ class Comment(models.Model):
     class Meta:
         db_table = 'news_comments'
         ordering = ['created_at']
+        indexes = [models.Index(fields=['post', 'created_at', 'id'], name='news_comment_post_idx')]
         verbose_name = 'Коментар'
         verbose_name_plural = 'Коментарі'
 
@@ -604,6 +710,13 @@ class Notification(models.Model):
     class Meta:
         db_table = 'notifications'
         ordering = ['-created_at']
+        indexes = [
+            # Стрічка та лічильник непрочитаних користувача
+            models.Index(fields=['recipient', '-created_at'], name='notif_recipient_recent_idx'),
+            models.Index(fields=['recipient', 'is_read', 'created_at'], name='notif_recipient_unread_idx'),
+            # Відбір застарілих за типом (prune_notifications)
+            models.Index(fields=['notif_type', 'created_at'], name='notif_type_age_idx'),
+        ]
         verbose_name = 'Сповіщення'
         verbose_name_plural = 'Сповіщення'
 
@@ -611,6 +724,117 @@ class Notification(models.Model):
         return f"[{self.notif_type}] {self.recipient.full_name}: {self.title}"
 
 
+class BroadcastNotification(models.Model):
+    """
+    Масове сповіщення, збережене один раз (fan-out при читанні).
+
+    Аудиторія: 'all' — усі студенти та викладачі, 'group' — студенти групи
+    та викладачі з активним навантаженням у ній. Автор сповіщення не бачить;
+    користувач бачить лише сповіщення, створені після його реєстрації.
+    """
+    AUDIENCE_CHOICES = [
+        ('all',   'Усі студенти та викладачі'),
+        ('group', 'Група'),
+    ]
+
+    notif_type = models.CharField(max_length=20, choices=Notification.NOTIF_TYPES, verbose_name="Тип")
+    title      = models.CharField(max_length=255, verbose_name="Заголовок")
+    message    = models.TextField(blank=True, verbose_name="Текст")
+    audience   = models.CharField(max_length=10, choices=AUDIENCE_CHOICES, verbose_name="Аудиторія")
+    group      = models.ForeignKey(
+        StudyGroup, on_delete=models.CASCADE,
+        null=True, blank=True,
+        related_name='broadcast_notifications', verbose_name="Група"
+    )
+    author     = models.ForeignKey(
+        User, on_delete=models.SET_NULL,
+        null=True, blank=True,
+        related_name='+', verbose_name="Автор"
+    )
+    post       = models.ForeignKey(
+        'Post', on_delete=models.CASCADE,
+        null=True, blank=True,
+        related_name='broadcasts', verbose_name="Допис"
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = 'broadcast_notifications'
+        ordering = ['-created_at']
+        indexes = [models.Index(fields=['audience', 'group', 'created_at'], name='broadcast_audience_idx')]
+        verbose_name = 'Масове сповіщення'
+        verbose_name_plural = 'Масові сповіщення'
+
+    def __str__(self) -> str:
+        return f"[{self.notif_type}] {self.get_audience_display()}: {self.title}"
+
+
+class NotificationReadCursor(models.Model):
+    """Курсор прочитання масових сповіщень: усе до read_until вважається прочитаним."""
+    user = models.OneToOneField(
+        User, on_delete=models.CASCADE, primary_key=True,
+        related_name='notification_cursor', verbose_name="Користувач"
+    )
+    read_until = models.DateTimeField(verbose_name="Прочитано до")
+
+    class Meta:
+        db_table = 'notification_read_cursors'
+        verbose_name = 'Курсор сповіщень'
+        verbose_name_plural = 'Курсори сповіщень'
+
+
+class BroadcastRead(models.Model):
+    """Окремо прочитане масове сповіщення, новіше за курсор користувача."""
+    user      = models.ForeignKey(User, on_delete=models.CASCADE, related_name='+', verbose_name="Користувач")
+    broadcast = models.ForeignKey(
+        BroadcastNotification, on_delete=models.CASCADE,
+        related_name='reads', verbose_name="Сповіщення"
+    )
+    read_at   = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = 'broadcast_reads'
+        constraints = [models.UniqueConstraint(fields=('user', 'broadcast'), name='uniq_broadcast_read')]
+        verbose_name = 'Прочитане масове сповіщення'
+        verbose_name_plural = 'Прочитані масові сповіщення'
+
+
+class OutboxMessage(models.Model):
+    """
+    Транзакційна черга побічних дій (сповіщення, SMS).
+
+    Запис створюється в тій самій транзакції, що й бізнес-зміна, а виконує
+    його фоновий обробник (python manage.py run_outbox_worker).
+    """
+    STATUS_CHOICES = [
+        ('pending', 'Очікує'),
+        ('done',    'Виконано'),
+        ('dead',    'Помилка (вичерпано спроби)'),
+    ]
+
+    kind         = models.CharField(max_length=30, verbose_name="Тип")
+    payload      = models.JSONField(default=dict, verbose_name="Дані")
+    status       = models.CharField(max_length=10, choices=STATUS_CHOICES, default='pending', verbose_name="Статус")
+    attempts     = models.PositiveSmallIntegerField(default=0, verbose_name="Спроб")
+    available_at = models.DateTimeField(default=timezone.now, verbose_name="Доступне з")
+    last_error   = models.TextField(blank=True, verbose_name="Остання помилка")
+    created_at   = models.DateTimeField(auto_now_add=True)
+    processed_at = models.DateTimeField(null=True, blank=True, verbose_name="Оброблено")
+
+    class Meta:
+        db_table = 'outbox_messages'
+        ordering = ['id']
+        indexes = [
+            models.Index(fields=['status', 'available_at'], name='outbox_pending_idx'),
+            models.Index(fields=['status', 'processed_at'], name='outbox_processed_idx'),
+        ]
+        verbose_name = 'Повідомлення черги'
+        verbose_name_plural = 'Черга повідомлень (outbox)'
+
+    def __str__(self) -> str:
+        return f"#{self.id} {self.kind} [{self.status}]"
+
+
 # ==========================================
 # 6. УРОКИ: МАТЕРІАЛИ ТА ДОМАШНІ ЗАВДАННЯ
 # ==========================================
@@ -738,6 +962,91 @@ class BuildingAccessLog(models.Model):
         return f"{self.student.full_name} - {self.get_action_display()} at {self.timestamp}"
 
 
+# ==========================================
+# 7. АНАЛІТИКА (ДЕНОРМАЛІЗОВАНІ ТАБЛИЦІ)
+# ==========================================
+
+class StudentRiskScore(models.Model):
+    """
+    Інтегральний бал ризику студента (0–100).
+    Оновлюється інкрементально сервісом risk_service при зміні оцінок,
+    пропусків та ДЗ; щоночі перераховується командою recompute_risk_scores.
+    """
+    student = models.OneToOneField(
+        User, on_delete=models.CASCADE, primary_key=True,
+        limit_choices_to={'role': 'student'},
+        related_name='risk_score', verbose_name="Студент"
+    )
+    # Денормалізовано для швидких top-N по групі / курсу
+    group = models.ForeignKey(StudyGroup, on_delete=models.CASCADE, null=True, blank=True, verbose_name="Група")
+    course = models.PositiveSmallIntegerField(null=True, blank=True, verbose_name="Курс")
+
+    score = models.FloatField(default=0, verbose_name="Бал ризику")
+    unexcused_absences = models.PositiveIntegerField(default=0, verbose_name="Неповажні пропуски")
+    grade_trend = models.FloatField(default=0, verbose_name="Тренд оцінок (бал/оцінку)")
+    missing_homework = models.PositiveIntegerField(default=0, verbose_name="Пропущені ДЗ")
+    weighted_grade = models.FloatField(null=True, blank=True, verbose_name="Зважений бал")
+
+    updated_at = models.DateTimeField(auto_now=True, verbose_name="Оновлено")
+
+    class Meta:
+        db_table = 'student_risk_scores'
+        verbose_name = "Ризик студента"
+        verbose_name_plural = "Ризики студентів"
+        indexes = [
+            models.Index(fields=['-score'], name='risk_score_idx'),
+            models.Index(fields=['group', '-score'], name='risk_group_score_idx'),
+            models.Index(fields=['course', '-score'], name='risk_course_score_idx'),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.student_id}: {self.score:.1f}"
+
+
+class StudentSummary(models.Model):
+    """
+    Зведення успішності студента для дашборду: лічильники відвідуваності,
+    сума балів та обмежений буфер останніх оцінок.
+    Підтримується summary_service при кожному записі оцінки чи пропуску.
+    """
+    student = models.OneToOneField(
+        User, on_delete=models.CASCADE, primary_key=True,
+        limit_choices_to={'role': 'student'},
+        related_name='summary', verbose_name="Студент"
+    )
+    lessons_count = models.PositiveIntegerField(default=0, verbose_name="Записів у журналі")
+    graded_count = models.PositiveIntegerField(default=0, verbose_name="Кількість оцінок")
+    points_sum = models.DecimalField(max_digits=10, decimal_places=2, default=0, verbose_name="Сума балів")
+    respectful_absences = models.PositiveIntegerField(default=0, verbose_name="Поважні пропуски")
+    unrespectful_absences = models.PositiveIntegerField(default=0, verbose_name="Неповажні пропуски")
+    # Хронологічний список останніх оцінок:
+    # [{lesson_id, date, time, points, subject, teacher, topic}, ...]
+    recent_grades = models.JSONField(default=list, blank=True, verbose_name="Останні оцінки")
+
+    updated_at = models.DateTimeField(auto_now=True, verbose_name="Оновлено")
+
+    class Meta:
+        db_table = 'student_summaries'
+        verbose_name = "Зведення студента"
+        verbose_name_plural = "Зведення студентів"
+
+    def __str__(self) -> str:
+        return f"{self.student_id}: {self.avg_score}"
+
+    @property
+    def avg_score(self) -> float:
+        """Середній бал по всіх оцінках."""
+        return round(float(self.points_sum) / self.graded_count, 1) if self.graded_count else 0
+
+    @property
+    def present_count(self) -> int:
+        return self.lessons_count - self.respectful_absences - self.unrespectful_absences
+
+    @property
+    def attendance_percent(self) -> float:
+        return round(self.present_count / self.lessons_count * 100, 1) if self.lessons_count else 0
+
+
 # =============================================
 # SIGNALS
 # =============================================
@@ -759,3 +1068,257 @@ def create_default_homework_eval_type(sender, instance, created, **kwargs):
                 'order': 0,
             }
         )
+
+
+# --- Інкрементальне оновлення балу ризику ---
+# Реєструються раніше за інвалідацію дашбордів, тож on_commit-перерахунок
+# ризику виконується до скидання знімків, що читають StudentRiskScore.
+
+from django.db import transaction
+from django.db.models.signals import post_delete, pre_save
+
+
+@receiver([post_save, post_delete], sender=StudentPerformance)
+def update_risk_on_performance_change(sender, instance, **kwargs):
+    """Оцінка чи пропуск змінює ризик лише одного студента."""
+    from main.services.risk_service import recalculate_risk
+    student_id = instance.student_id
+    transaction.on_commit(lambda: recalculate_risk([student_id]))
+
+
+@receiver([post_save, post_delete], sender=HomeworkSubmission)
+def update_risk_on_submission_change(sender, instance, **kwargs):
+    """Здача/видалення ДЗ: перерахунок студента та скидання дашбордів групи."""
+    from main.services.risk_service import recalculate_risk
+    from main.services.dashboard_service import invalidate_group_dashboards
+    student_id = instance.student_id
+    try:
+        group_id, teacher_id = instance.lesson.group_id, instance.lesson.teacher_id
+    except Lesson.DoesNotExist:
+        return  # урок видаляється каскадно — група перерахується його сигналом
+    transaction.on_commit(lambda: (
+        recalculate_risk([student_id]),
+        invalidate_group_dashboards(group_id, [teacher_id]),
+    ))
+
+
+def _lesson_risk_inputs(group_id, homework, deadline, is_cancelled) -> tuple:
+    """Поля уроку, від яких залежить лічильник пропущених ДЗ групи."""
+    return (group_id, bool(homework) and deadline is not None, deadline, is_cancelled)
+
+
+@receiver([post_save, post_delete], sender=Lesson)
+def update_risk_on_lesson_change(sender, instance, **kwargs):
+    """
+    Урок з ДЗ і дедлайном впливає на лічильник пропущених ДЗ усієї групи:
+    перерахунок, якщо ДЗ, дедлайн, скасування чи група змінились і урок
+    з ДЗ до або після зміни (знімок — remember_lesson_owners).
+    """
+    current = _lesson_risk_inputs(instance.group_id, instance.homework, instance.deadline, instance.is_cancelled)
+    previous = getattr(instance, '_previous_risk_inputs', None) if 'created' in kwargs else None
+    if previous == current:
+        return
+    group_ids = {state[0] for state in (previous, current) if state and state[1] and state[0]}
+    if not group_ids:
+        return
+    from main.services.risk_service import recalculate_group_risk
+    transaction.on_commit(lambda: [recalculate_group_risk(group_id) for group_id in group_ids])
+
+
+@receiver(pre_save, sender=User)
+def remember_student_group(sender, instance, update_fields=None, **kwargs):
+    """Попередня група студента (запит лише якщо група могла змінитись)."""
+    instance._previous_group_id = instance.group_id
+    if instance.pk and instance.role == 'student' and (update_fields is None or 'group' in update_fields):
+        instance._previous_group_id = User.objects.filter(pk=instance.pk).values_list('group_id', flat=True).first()
+
+
+@receiver(post_save, sender=User)
+def update_risk_on_group_change(sender, instance, created, **kwargs):
+    """Перехід студента в іншу групу змінює його лічильник ДЗ, групу та курс у StudentRiskScore."""
+    if instance.role != 'student':
+        return
+    if created and not instance.group_id:
+        return
+    if not created and getattr(instance, '_previous_group_id', instance.group_id) == instance.group_id:
+        return
+    from main.services.risk_service import recalculate_risk
+    student_id = instance.id
+    transaction.on_commit(lambda: recalculate_risk([student_id]))
+
+
+# --- Підтримка зведень студентів (StudentSummary) ---
+
+@receiver([post_save, post_delete], sender=StudentPerformance)
+def update_summary_on_performance_change(sender, instance, **kwargs):
+    """Оцінка чи пропуск оновлює лічильники та буфер останніх оцінок студента."""
+    from main.services.summary_service import apply_performance_change
+    student_id, lesson_id = instance.student_id, instance.lesson_id
+    transaction.on_commit(lambda: apply_performance_change(student_id, lesson_id))
+
+
+@receiver(post_save, sender=Lesson)
+def update_summaries_on_lesson_change(sender, instance, created, **kwargs):
+    """Дата/тема/предмет уроку зберігаються в буферах оцінених студентів."""
+    if created:
+        return
+    from main.services.summary_service import refresh_lesson_entries
+    lesson_id = instance.id
+    transaction.on_commit(lambda: refresh_lesson_entries(lesson_id))
+
+
+# --- Індекс найближчих занять ---
+
+@receiver(pre_save, sender=Lesson)
+def remember_lesson_owners(sender, instance, **kwargs):
+    """
+    Запам'ятовує попередні групу/викладача/дату, щоб перенесений урок зник зі
+    старих індексів, та поля ДЗ для ризику (update_risk_on_lesson_change) — одним запитом.
+    """
+    instance._previous_owners = None
+    instance._previous_risk_inputs = None
+    if instance.pk:
+        previous = Lesson.objects.filter(pk=instance.pk).values_list(
+            'group_id', 'teacher_id', 'date', 'homework', 'deadline', 'is_cancelled',
+        ).first()
+        if previous:
+            group_id, teacher_id, day, homework, deadline, is_cancelled = previous
+            instance._previous_owners = (group_id, teacher_id, day)
+            instance._previous_risk_inputs = _lesson_risk_inputs(group_id, homework, deadline, is_cancelled)
+
+
+@receiver([post_save, post_delete], sender=Lesson)
+def invalidate_upcoming_on_lesson_change(sender, instance, **kwargs):
+    """Створення, скасування, перенесення чи видалення уроку скидає індекси."""
+    from main.services.upcoming_service import invalidate_upcoming
+    group_ids, teacher_ids = [instance.group_id], [instance.teacher_id]
+    previous = getattr(instance, '_previous_owners', None)
+    if previous:
+        group_ids.append(previous[0])
+        teacher_ids.append(previous[1])
+    transaction.on_commit(lambda: invalidate_upcoming(group_ids, teacher_ids))
+
+
+# --- Тижневий таймлайн групи ---
+
+@receiver([post_save, post_delete], sender=Lesson)
+def invalidate_timeline_on_lesson_change(sender, instance, **kwargs):
+    """Урок змінює кешований тиждень своєї групи (і старий тиждень при перенесенні)."""
+    from main.services.timeline_service import invalidate_timeline
+    entries = [(instance.group_id, instance.date)]
+    previous = getattr(instance, '_previous_owners', None)
+    if previous:
+        entries.append((previous[0], previous[2]))
+    transaction.on_commit(lambda: invalidate_timeline(entries))
+
+
+@receiver([post_save, post_delete], sender=TimeSlot)
+def invalidate_bells_on_change(sender, instance, **kwargs):
+    """Розклад дзвінків кешується разом з похідними від нього тижнями таймлайну."""
+    from main.services.bell_schedule_service import invalidate_bell_schedule
+    from main.services.timeline_service import invalidate_all_timelines
+
+    def invalidate():
+        invalidate_bell_schedule()
+        invalidate_all_timelines()
+
+    transaction.on_commit(invalidate)
+
+
+# --- Конструктор розкладу: мапа предмет -> викладачі ---
+
+@receiver([post_save, post_delete], sender=TeachingAssignment)
+@receiver([post_save, post_delete], sender=Subject)
+def invalidate_subject_teachers_on_change(sender, instance, **kwargs):
+    from main.services.schedule_builder_service import invalidate_subject_teachers_map
+    transaction.on_commit(invalidate_subject_teachers_map)
+
+
+@receiver(post_save, sender=User)
+def invalidate_subject_teachers_on_teacher_change(sender, instance, update_fields=None, **kwargs):
+    """ПІБ викладача показується у випадаючих списках конструктора."""
+    if instance.role != 'teacher' or update_fields == frozenset({'last_login'}):
+        return
+    from main.services.schedule_builder_service import invalidate_subject_teachers_map
+    transaction.on_commit(invalidate_subject_teachers_map)
+
+
+# --- Інтервальний індекс розкладу ---
+
+@receiver([post_save, post_delete], sender=ScheduleTemplate)
+def invalidate_schedule_index_on_template_change(sender, instance, **kwargs):
+    """Будь-яка зміна шаблону скидає кешований індекс перевірки конфліктів."""
+    from main.services.schedule_index import invalidate_schedule_index
+    transaction.on_commit(invalidate_schedule_index)
+
+
+@receiver([post_save, post_delete], sender=ScheduleTemplate)
+def record_schedule_version_on_template_change(sender, instance, **kwargs):
+    """
+    Поштучні зміни (адмінка, редактор слоту) теж потрапляють в історію.
+    Пакетні збереження фіксують версію самі; повторний знімок без змін нічого не пише.
+    """
+    from main.services.schedule_version_service import record_versions_on_commit
+    record_versions_on_commit(instance.group_id)
+
+
+# --- Інвалідація кешованих дашбордів ---
+
+@receiver([post_save, post_delete], sender=Lesson)
+def invalidate_dashboards_on_lesson_change(sender, instance, **kwargs):
+    """Скидає знімки дашбордів викладачів групи після зміни уроку."""
+    from main.services.dashboard_service import invalidate_group_dashboards
+    group_id, teacher_id = instance.group_id, instance.teacher_id
+    transaction.on_commit(lambda: invalidate_group_dashboards(group_id, [teacher_id]))
+
+
+@receiver([post_save, post_delete], sender=StudentPerformance)
+def invalidate_dashboards_on_performance_change(sender, instance, **kwargs):
+    """Скидає знімки дашбордів після виставлення оцінки чи пропуску."""
+    from main.services.dashboard_service import invalidate_group_dashboards
+    try:
+        lesson = instance.lesson
+    except Lesson.DoesNotExist:
+        return  # урок видаляється каскадно — його власний сигнал уже спрацював
+    group_id, teacher_id = lesson.group_id, lesson.teacher_id
+    transaction.on_commit(lambda: invalidate_group_dashboards(group_id, [teacher_id]))
+
+
+@receiver([post_save, post_delete], sender=TeachingAssignment)
+def invalidate_dashboards_on_assignment_change(sender, instance, **kwargs):
+    """Нове/видалене навантаження змінює перелік груп на дашборді викладача."""
+    from main.services.dashboard_service import invalidate_teacher_dashboards
+    teacher_id = instance.teacher_id
+    transaction.on_commit(lambda: invalidate_teacher_dashboards([teacher_id]))
+
+
+# --- Лічильники непрочитаних сповіщень ---
+
+@receiver(post_save, sender=Notification)
+def count_new_notification(sender, instance, created, **kwargs):
+    if not created:
+        return
+    from main.services.notification_service import on_notification_created
+    recipient_id = instance.recipient_id
+    transaction.on_commit(lambda: on_notification_created(recipient_id))
+
+
+@receiver(post_delete, sender=Notification)
+def recount_on_notification_delete(sender, instance, **kwargs):
+    from main.services.notification_service import on_notifications_deleted
+    recipient_id = instance.recipient_id
+    transaction.on_commit(lambda: on_notifications_deleted([recipient_id]))
+
+
+@receiver([post_save, post_delete], sender=BroadcastNotification)
+def recount_on_broadcast_change(sender, instance, **kwargs):
+    from main.services.notification_service import on_broadcasts_changed
+    transaction.on_commit(on_broadcasts_changed)
+
+
+@receiver([post_save, post_delete], sender=TeachingAssignment)
+def recount_teacher_broadcasts_on_assignment_change(sender, instance, **kwargs):
+    """Групові масові сповіщення викладача залежать від його навантажень."""
+    from main.services.notification_service import invalidate_broadcast_unread
+    teacher_id = instance.teacher_id
+    transaction.on_commit(lambda: invalidate_broadcast_unread([teacher_id]))
@@ -0,0 +1,206 @@
+"""
+Availability Service - бітові матриці зайнятості викладачів, аудиторій та груп
+
+Цей модуль містить:
+- FreeBusyMatrix: для кожного ресурсу й дня тижня — бітова маска зайнятості
+  з кроком TICK_MINUTES (біт = 5 хвилин доби), побудована одним запитом
+- Перевірку вільності інтервалу однією операцією AND над масками (з тим
+  самим винятком спільної пари, що й у validate_schedule_slot) та
+  пошук спільних вільних вікон кількох ресурсів через OR
+- Кешування матриці разом з інтервальним індексом (спільна інвалідація,
+  див. schedule_index.invalidate_schedule_index)
+
+Маски — звичайні int Python: AND/OR виконуються над усім днем одразу
+(288 біт), без циклів по хвилинах чи шаблонах.
+"""
+
+from dataclasses import dataclass, field
+from datetime import time
+from typing import Iterable, NamedTuple, Optional
+
+from django.core.cache import cache
+
+from main.models import ScheduleTemplate
+from main.services.schedule_index import FREEBUSY_KEY, RESOURCE_KINDS, SCHEDULE_INDEX_TTL, to_minutes
+
+TICK_MINUTES = 5
+TICKS_PER_DAY = 24 * 60 // TICK_MINUTES
+
+
+def interval_mask(start: int, end: int) -> int:
+    """
+    Маска тіків, що перетинаються з [start, end) хвилин. Час поза сіткою
+    округлюється назовні, тож перевірка лишається консервативною.
+
+    Example:
+        >>> bin(interval_mask(10, 20))
+        '0b1100'
+    """
+    lo = max(start // TICK_MINUTES, 0)
+    hi = min(-(-end // TICK_MINUTES), TICKS_PER_DAY)
+    return ((1 << (hi - lo)) - 1) << lo if hi > lo else 0
+
+
+def slot_mask(start_time: time, duration: int) -> int:
+    start = to_minutes(start_time)
+    return interval_mask(start, start + duration)
+
+
+class _Entry(NamedTuple):
+    """Внесок одного шаблону в маску ресурсу."""
+    template_id: int
+    mask: int
+    subject_id: int
+    start: int  # хвилини від початку доби
+    teacher_id: Optional[int]
+
+
+def _is_shared_lesson(kind: str, entry: _Entry, subject_id: int, start: int, teacher_id: Optional[int]) -> bool:
+    """Спільна пара, як у validate_schedule_slot: викладач — той самий предмет і початок, аудиторія — ще й викладач."""
+    if kind == 'teacher':
+        return entry.subject_id == subject_id and entry.start == start
+    if kind == 'classroom':
+        return entry.subject_id == subject_id and entry.start == start and entry.teacher_id == teacher_id
+    return False
+
+
+@dataclass
+class FreeBusyMatrix:
+    """Маски зайнятості: (вид ресурсу, ID, день) -> int."""
+    busy: dict[tuple[str, int, int], int] = field(default_factory=dict)
+    # Внески окремих шаблонів — щоб "забути" слот, який зараз редагується, чи спільну пару
+    entries: dict[tuple[str, int, int], list[_Entry]] = field(default_factory=dict)
+    by_template: dict[int, list[tuple[str, int, int]]] = field(default_factory=dict)
+
+    @classmethod
+    def load(cls) -> 'FreeBusyMatrix':
+        """Побудова з усіх шаблонів розкладу (1 запит)."""
+        matrix = cls()
+        rows = ScheduleTemplate.objects.values_list(
+            'id', 'day_of_week', 'start_time', 'duration_minutes', 'group_id', 'teacher_id', 'classroom_id',
+            'subject_id',
+        )
+        for pk, day, start_time, duration, group_id, teacher_id, classroom_id, subject_id in rows:
+            mask = slot_mask(start_time, duration)
+            entry = _Entry(pk, mask, subject_id, to_minutes(start_time), teacher_id)
+            for kind, resource_id in zip(RESOURCE_KINDS, (group_id, teacher_id, classroom_id)):
+                if not resource_id:
+                    continue
+                key = (kind, resource_id, day)
+                matrix.busy[key] = matrix.busy.get(key, 0) | mask
+                matrix.entries.setdefault(key, []).append(entry)
+                matrix.by_template.setdefault(pk, []).append(key)
+        return matrix
+
+    def busy_mask(
+        self,
+        kind: str,
+        resource_id: int,
+        day: int,
+        exclude_template_id: Optional[int] = None,
+        subject_id: Optional[int] = None,
+        start: Optional[int] = None,
+        teacher_id: Optional[int] = None,
+    ) -> int:
+        """
+        Маска зайнятості ресурсу за день. Якщо задано subject_id і start (хвилини)
+        слоту, що перевіряється, шаблони спільної пари з ним не враховуються.
+        """
+        key = (kind, resource_id, day)
+        excluding = exclude_template_id and key in self.by_template.get(exclude_template_id, ())
+        shared = subject_id is not None and start is not None and kind != 'group'
+        if not excluding and not shared:
+            return self.busy.get(key, 0)
+        mask = 0
+        for entry in self.entries.get(key, ()):
+            if entry.template_id == exclude_template_id:
+                continue
+            if shared and _is_shared_lesson(kind, entry, subject_id, start, teacher_id):
+                continue
+            mask |= entry.mask
+        return mask
+
+    def is_free(
+        self,
+        kind: str,
+        resource_id: int,
+        day: int,
+        start_time: time,
+        duration: int,
+        exclude_template_id: Optional[int] = None,
+        subject_id: Optional[int] = None,
+        teacher_id: Optional[int] = None,
+    ) -> bool:
+        busy = self.busy_mask(
+            kind, resource_id, day, exclude_template_id, subject_id, to_minutes(start_time), teacher_id,
+        )
+        return not busy & slot_mask(start_time, duration)
+
+    def free_resources(
+        self,
+        kind: str,
+        resource_ids: Iterable[int],
+        day: int,
+        start_time: time,
+        duration: int,
+        exclude_template_id: Optional[int] = None,
+        subject_id: Optional[int] = None,
+        teacher_id: Optional[int] = None,
+    ) -> list[int]:
+        """
+        ID ресурсів, вільних на весь інтервал (порядок вхідного списку зберігається).
+
+        subject_id/teacher_id — предмет і викладач слоту: з ними спільна пара
+        не вважається зайнятістю (збереження такого слоту пройде валідацію).
+        """
+        wanted = slot_mask(start_time, duration)
+        start = to_minutes(start_time)
+        return [
+            rid for rid in resource_ids
+            if not self.busy_mask(kind, rid, day, exclude_template_id, subject_id, start, teacher_id) & wanted
+        ]
+
+    def common_free_windows(
+        self,
+        resources: Iterable[tuple[str, int]],
+        day: int,
+        day_start: time = time(8, 0),
+        day_end: time = time(18, 0),
+        min_duration: int = TICK_MINUTES,
+    ) -> list[tuple[time, time]]:
+        """
+        Вікна, коли вільні всі передані ресурси одночасно (напр. група +
+        викладач + аудиторія), тривалістю не менше min_duration.
+        """
+        busy = 0
+        for kind, resource_id in resources:
+            busy |= self.busy.get((kind, resource_id, day), 0)
+        lo, hi = to_minutes(day_start) // TICK_MINUTES, -(-to_minutes(day_end) // TICK_MINUTES)
+        min_ticks = -(-min_duration // TICK_MINUTES)
+
+        windows = []
+        tick = lo
+        while tick < hi:
+            if busy >> tick & 1:
+                tick += 1
+                continue
+            start = tick
+            while tick < hi and not busy >> tick & 1:
+                tick += 1
+            if tick - start >= min_ticks:
+                windows.append((_tick_time(start), _tick_time(tick)))
+        return windows
+
+
+def _tick_time(tick: int) -> time:
+    minutes = min(tick * TICK_MINUTES, 24 * 60 - 1)
+    return time(minutes // 60, minutes % 60)
+
+
+def get_freebusy_matrix() -> FreeBusyMatrix:
+    """Матриця з кешу; будується при промаху."""
+    matrix = cache.get(FREEBUSY_KEY)
+    if matrix is None:
+        matrix = FreeBusyMatrix.load()
+        cache.set(FREEBUSY_KEY, matrix, SCHEDULE_INDEX_TTL)
+    return matrix
@@ -0,0 +1,110 @@
+"""
+Bell Schedule Service - єдиний розклад дзвінків
+
+Цей модуль містить:
+- BellSchedule: незмінна структура слотів з мапами
+  "час початку -> номер пари" та "номер пари -> інтервал"
+- Завантаження активних TimeSlot одним запитом (або DEFAULT_TIME_SLOTS,
+  якщо дзвінки ще не налаштовані) та кешування результату
+- Інвалідацію кешу при зміні TimeSlot (див. сигнали в models.py)
+
+Усі місця, яким потрібні години пар (конструктор розкладу, шаблонні теги
+журналу, Lesson.lesson_number, генератор розкладу, таймлайн), беруть їх
+звідси замість власних таблиць часу.
+"""
+
+from dataclasses import dataclass
+from datetime import time
+from types import MappingProxyType
+from typing import Mapping, Optional
+
+from django.core.cache import cache
+
+from main.constants import DEFAULT_TIME_SLOTS
+from main.models import TimeSlot
+
+BELL_SCHEDULE_KEY = 'bells:schedule'
+BELL_SCHEDULE_TTL = 60 * 60 * 24  # сек
+
+
+@dataclass(frozen=True)
+class Bell:
+    lesson_number: int
+    start_time: time
+    end_time: time
+
+    @property
+    def duration_minutes(self) -> int:
+        return (self.end_time.hour * 60 + self.end_time.minute) - (self.start_time.hour * 60 + self.start_time.minute)
+
+    def label(self) -> str:
+        return f"{self.start_time.strftime('%H:%M')} - {self.end_time.strftime('%H:%M')}"
+
+
+class BellSchedule:
+    """Слоти, впорядковані за номером пари, з O(1) пошуком в обидва боки."""
+
+    __slots__ = ('bells', '_by_number', '_by_start')
+
+    def __init__(self, bells: tuple[Bell, ...]):
+        self.bells = bells
+        self._by_number = MappingProxyType({b.lesson_number: b for b in bells})
+        self._by_start = MappingProxyType({b.start_time: b.lesson_number for b in bells})
+
+    def __reduce__(self):
+        # У кеш потрапляє лише кортеж слотів, мапи відновлюються при читанні
+        return (BellSchedule, (self.bells,))
+
+    def __iter__(self):
+        return iter(self.bells)
+
+    def __len__(self) -> int:
+        return len(self.bells)
+
+    @property
+    def numbers(self) -> list[int]:
+        return [b.lesson_number for b in self.bells]
+
+    @property
+    def by_number(self) -> Mapping[int, Bell]:
+        return self._by_number
+
+    def get(self, lesson_number) -> Optional[Bell]:
+        try:
+            return self._by_number.get(int(lesson_number))
+        except (TypeError, ValueError):
+            return None
+
+    def number_for(self, start_time: time) -> int:
+        """Номер пари за часом початку; 0, якщо урок не збігається з дзвінком."""
+        return self._by_start.get(start_time, 0)
+
+    def start_for(self, lesson_number) -> Optional[time]:
+        bell = self.get(lesson_number)
+        return bell.start_time if bell else None
+
+    def interval(self, lesson_number) -> Optional[tuple[time, time]]:
+        bell = self.get(lesson_number)
+        return (bell.start_time, bell.end_time) if bell else None
+
+
+def load_bell_schedule() -> BellSchedule:
+    """Активні дзвінки з БД (1 запит) або стандартні, якщо таблиця порожня."""
+    rows = list(
+        TimeSlot.objects.filter(is_active=True).order_by('lesson_number')
+        .values_list('lesson_number', 'start_time', 'end_time')
+    ) or [(num, start, end) for num, (start, end) in sorted(DEFAULT_TIME_SLOTS.items())]
+    return BellSchedule(tuple(Bell(num, start, end) for num, start, end in rows))
+
+
+def get_bell_schedule() -> BellSchedule:
+    """Розклад дзвінків з кешу; будується при промаху."""
+    schedule = cache.get(BELL_SCHEDULE_KEY)
+    if schedule is None:
+        schedule = load_bell_schedule()
+        cache.set(BELL_SCHEDULE_KEY, schedule, BELL_SCHEDULE_TTL)
+    return schedule
+
+
+def invalidate_bell_schedule() -> None:
+    cache.delete(BELL_SCHEDULE_KEY)
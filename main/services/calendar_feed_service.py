@@ -0,0 +1,281 @@
+"""
+Calendar Feed Service - підписні iCalendar (.ics) стрічки розкладу
+
+Цей модуль містить функції для:
+- Підписаних токенів стрічки групи, викладача чи аудиторії (без сесії:
+  календарні застосунки не вміють логінитись). Токен прив'язаний до
+  користувача та його солі: скидання солі відкликає всі його посилання,
+  а доступ перевіряється заново на кожен запит
+- Версії стрічки двома агрегатними запитами (останнє оновлення та кількість
+  уроків і шаблонів) — з неї будується ETag, тож періодичне опитування
+  календарем коштує 304 без рендеру. Last-Modified не віддається: видалення
+  уроків і зсув вікна не збільшують max(updated_at)
+- Рендеру VCALENDAR з матеріалізованих уроків та проєкції активних
+  шаблонів розкладу на тижні, для яких уроки ще не створені
+- Кешування тіла стрічки під ключем, що містить її версію (окрема
+  інвалідація не потрібна: нова версія — новий ключ)
+"""
+
+import hashlib
+import secrets
+from datetime import date, datetime, time, timedelta, timezone as dt_timezone
+from typing import Optional
+
+from django.core import signing
+from django.core.cache import cache
+from django.db.models import Count, Max
+from django.utils import timezone
+from django.utils.crypto import constant_time_compare
+
+from main.models import Holiday, Lesson, ScheduleTemplate, User
+
+FEED_KINDS = {'group': 'group_id', 'teacher': 'teacher_id', 'classroom': 'classroom_id'}
+FEED_TOKEN_SALT = 'main.calendar_feed'
+FEED_PAST_DAYS = 30
+FEED_FUTURE_DAYS = 180
+FEED_CACHE_TTL = 60 * 60 * 24  # сек
+PRODID = '-//MyBosco//Розклад//UK'
+
+_LESSON_FIELDS = (
+    'id', 'date', 'start_time', 'end_time', 'topic', 'homework', 'is_cancelled', 'cancellation_reason',
+    'updated_at', 'subject__name', 'group__name', 'teacher__full_name', 'classroom__name',
+)
+_TEMPLATE_FIELDS = (
+    'id', 'day_of_week', 'start_time', 'duration_minutes', 'valid_from', 'valid_to', 'updated_at',
+    'subject__name', 'group__name', 'teacher__full_name', 'classroom__name',
+)
+
+
+# ==========================================
+# ТОКЕНИ
+# ==========================================
+
+def can_subscribe(user: User, kind: str, object_id: int) -> bool:
+    """Адміністратор — будь-яка стрічка, викладач — власна, студент — своєї групи."""
+    if not user.is_active:
+        return False
+    if user.role == 'admin':
+        return True
+    if user.role == 'teacher':
+        return kind == 'teacher' and object_id == user.id
+    return kind == 'group' and object_id == user.group_id
+
+
+def _feed_salt(user: User) -> str:
+    if not user.calendar_feed_salt:
+        # Умова на порожню сіль — паралельні запити не перезапишуть одне одного
+        User.objects.filter(pk=user.pk, calendar_feed_salt='').update(calendar_feed_salt=secrets.token_hex(16))
+        user.calendar_feed_salt = User.objects.values_list('calendar_feed_salt', flat=True).get(pk=user.pk)
+    return user.calendar_feed_salt
+
+
+def make_feed_token(user: User, kind: str, object_id: int) -> str:
+    """Підписаний токен стрічки для користувача; діє, доки не скинуто його сіль."""
+    if kind not in FEED_KINDS:
+        raise ValueError(f"Невідомий тип стрічки: {kind}")
+    return signing.dumps([kind, int(object_id), user.pk, _feed_salt(user)], salt=FEED_TOKEN_SALT, compress=True)
+
+
+def revoke_feed_tokens(user: User) -> None:
+    """Відкликає всі видані користувачу посилання на стрічки."""
+    user.calendar_feed_salt = secrets.token_hex(16)
+    User.objects.filter(pk=user.pk).update(calendar_feed_salt=user.calendar_feed_salt)
+
+
+def parse_feed_token(token: str) -> Optional[tuple[str, int]]:
+    """(вид, ID) або None для підробленого, відкликаного чи вже недоступного користувачу токена."""
+    try:
+        kind, object_id, user_id, salt = signing.loads(token, salt=FEED_TOKEN_SALT)
+    except (signing.BadSignature, TypeError, ValueError):
+        return None
+    if kind not in FEED_KINDS or not isinstance(object_id, int) or not isinstance(salt, str):
+        return None
+    user = User.objects.filter(pk=user_id).only('is_active', 'role', 'group_id', 'calendar_feed_salt').first()
+    if user is None or not user.calendar_feed_salt or not constant_time_compare(user.calendar_feed_salt, salt):
+        return None
+    if not can_subscribe(user, kind, object_id):
+        return None
+    return kind, object_id
+
+
+# ==========================================
+# ВЕРСІЯ СТРІЧКИ
+# ==========================================
+
+def feed_window(today: date) -> tuple[date, date]:
+    return today - timedelta(days=FEED_PAST_DAYS), today + timedelta(days=FEED_FUTURE_DAYS)
+
+
+def get_feed_version(kind: str, object_id: int, today: date) -> dict:
+    """
+    Версія стрічки (3 запити): будь-яке збереження уроку чи шаблону змінює
+    max(updated_at), видалення — кількість, зсув вікна — дату в ключі;
+    святкові дні вікна (на них не проєктуються шаблони) входять у ключ списком дат.
+    Тому вона віддається лише як ETag (час останньої зміни не змінюється
+    від видалень, тож Last-Modified давав би 304 зі старими подіями).
+
+    Returns:
+        {'etag': str, 'materialized_until': date | None}
+    """
+    field = FEED_KINDS[kind]
+    window_from, window_to = feed_window(today)
+    lessons = Lesson.objects.filter(**{field: object_id}, date__range=(window_from, window_to)).aggregate(
+        last=Max('updated_at'), count=Count('id'), until=Max('date'),
+    )
+    templates = ScheduleTemplate.objects.filter(**{field: object_id}, is_active=True).aggregate(
+        last=Max('updated_at'), count=Count('id'),
+    )
+    holidays = Holiday.objects.filter(date__range=(window_from, window_to)).order_by('date').values_list('date', flat=True)
+    stamps = [stamp for stamp in (lessons['last'], templates['last']) if stamp]
+    last_modified = max(stamps) if stamps else None
+
+    # Дата в ключі: вікно стрічки зсувається щодня
+    raw = (
+        f"{kind}:{object_id}:{today.isoformat()}:{last_modified.isoformat() if last_modified else '-'}:"
+        f"{lessons['count']}:{templates['count']}:{','.join(day.isoformat() for day in holidays)}"
+    )
+    return {
+        'etag': hashlib.md5(raw.encode()).hexdigest(),
+        'materialized_until': lessons['until'],
+    }
+
+
+# ==========================================
+# РЕНДЕР
+# ==========================================
+
+def _escape(value: str) -> str:
+    """Екранування TEXT-значень за RFC 5545 (3.3.11)."""
+    return (
+        (value or '').replace('\\', '\\\\').replace(';', '\\;').replace(',', '\\,')
+        .replace('\r\n', '\\n').replace('\n', '\\n')
+    )
+
+
+def _fold(line: str) -> str:
+    """Перенесення рядків довших за 75 октетів (RFC 5545, 3.1), без розриву UTF-8 символів."""
+    if len(line.encode()) <= 75:
+        return line
+    parts, current, size = [], '', 0
+    for char in line:
+        char_size = len(char.encode())
+        if size + char_size > (75 if not parts else 74):
+            parts.append(current)
+            current, size = '', 0
+        current += char
+        size += char_size
+    parts.append(current)
+    return '\r\n '.join(parts)
+
+
+def _utc(day: date, at: time) -> str:
+    local = timezone.make_aware(datetime.combine(day, at))
+    return local.astimezone(dt_timezone.utc).strftime('%Y%m%dT%H%M%SZ')
+
+
+def _stamp(value: Optional[datetime]) -> str:
+    return (value or timezone.now()).astimezone(dt_timezone.utc).strftime('%Y%m%dT%H%M%SZ')
+
+
+def _summary(kind: str, subject: str, group: str) -> str:
+    # У стрічці групи назва групи зайва; викладачу й аудиторії вона потрібна
+    return subject if kind == 'group' else f"{subject} ({group})"
+
+
+def _event(uid: str, start: str, end: str, stamp: str, summary: str, location: str,
+           description: list[str], cancelled: bool = False) -> list[str]:
+    lines = [
+        'BEGIN:VEVENT',
+        f'UID:{uid}',
+        f'DTSTAMP:{stamp}',
+        f'DTSTART:{start}',
+        f'DTEND:{end}',
+        f'SUMMARY:{_escape(summary)}',
+    ]
+    if location:
+        lines.append(f'LOCATION:{_escape(location)}')
+    if description:
+        lines.append(f"DESCRIPTION:{_escape(chr(10).join(description))}")
+    if cancelled:
+        lines.append('STATUS:CANCELLED')
+    lines.append('END:VEVENT')
+    return lines
+
+
+def render_feed(kind: str, object_id: int, today: date, materialized_until: Optional[date] = None,
+                name: str = '') -> str:
+    """
+    VCALENDAR ресурсу: уроки вікна стрічки як окремі події та шаблони,
+    спроєктовані на дні після останнього матеріалізованого уроку
+    (шаблони чисельника/знаменника проєктуються лише через уроки).
+    """
+    field = FEED_KINDS[kind]
+    window_from, window_to = feed_window(today)
+    lines = [
+        'BEGIN:VCALENDAR',
+        'VERSION:2.0',
+        f'PRODID:{PRODID}',
+        'CALSCALE:GREGORIAN',
+        'METHOD:PUBLISH',
+        f'X-WR-CALNAME:{_escape(name or "Розклад")}',
+        f'X-WR-TIMEZONE:{timezone.get_current_timezone_name()}',
+        'REFRESH-INTERVAL;VALUE=DURATION:PT1H',
+        'X-PUBLISHED-TTL:PT1H',
+    ]
+
+    lessons = Lesson.objects.filter(**{field: object_id}, date__range=(window_from, window_to)).values(
+        *_LESSON_FIELDS
+    ).order_by('date', 'start_time')
+    for row in lessons:
+        description = [row['teacher__full_name'] or '', row['topic'] or '']
+        if row['homework']:
+            description.append(f"ДЗ: {row['homework']}")
+        if row['is_cancelled'] and row['cancellation_reason']:
+            description.append(f"Скасовано: {row['cancellation_reason']}")
+        lines += _event(
+            uid=f"lesson-{row['id']}@mybosco",
+            start=_utc(row['date'], row['start_time']),
+            end=_utc(row['date'], row['end_time']),
+            stamp=_stamp(row['updated_at']),
+            summary=_summary(kind, row['subject__name'], row['group__name']),
+            location=row['classroom__name'] or '',
+            description=[line for line in description if line],
+            cancelled=row['is_cancelled'],
+        )
+
+    project_from = max(materialized_until + timedelta(days=1) if materialized_until else today, today)
+    if project_from <= window_to:
+        holidays = set(Holiday.objects.filter(date__range=(project_from, window_to)).values_list('date', flat=True))
+        templates = ScheduleTemplate.objects.filter(
+            **{field: object_id}, is_active=True, week_type='',
+        ).values(*_TEMPLATE_FIELDS)
+        for row in templates:
+            first = project_from + timedelta(days=(row['day_of_week'] - 1 - project_from.weekday()) % 7)
+            last = min(window_to, row['valid_to']) if row['valid_to'] else window_to
+            day = first
+            while day <= last:
+                if day >= row['valid_from'] and day not in holidays:
+                    start = datetime.combine(day, row['start_time'])
+                    lines += _event(
+                        uid=f"template-{row['id']}-{day:%Y%m%d}@mybosco",
+                        start=_utc(day, row['start_time']),
+                        end=_utc(day, (start + timedelta(minutes=row['duration_minutes'])).time()),
+                        stamp=_stamp(row['updated_at']),
+                        summary=_summary(kind, row['subject__name'], row['group__name']),
+                        location=row['classroom__name'] or '',
+                        description=[row['teacher__full_name']] if row['teacher__full_name'] else [],
+                    )
+                day += timedelta(days=7)
+
+    lines.append('END:VCALENDAR')
+    return '\r\n'.join(_fold(line) for line in lines) + '\r\n'
+
+
+def get_feed_body(kind: str, object_id: int, today: date, version: dict, name: str = '') -> str:
+    """Тіло стрічки з кешу; рендериться при промаху (ключ містить ETag)."""
+    key = f"ics:{kind}:{object_id}:{version['etag']}"
+    body = cache.get(key)
+    if body is None:
+        body = render_feed(kind, object_id, today, version['materialized_until'], name)
+        cache.set(key, body, FEED_CACHE_TTL)
+    return body
@@ -0,0 +1,110 @@
+"""
+Dashboard Service - попередньо обчислені знімки дашбордів
+
+Цей модуль містить функції для:
+- Побудови знімка дашборду викладача (тижневе навантаження, пари на сьогодні, радар ризику)
+- Кешування знімка та його інвалідації при змінах Lesson / StudentPerformance / HomeworkSubmission
+
+Кожна секція знімка рахується одним згрупованим запитом, а сам знімок
+живе в кеші до першої зміни занять чи оцінок у групах викладача.
+"""
+
+from datetime import date, timedelta
+from typing import Iterable, Optional
+
+from django.core.cache import cache
+from django.db.models import Count
+
+from main.models import Lesson, TeachingAssignment
+from main.services.risk_service import describe_risk, get_top_risk_students
+
+TEACHER_SNAPSHOT_TTL = 60 * 60  # сек
+RISK_HIGH_SCORE = 50
+RISK_LIST_SIZE = 5
+
+
+def _teacher_snapshot_key(teacher_id: int) -> str:
+    return f"dashboard:teacher:{teacher_id}"
+
+
+def build_teacher_dashboard_snapshot(teacher_id: int, today: date) -> dict:
+    """
+    Обчислення знімка дашборду викладача (3 запити).
+
+    Returns:
+        dict з ключами:
+            - day: дата, на яку побудовано знімок
+            - weekly_by_day: кількість пар по днях поточного тижня [Пн..Нд]
+            - today_lessons: список Lesson на сьогодні (з group/subject/classroom)
+            - risk_students: [{name, group, issue, severity}, ...]
+    """
+    # 1. Навантаження по днях тижня — один GROUP BY замість 7 COUNT(*)
+    start_week = today - timedelta(days=today.weekday())
+    per_day = dict(
+        Lesson.objects.filter(
+            teacher_id=teacher_id,
+            date__range=(start_week, start_week + timedelta(days=6)),
+        ).order_by().values('date').annotate(n=Count('id')).values_list('date', 'n')
+    )
+    weekly_by_day = [per_day.get(start_week + timedelta(days=i), 0) for i in range(7)]
+
+    # 2. Розклад на сьогодні
+    today_lessons = list(
+        Lesson.objects.filter(teacher_id=teacher_id, date=today)
+        .select_related('group', 'subject', 'classroom', 'evaluation_type')
+        .order_by('start_time')
+    )
+
+    # 3. "Радар Ризику" — top-N з попередньо обчисленої таблиці StudentRiskScore
+    risk_students = [
+        {
+            'name': r['name'],
+            'group': r['group_name'],
+            'issue': describe_risk(r),
+            'severity': 'high' if r['score'] >= RISK_HIGH_SCORE else 'medium',
+        }
+        for r in get_top_risk_students(teacher_id=teacher_id, limit=RISK_LIST_SIZE)
+    ]
+
+    return {
+        'day': today,
+        'weekly_by_day': weekly_by_day,
+        'today_lessons': today_lessons,
+        'risk_students': risk_students,
+    }
+
+
+def get_teacher_dashboard_snapshot(teacher_id: int, today: Optional[date] = None) -> dict:
+    """
+    Знімок дашборду з кешу; перебудовується при промаху або зміні дня.
+    """
+    today = today or date.today()
+    key = _teacher_snapshot_key(teacher_id)
+
+    snapshot = cache.get(key)
+    if snapshot is None or snapshot['day'] != today:
+        snapshot = build_teacher_dashboard_snapshot(teacher_id, today)
+        cache.set(key, snapshot, TEACHER_SNAPSHOT_TTL)
+    return snapshot
+
+
+def invalidate_teacher_dashboards(teacher_ids: Iterable[Optional[int]]) -> None:
+    """Скидає знімки дашбордів для переданих викладачів."""
+    keys = [_teacher_snapshot_key(tid) for tid in set(teacher_ids) if tid]
+    if keys:
+        cache.delete_many(keys)
+
+
+def invalidate_group_dashboards(group_id: Optional[int], extra_teacher_ids: Iterable[Optional[int]] = ()) -> None:
+    """
+    Скидає знімки всіх викладачів, які мають навантаження в групі.
+
+    extra_teacher_ids — викладачі, що можуть не мати TeachingAssignment
+    (напр. викладач конкретного уроку).
+    """
+    teacher_ids = set(extra_teacher_ids)
+    if group_id:
+        teacher_ids.update(
+            TeachingAssignment.objects.filter(group_id=group_id).values_list('teacher_id', flat=True)
+        )
+    invalidate_teacher_dashboards(teacher_ids)
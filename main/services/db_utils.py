@@ -0,0 +1,33 @@
+"""
+DB Utils - спільні допоміжні функції для роботи з БД у сервісах
+
+Цей модуль містить:
+- bulk_upsert: пакетний upsert, сумісний з MySQL (ON DUPLICATE KEY UPDATE
+  не приймає цільових колонок) та PostgreSQL/SQLite (ON CONFLICT (...))
+"""
+
+from typing import Optional, Sequence
+
+from django.db import connections, router
+from django.db.models import Model
+
+
+def bulk_upsert(
+    model: type[Model],
+    rows: Sequence[Model],
+    unique_fields: Sequence[str],
+    update_fields: Sequence[str],
+    batch_size: Optional[int] = None,
+) -> list[Model]:
+    """
+    bulk_create з оновленням наявних рядків за унікальним ключем.
+
+    unique_fields передається лише бекендам, що підтримують ціль конфлікту;
+    MySQL оновлює рядок за будь-яким унікальним ключем, тож таблиця не
+    повинна мати інших унікальних ключів, крім unique_fields (і первинного).
+    """
+    connection = connections[router.db_for_write(model)]
+    options = {'update_conflicts': True, 'update_fields': list(update_fields), 'batch_size': batch_size}
+    if connection.features.supports_update_conflicts_with_target:
+        options['unique_fields'] = list(unique_fields)
+    return model.objects.bulk_create(rows, **options)
@@ -0,0 +1,304 @@
+"""
+Export Service - масове вивантаження фактів успішності для аналітики
+
+Цей модуль містить функції для:
+- Потокового читання StudentPerformance діапазонами первинного ключа
+- Денормалізації виміру (урок, предмет, група, тип оцінювання)
+- Запису у стиснутий колонковий формат (Parquet або NDJSON.gz)
+
+У пам'яті одночасно знаходиться не більше одного чанка, тому експорт
+мільйонів рядків не залежить від розміру таблиці.
+"""
+
+import json
+import logging
+import zlib
+from datetime import date
+from decimal import Decimal
+from typing import Iterator, Optional
+
+from main.models import StudentPerformance
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CHUNK_SIZE = 50_000
+
+EXPORT_FORMATS = ('parquet', 'ndjson')
+
+# (назва колонки у файлі, шлях ORM для values_list)
+EXPORT_COLUMNS = [
+    ('performance_id', 'id'),
+    ('student_id', 'student_id'),
+    ('lesson_id', 'lesson_id'),
+    ('lesson_date', 'lesson__date'),
+    ('lesson_start', 'lesson__start_time'),
+    ('is_cancelled', 'lesson__is_cancelled'),
+    ('teacher_id', 'lesson__teacher_id'),
+    ('subject_id', 'lesson__subject_id'),
+    ('subject', 'lesson__subject__name'),
+    ('group_id', 'lesson__group_id'),
+    ('group', 'lesson__group__name'),
+    ('course', 'lesson__group__course'),
+    ('specialty', 'lesson__group__specialty'),
+    ('evaluation_type_id', 'lesson__evaluation_type_id'),
+    ('evaluation_type', 'lesson__evaluation_type__name'),
+    ('weight_percent', 'lesson__evaluation_type__weight_percent'),
+    ('earned_points', 'earned_points'),
+    ('absence_code', 'absence__code'),
+    ('absence_respectful', 'absence__is_respectful'),
+    ('is_bonus', 'is_bonus'),
+]
+
+# Колонки з низькою кардинальністю, які кодуються словником
+DICTIONARY_COLUMNS = ('subject', 'group', 'specialty', 'evaluation_type', 'absence_code')
+
+
+def resolve_export_format(requested: Optional[str] = None) -> str:
+    """
+    Визначення формату експорту.
+
+    Args:
+        requested: 'parquet', 'ndjson' або None/'auto'
+
+    Returns:
+        'parquet' якщо він запитаний (або auto) і pyarrow встановлено,
+        інакше 'ndjson'.
+
+    Raises:
+        ValueError: невідомий формат або parquet без pyarrow
+    """
+    if requested in (None, '', 'auto'):
+        try:
+            import pyarrow  # noqa: F401
+            return 'parquet'
+        except ImportError:
+            return 'ndjson'
+
+    if requested not in EXPORT_FORMATS:
+        raise ValueError(f"Невідомий формат експорту: {requested}")
+
+    if requested == 'parquet':
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            raise ValueError("Формат parquet потребує пакет 'pyarrow'. Виконайте: pip install pyarrow")
+
+    return requested
+
+
+def iter_performance_chunks(
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    group_id: Optional[int] = None,
+) -> Iterator[dict[str, list]]:
+    """
+    Читання фактів успішності чанками по первинному ключу (keyset pagination).
+
+    Кожен запит має вигляд `WHERE id > last_id ORDER BY id LIMIT n`,
+    тому вартість не зростає з номером чанка (на відміну від OFFSET).
+
+    Args:
+        chunk_size: Кількість рядків у чанку
+        date_from: Початкова дата уроку (опціонально)
+        date_to: Кінцева дата уроку (опціонально)
+        group_id: Фільтр по групі (опціонально)
+
+    Yields:
+        Колонковий словник {назва_колонки: [значення, ...]}
+    """
+    names = [name for name, _ in EXPORT_COLUMNS]
+    paths = [path for _, path in EXPORT_COLUMNS]
+
+    queryset = StudentPerformance.objects.all()
+    if date_from:
+        queryset = queryset.filter(lesson__date__gte=date_from)
+    if date_to:
+        queryset = queryset.filter(lesson__date__lte=date_to)
+    if group_id:
+        queryset = queryset.filter(lesson__group_id=group_id)
+
+    last_pk = 0
+    while True:
+        rows = list(
+            queryset.filter(pk__gt=last_pk)
+            .order_by('pk')
+            .values_list(*paths)[:chunk_size]
+        )
+        if not rows:
+            return
+
+        last_pk = rows[-1][0]
+        yield {name: list(column) for name, column in zip(names, zip(*rows))}
+
+        if len(rows) < chunk_size:
+            return
+
+
+def _to_json_value(value):
+    """Конвертація значень БД у JSON-сумісні типи."""
+    if isinstance(value, Decimal):
+        return float(value)
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    return value
+
+
+def stream_ndjson_gz(chunks: Iterator[dict[str, list]]) -> Iterator[bytes]:
+    """
+    Запис чанків у gzip-стиснутий NDJSON (один рядок JSON на чанк).
+
+    Формат рядка:
+        {
+            "chunk": 0,
+            "rows": 50000,
+            "dictionaries": {"subject": ["Бази даних", ...]},  # лише нові значення
+            "columns": {"subject": [0, 0, 1, ...], "earned_points": [10.0, ...]}
+        }
+
+    Колонки з DICTIONARY_COLUMNS замінюються індексами у словнику, який
+    накопичується між чанками: кожне значення передається лише один раз.
+    """
+    compressor = zlib.compressobj(level=6, wbits=31)  # wbits=31 — gzip-контейнер
+    dictionaries: dict[str, dict] = {name: {} for name in DICTIONARY_COLUMNS}
+
+    for index, chunk in enumerate(chunks):
+        new_entries = {}
+        columns = {}
+        for name, values in chunk.items():
+            if name in dictionaries:
+                mapping = dictionaries[name]
+                added = []
+                codes = []
+                for value in values:
+                    code = mapping.get(value)
+                    if code is None:
+                        code = mapping[value] = len(mapping)
+                        added.append(value)
+                    codes.append(code)
+                if added:
+                    new_entries[name] = added
+                columns[name] = codes
+            else:
+                columns[name] = [_to_json_value(v) for v in values]
+
+        line = json.dumps({
+            'chunk': index,
+            'rows': len(chunk['performance_id']),
+            'dictionaries': new_entries,
+            'columns': columns,
+        }, ensure_ascii=False)
+        data = compressor.compress(line.encode('utf-8') + b'\n')
+        if data:
+            yield data
+
+    yield compressor.flush()
+
+
+class _ByteSink:
+    """Мінімальний file-like об'єкт, який накопичує байти між yield'ами."""
+
+    def __init__(self) -> None:
+        self._parts: list[bytes] = []
+        self._position = 0
+        self.closed = False
+
+    def write(self, data) -> int:
+        data = bytes(data)
+        self._parts.append(data)
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def flush(self) -> None:
+        pass
+
+    def close(self) -> None:
+        self.closed = True
+
+    def drain(self) -> bytes:
+        data = b''.join(self._parts)
+        self._parts = []
+        return data
+
+
+def stream_parquet(chunks: Iterator[dict[str, list]]) -> Iterator[bytes]:
+    """
+    Запис чанків у Parquet (zstd), один row group на чанк.
+
+    Рядкові виміри записуються як dictionary-колонки, тому повторювані
+    назви предметів/груп займають лише кілька байт на рядок.
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = pa.schema([
+        ('performance_id', pa.int64()),
+        ('student_id', pa.int64()),
+        ('lesson_id', pa.int64()),
+        ('lesson_date', pa.date32()),
+        ('lesson_start', pa.time32('s')),
+        ('is_cancelled', pa.bool_()),
+        ('teacher_id', pa.int64()),
+        ('subject_id', pa.int64()),
+        ('subject', pa.dictionary(pa.int32(), pa.string())),
+        ('group_id', pa.int64()),
+        ('group', pa.dictionary(pa.int32(), pa.string())),
+        ('course', pa.int16()),
+        ('specialty', pa.dictionary(pa.int32(), pa.string())),
+        ('evaluation_type_id', pa.int64()),
+        ('evaluation_type', pa.dictionary(pa.int32(), pa.string())),
+        ('weight_percent', pa.float64()),
+        ('earned_points', pa.float64()),
+        ('absence_code', pa.dictionary(pa.int32(), pa.string())),
+        ('absence_respectful', pa.bool_()),
+        ('is_bonus', pa.bool_()),
+    ])
+    decimal_columns = ('weight_percent', 'earned_points')
+
+    sink = _ByteSink()
+    # Порожній експорт — все одно повертаємо валідний файл зі схемою
+    writer = pq.ParquetWriter(sink, schema, compression='zstd')
+
+    for chunk in chunks:
+        for name in decimal_columns:
+            chunk[name] = [float(v) if v is not None else None for v in chunk[name]]
+        writer.write_table(pa.Table.from_pydict(chunk, schema=schema))
+        data = sink.drain()
+        if data:
+            yield data
+
+    writer.close()
+    yield sink.drain()
+
+
+def stream_performance_export(
+    export_format: Optional[str] = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    group_id: Optional[int] = None,
+) -> tuple[str, Iterator[bytes]]:
+    """
+    Повний конвеєр експорту: чанки з БД -> стиснутий колонковий потік.
+
+    Returns:
+        Tuple (format, byte_iterator), де format — фактично обраний формат
+    """
+    resolved = resolve_export_format(export_format)
+    chunks = iter_performance_chunks(
+        chunk_size=chunk_size,
+        date_from=date_from,
+        date_to=date_to,
+        group_id=group_id,
+    )
+    if resolved == 'parquet':
+        return resolved, stream_parquet(chunks)
+    return resolved, stream_ndjson_gz(chunks)
+
+
+def export_file_extension(export_format: str) -> str:
+    """Розширення файлу для формату експорту."""
+    return 'parquet' if export_format == 'parquet' else 'ndjson.gz'
@@ -12,6 +12,7 @@ from datetime import date, datetime, timedelta
 from decimal import Decimal
 from typing import Optional
 
+from django.db import transaction
 from django.db.models import Avg, Count, Sum, Q, QuerySet
 from main.models import (
     User, Subject, StudentPerformance, GradingScale, GradeRule,
@@ -406,7 +407,7 @@ def save_grade(
 
     Повертає dict: {'status': 'success'|'error', 'message': str}
     """
-    from main.constants import DEFAULT_LESSON_TIMES, DEFAULT_TIME_SLOTS
+    from main.services.bell_schedule_service import get_bell_schedule
 
     # 1. Validate inputs
     if not lesson_id and not (student_id and lesson_date_str and lesson_num and subject_id):
@@ -432,12 +433,12 @@ def save_grade(
         if not current_lesson:
             return {'status': 'error', 'message': 'Заняття не знайдено'}
     else:
-        start_time_info = DEFAULT_TIME_SLOTS.get(int(lesson_num))
-        if start_time_info:
-            start_time = start_time_info[0]
+        bell = get_bell_schedule().get(lesson_num)
+        if bell:
+            start_time, end_time = bell.start_time, bell.end_time
         else:
-            start_time_str = DEFAULT_LESSON_TIMES.get(int(lesson_num), "08:30")
-            start_time = datetime.strptime(start_time_str, "%H:%M").time()
+            start_time = datetime.strptime("08:30", "%H:%M").time()
+            end_time = (datetime.combine(date.today(), start_time) + timedelta(minutes=90)).time()
 
         try:
             assignment = TeachingAssignment.objects.get(
@@ -469,9 +470,7 @@ def save_grade(
             defaults={
                 'subject_id': int(subject_id),
                 'teacher_id': teacher_id,
-                'end_time': (
-                    datetime.combine(date.today(), start_time) + timedelta(minutes=90)
-                ).time(),
+                'end_time': end_time,
                 'evaluation_type': eval_type,
             },
         )
@@ -535,37 +534,34 @@ def save_grade(
     if comment_text is not None:
         defaults['comment'] = comment_text
 
-    perf, created = StudentPerformance.objects.update_or_create(
-        lesson=current_lesson,
-        student_id=student_id,
-        defaults=defaults,
-    )
-    logger.debug("Performance saved: id=%s, created=%s", perf.id, created)
+    from main.services.outbox_service import enqueue_notification, enqueue_sms
+    from main.services.sms_service import absence_message, grade_message
+
+    subject_name = current_lesson.subject.name if current_lesson.subject_id else "Предмет"
+    lesson_date  = current_lesson.date.strftime('%d.%m.%Y') if current_lesson.date else ''
 
-    # --- Сповіщення студента (in-app + SMS) ---
-    try:
-        from main.models import Notification
-        from main.services.sms_service import notify_grade, notify_absence
-        subject_name = current_lesson.subject.name if current_lesson.subject_id else "Предмет"
-        lesson_date  = current_lesson.date.strftime('%d.%m.%Y') if current_lesson.date else ''
-        student = User.objects.only('id', 'phone').get(pk=student_id)
+    # Оцінка та сповіщення студента (in-app + SMS) — одна транзакція;
+    # доставку виконує run_outbox_worker поза запитом
+    with transaction.atomic():
+        perf, created = StudentPerformance.objects.update_or_create(
+            lesson=current_lesson,
+            student_id=student_id,
+            defaults=defaults,
+        )
         if grade_value is not None:
-            Notification.objects.create(
-                recipient_id=student_id,
-                notif_type='grade',
+            enqueue_notification(
+                student_id, 'grade',
                 title=f"Нова оцінка з {subject_name}",
                 message=f"{lesson_date}: {grade_value} балів",
             )
-            notify_grade(student, subject_name, lesson_date, grade_value)
+            enqueue_sms(student_id, grade_message(subject_name, lesson_date, grade_value))
         elif absence_obj is not None:
-            Notification.objects.create(
-                recipient_id=student_id,
-                notif_type='absence',
+            enqueue_notification(
+                student_id, 'absence',
                 title=f"Відмічено пропуск з {subject_name}",
                 message=f"{lesson_date}: {absence_obj.name} ({absence_obj.code})",
             )
-            notify_absence(student, subject_name, lesson_date, absence_obj.name, absence_obj.code)
-    except Exception:
-        logger.exception("save_grade: не вдалося створити сповіщення")
+            enqueue_sms(student_id, absence_message(subject_name, lesson_date, absence_obj.name, absence_obj.code))
+    logger.debug("Performance saved: id=%s, created=%s", perf.id, created)
 
     return {'status': 'success', 'message': 'Saved'}
@@ -0,0 +1,318 @@
+"""
+Materialization Service - генерація уроків (Lesson) з шаблонів розкладу
+
+Цей модуль містить функції для:
+- Розгортання активних ScheduleTemplate на діапазон дат з урахуванням
+  valid_from/valid_to, типу тижня (чисельник/знаменник від settings.SEMESTER_START,
+  незалежно від діапазону запуску) та святкових днів
+- Для дат, покритих історією версій (ScheduleVersion), — розгортання тієї
+  версії, що діяла на дату, а не поточних шаблонів
+- Ідемпотентного порівняння з наявними уроками та upsert пакетами
+  (bulk_create / bulk_update), без змін там, де нічого не змінилось
+- Інвалідації кешів, які обходять bulk-операції (сигнали не спрацьовують)
+
+Правила злиття:
+- скасовані уроки (is_cancelled) ніколи не змінюються і не відновлюються;
+- у заміненому уроці (replaced_teacher задано) викладач не синхронізується;
+- урок, створений вручну (без template_source), з тим самим предметом
+  "прив'язується" до шаблону, з іншим предметом — лишається як є;
+- урок з шаблону, якого більше немає в розкладі, видаляється, лише якщо
+  в ньому немає оцінок, теми чи ДЗ; інакше зберігається.
+"""
+
+import logging
+from datetime import date, datetime, timedelta
+from typing import Iterable, Optional
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.db import transaction
+from django.db.models import Exists, Min, OuterRef
+from django.utils import timezone
+
+from main.models import Holiday, Lesson, ScheduleTemplate, ScheduleVersion, StudentPerformance, TeachingAssignment
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_SIZE = 1000
+
+# Поля, що визначаються шаблоном і синхронізуються при повторному запуску
+SYNCED_FIELDS = ('subject_id', 'teacher_id', 'end_time', 'classroom_id', 'template_source_id')
+
+
+def week_type_for(day: date, anchor: date) -> str:
+    """
+    Тип тижня: тиждень, що містить anchor (початок семестру), — чисельник,
+    далі чергуються.
+
+    Example:
+        >>> week_type_for(date(2025, 9, 8), date(2025, 9, 1))
+        'denominator'
+    """
+    anchor_monday = anchor - timedelta(days=anchor.weekday())
+    weeks = (day - anchor_monday).days // 7
+    return 'numerator' if weeks % 2 == 0 else 'denominator'
+
+
+def semester_week_anchor() -> date:
+    """
+    Початок семестру з settings.SEMESTER_START.
+
+    Raises:
+        ImproperlyConfigured: не задано або не дата
+    """
+    value = getattr(settings, 'SEMESTER_START', None)
+    if isinstance(value, date):
+        return value
+    try:
+        return date.fromisoformat(value)
+    except (TypeError, ValueError):
+        raise ImproperlyConfigured(
+            "SEMESTER_START (YYYY-MM-DD) потрібен для шаблонів чисельника/знаменника"
+        ) from None
+
+
+def expand_templates(
+    date_from: date,
+    date_to: date,
+    group_ids: Optional[Iterable[int]] = None,
+    week_anchor: Optional[date] = None,
+) -> tuple[dict, int]:
+    """
+    Бажаний стан: уроки, які мають існувати за шаблонами.
+
+    Група з історією версій з дня початку першої версії розгортається з
+    версій (кожна — у межах свого періоду дії), раніше — з шаблонів.
+
+    Returns:
+        ({(group_id, date, start_time): {поля уроку}}, кількість пропущених шаблонів без викладача)
+    """
+    anchor = week_anchor
+
+    def week_type(day: date) -> str:
+        # Якір потрібен лише за наявності шаблонів з типом тижня
+        nonlocal anchor
+        if anchor is None:
+            anchor = semester_week_anchor()
+        return week_type_for(day, anchor)
+
+    templates = ScheduleTemplate.objects.filter(is_active=True, valid_from__lte=date_to).exclude(
+        valid_to__lt=date_from
+    )
+    if group_ids is not None:
+        templates = templates.filter(group_id__in=list(group_ids))
+    holidays = set(Holiday.objects.filter(date__range=(date_from, date_to)).values_list('date', flat=True))
+
+    # Дати діапазону, згруповані за ISO днем тижня
+    days_by_weekday: dict[int, list[date]] = {}
+    day = date_from
+    while day <= date_to:
+        if day not in holidays:
+            days_by_weekday.setdefault(day.isoweekday(), []).append(day)
+        day += timedelta(days=1)
+
+    versions_qs = ScheduleVersion.objects.filter(valid_from__lte=date_to).exclude(valid_to__lt=date_from)
+    history_qs = ScheduleVersion.objects.values('group_id').annotate(first=Min('valid_from'))
+    if group_ids is not None:
+        versions_qs = versions_qs.filter(group_id__in=list(group_ids))
+        history_qs = history_qs.filter(group_id__in=list(group_ids))
+    history_start = {row['group_id']: row['first'] for row in history_qs.order_by()}
+    versions = list(versions_qs.values_list('group_id', 'valid_from', 'valid_to', 'slots'))
+
+    desired = {}
+    skipped = 0
+    for t in templates.values(
+        'id', 'group_id', 'subject_id', 'teacher_id', 'classroom_id', 'day_of_week',
+        'start_time', 'duration_minutes', 'valid_from', 'valid_to', 'week_type',
+    ):
+        if not t['teacher_id']:
+            skipped += 1
+            continue
+        end_time = (datetime.combine(date_from, t['start_time']) + timedelta(minutes=t['duration_minutes'])).time()
+        covered_from = history_start.get(t['group_id'])
+        for day in days_by_weekday.get(t['day_of_week'], ()):
+            if day < t['valid_from'] or (t['valid_to'] and day > t['valid_to']):
+                continue
+            if covered_from and day >= covered_from:
+                continue  # цей день розгортається з версії
+            if t['week_type'] and week_type(day) != t['week_type']:
+                continue
+            desired[(t['group_id'], day, t['start_time'])] = {
+                'subject_id': t['subject_id'],
+                'teacher_id': t['teacher_id'],
+                'end_time': end_time,
+                'classroom_id': t['classroom_id'],
+                'template_source_id': t['id'],
+            }
+
+    # Слоти версій посилаються на шаблони, яких уже може не бути
+    live_templates = set(ScheduleTemplate.objects.filter(
+        id__in={slot['template_id'] for *_, slots in versions for slot in slots},
+    ).values_list('id', flat=True)) if versions else set()
+    for group_id, valid_from, valid_to, slots in versions:
+        first, last = max(valid_from, date_from), min(valid_to or date_to, date_to)
+        for slot in slots:
+            if not slot['teacher_id']:
+                skipped += 1
+                continue
+            start_time = datetime.strptime(slot['start_time'], '%H:%M').time()
+            end_time = (datetime.combine(date_from, start_time) + timedelta(minutes=slot['duration'])).time()
+            slot_to = date.fromisoformat(slot['valid_to']) if slot['valid_to'] else None
+            for day in days_by_weekday.get(slot['day'], ()):
+                if day < first or day > last or (slot_to and day > slot_to):
+                    continue
+                if slot['week_type'] and week_type(day) != slot['week_type']:
+                    continue
+                desired[(group_id, day, start_time)] = {
+                    'subject_id': slot['subject_id'],
+                    'teacher_id': slot['teacher_id'],
+                    'end_time': end_time,
+                    'classroom_id': slot['classroom_id'],
+                    'template_source_id': slot['template_id'] if slot['template_id'] in live_templates else None,
+                }
+    return desired, skipped
+
+
+def materialize_lessons(
+    date_from: date,
+    date_to: date,
+    group_ids: Optional[Iterable[int]] = None,
+    week_anchor: Optional[date] = None,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    dry_run: bool = False,
+) -> dict:
+    """
+    Синхронізація уроків у діапазоні з шаблонами розкладу.
+
+    Args:
+        date_from: Перший день (напр. початок семестру)
+        date_to: Останній день (включно)
+        group_ids: Обмежити групами (за замовчуванням — усі)
+        week_anchor: Дата тижня-чисельника (за замовчуванням settings.SEMESTER_START)
+        batch_size: Розмір пакета bulk-операцій
+        dry_run: Лише порахувати зміни, нічого не записуючи
+
+    Returns:
+        dict з лічильниками: created, updated, deleted, unchanged,
+        kept (прибрані з розкладу, але з даними журналу), cancelled, conflicts, skipped_templates
+    """
+    if group_ids is not None:
+        group_ids = list(group_ids)
+    desired, skipped = expand_templates(date_from, date_to, group_ids, week_anchor)
+
+    existing_qs = Lesson.objects.filter(date__range=(date_from, date_to))
+    if group_ids is not None:
+        existing_qs = existing_qs.filter(group_id__in=group_ids)
+    existing_rows = existing_qs.annotate(
+        has_grades=Exists(StudentPerformance.objects.filter(lesson_id=OuterRef('pk'))),
+    ).order_by().values(
+        'id', 'group_id', 'date', 'start_time', 'is_cancelled', 'topic', 'homework', 'has_grades',
+        'replaced_teacher_id', *SYNCED_FIELDS,
+    )
+
+    stats = {
+        'created': 0, 'updated': 0, 'deleted': 0, 'unchanged': 0,
+        'kept': 0, 'cancelled': 0, 'conflicts': 0, 'skipped_templates': skipped,
+    }
+    to_update: list[Lesson] = []
+    to_delete: list[int] = []
+    touched_groups: set[int] = set()
+    touched_teachers: set[int] = set()
+
+    for row in existing_rows:
+        key = (row['group_id'], row['date'], row['start_time'])
+        wanted = desired.pop(key, None)
+
+        if row['is_cancelled']:
+            stats['cancelled'] += 1
+            continue
+
+        if wanted is None:
+            if row['template_source_id'] is None:
+                continue  # ручний урок поза розкладом — не наш
+            if row['has_grades'] or row['topic'] or row['homework']:
+                stats['kept'] += 1
+            else:
+                to_delete.append(row['id'])
+                touched_groups.add(row['group_id'])
+                touched_teachers.add(row['teacher_id'])
+            continue
+
+        if row['template_source_id'] is None and row['subject_id'] != wanted['subject_id']:
+            stats['conflicts'] += 1  # ручний урок з іншим предметом на місці пари з шаблону
+            continue
+
+        if row['replaced_teacher_id']:
+            wanted = {**wanted, 'teacher_id': row['teacher_id']}  # заміна важливіша за шаблон
+
+        if all(row[field] == wanted[field] for field in SYNCED_FIELDS):
+            stats['unchanged'] += 1
+            continue
+
+        touched_groups.add(row['group_id'])
+        touched_teachers.update((row['teacher_id'], wanted['teacher_id']))
+        to_update.append(Lesson(id=row['id'], **wanted))
+
+    # Все, що лишилось у desired, — нові уроки
+    now = timezone.now()
+    to_create = [
+        Lesson(group_id=group_id, date=day, start_time=start_time, created_at=now, updated_at=now, **fields)
+        for (group_id, day, start_time), fields in desired.items()
+    ]
+    for lesson in to_create:
+        touched_groups.add(lesson.group_id)
+        touched_teachers.add(lesson.teacher_id)
+
+    stats['created'], stats['updated'], stats['deleted'] = len(to_create), len(to_update), len(to_delete)
+    if dry_run:
+        return stats
+
+    with transaction.atomic():
+        for start in range(0, len(to_delete), batch_size):
+            Lesson.objects.filter(id__in=to_delete[start:start + batch_size]).delete()
+        for lesson in to_update:
+            lesson.updated_at = now
+        Lesson.objects.bulk_update(
+            to_update,
+            ['subject', 'teacher', 'end_time', 'classroom', 'template_source', 'updated_at'],
+            batch_size=batch_size,
+        )
+        Lesson.objects.bulk_create(to_create, batch_size=batch_size)
+
+        updated_ids = [lesson.id for lesson in to_update]
+        transaction.on_commit(lambda: _invalidate_after_bulk(
+            touched_groups, touched_teachers, updated_ids, date_from, date_to
+        ))
+
+    logger.info('Materialized lessons %s..%s: %s', date_from, date_to, stats)
+    return stats
+
+
+def _invalidate_after_bulk(
+    group_ids: set[int],
+    teacher_ids: set[int],
+    updated_lesson_ids: list[int],
+    date_from: date,
+    date_to: date,
+) -> None:
+    """Кеші, які зазвичай скидають сигнали Lesson (bulk-операції їх оминають)."""
+    from main.services.dashboard_service import invalidate_teacher_dashboards
+    from main.services.summary_service import rebuild_student_summaries
+    from main.services.timeline_service import invalidate_timeline
+    from main.services.upcoming_service import invalidate_upcoming
+
+    invalidate_upcoming(group_ids, teacher_ids)
+    week_days = [date_from + timedelta(days=d) for d in range(0, (date_to - date_from).days + 1, 7)] + [date_to]
+    invalidate_timeline((gid, day) for gid in group_ids for day in week_days)
+    invalidate_teacher_dashboards(teacher_ids | set(
+        TeachingAssignment.objects.filter(group_id__in=group_ids).values_list('teacher_id', flat=True)
+    ))
+
+    # Змінений предмет/викладач оціненого уроку потрапляє в буфери зведень студентів
+    if updated_lesson_ids:
+        student_ids = set(
+            StudentPerformance.objects.filter(lesson_id__in=updated_lesson_ids, earned_points__isnull=False)
+            .values_list('student_id', flat=True)
+        )
+        if student_ids:
+            rebuild_student_summaries(student_ids)
@@ -0,0 +1,150 @@
+"""
+News Service - стрічка новин з курсорною пагінацією
+
+Цей модуль містить функції для:
+- Сторінки стрічки за курсором (created_at, id): ціна сторінки не залежить
+  від кількості дописів за всі роки; кількість коментарів — анотацією
+- Перших N коментарів кожного допису сторінки одним запитом (ROW_NUMBER
+  по допису), решта — через API коментарів допису з тим самим типом курсора
+- Перевірки доступу до допису (загальні або дописи груп користувача)
+"""
+
+import base64
+from datetime import datetime, timedelta, timezone as dt_timezone
+from typing import Optional
+
+from django.db.models import Count, F, Q, QuerySet, Window
+from django.db.models.functions import RowNumber
+
+from main.models import Comment, Post, StudyGroup, TeachingAssignment, User
+
+PAGE_SIZE = 15
+INLINE_COMMENTS = 3
+COMMENTS_PAGE_SIZE = 20
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=dt_timezone.utc)
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(created_at: datetime, pk: int) -> str:
+    micros = (created_at - _EPOCH) // timedelta(microseconds=1)
+    return base64.urlsafe_b64encode(f"{micros}:{pk}".encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, int]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode()
+        micros, pk = raw.split(':')
+        return _EPOCH + timedelta(microseconds=int(micros)), int(pk)
+    except (ValueError, UnicodeDecodeError, OverflowError) as exc:
+        raise InvalidCursor(cursor) from exc
+
+
+def feed_group_ids(user: User) -> list[int]:
+    """Групи, дописи яких бачить користувач."""
+    if user.role == 'admin':
+        return list(StudyGroup.objects.values_list('id', flat=True))
+    if user.role == 'teacher':
+        return list(
+            TeachingAssignment.objects.filter(teacher=user, is_active=True)
+            .values_list('group_id', flat=True).distinct()
+        )
+    return [user.group_id] if user.group_id else []
+
+
+def feed_queryset(user: User, group_ids: list[int], tab: str = 'all') -> QuerySet:
+    """Загальні дописи + дописи доступних груп, звужені вкладкою."""
+    posts = Post.objects.filter(Q(post_type='general') | Q(group_id__in=group_ids))
+    if tab == 'general':
+        posts = posts.filter(post_type='general')
+    elif tab == 'group' and user.role == 'student':
+        posts = posts.filter(post_type='group', group_id=user.group_id)
+    elif tab.startswith('group_') and user.role in ('teacher', 'admin'):
+        try:
+            gid = int(tab.split('_', 1)[1])
+            posts = posts.filter(post_type='group', group_id=gid)
+        except (ValueError, IndexError):
+            pass
+    return posts
+
+
+def can_view_post(user: User, post: Post) -> bool:
+    if post.post_type == 'general' or user.role == 'admin':
+        return True
+    return post.group_id in feed_group_ids(user)
+
+
+def _after(cursor: Optional[str], descending: bool) -> Q:
+    if not cursor:
+        return Q()
+    created_at, pk = decode_cursor(cursor)
+    if descending:
+        return Q(created_at__lt=created_at) | Q(created_at=created_at, id__lt=pk)
+    return Q(created_at__gt=created_at) | Q(created_at=created_at, id__gt=pk)
+
+
+def get_feed_page(
+    posts: QuerySet,
+    cursor: Optional[str] = None,
+    page_size: int = PAGE_SIZE,
+    inline_comments: int = INLINE_COMMENTS,
+) -> dict:
+    """
+    Сторінка стрічки (2 запити: дописи з кількістю коментарів + перші коментарі).
+
+    Returns:
+        {'posts': [Post з comment_count та inline_comments], 'next_cursor': str | None}
+    """
+    page = list(
+        posts.filter(_after(cursor, descending=True))
+        .select_related('author', 'group')
+        .annotate(comment_count=Count('comments'))
+        .order_by('-created_at', '-id')[:page_size + 1]
+    )
+    has_more = len(page) > page_size
+    page = page[:page_size]
+
+    inline: dict[int, list[Comment]] = {}
+    if page and inline_comments:
+        for comment in (
+            Comment.objects.filter(post_id__in=[p.id for p in page])
+            .select_related('author')
+            .annotate(position=Window(RowNumber(), partition_by=F('post_id'), order_by=[F('created_at'), F('id')]))
+            .filter(position__lte=inline_comments)
+            .order_by('post_id', 'created_at', 'id')
+        ):
+            inline.setdefault(comment.post_id, []).append(comment)
+    for post in page:
+        post.inline_comments = inline.get(post.id, [])
+        last = post.inline_comments[-1] if post.inline_comments else None
+        post.comments_cursor = encode_cursor(last.created_at, last.id) if last else ''
+
+    last_post = page[-1] if page else None
+    return {
+        'posts': page,
+        'next_cursor': encode_cursor(last_post.created_at, last_post.id) if has_more else None,
+    }
+
+
+def get_comments_page(post: Post, cursor: Optional[str] = None, limit: int = COMMENTS_PAGE_SIZE) -> dict:
+    """
+    Коментарі допису в хронологічному порядку після курсора.
+
+    Returns:
+        {'comments': [Comment], 'next_cursor': str | None}
+    """
+    comments = list(
+        Comment.objects.filter(_after(cursor, descending=False), post=post)
+        .select_related('author')
+        .order_by('created_at', 'id')[:limit + 1]
+    )
+    has_more = len(comments) > limit
+    comments = comments[:limit]
+    last = comments[-1] if comments else None
+    return {
+        'comments': comments,
+        'next_cursor': encode_cursor(last.created_at, last.id) if has_more else None,
+    }
@@ -0,0 +1,155 @@
+"""
+Notification Retention Service - політика зберігання сповіщень
+
+Цей модуль містить функції для:
+- Політики зберігання за типом (settings.NOTIFICATION_RETENTION_DAYS):
+  прочитані видаляються після TTL типу, непрочитані — після подвоєного TTL
+- Видалення пакетами за первинним ключем (короткі транзакції, без довгих
+  блокувань таблиці) з необов'язковим архівуванням у gzip JSONL
+- Очищення масових сповіщень (news) та виконаних повідомлень черги (outbox)
+
+Запуск: python manage.py prune_notifications (див. команду).
+"""
+
+import gzip
+import json
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Optional
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connection, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from main.models import BroadcastNotification, Notification, OutboxMessage
+
+DEFAULT_RETENTION_DAYS = 365
+UNREAD_RETENTION_FACTOR = 2
+DEFAULT_OUTBOX_RETENTION_DAYS = 30
+DEFAULT_BATCH_SIZE = 1000
+
+_NOTIFICATION_FIELDS = ('id', 'recipient_id', 'notif_type', 'title', 'message', 'is_read', 'created_at', 'post_id')
+_BROADCAST_FIELDS = ('id', 'notif_type', 'title', 'message', 'audience', 'group_id', 'author_id', 'post_id', 'created_at')
+
+
+def retention_policy() -> dict[str, int]:
+    """Тип сповіщення -> днів зберігання (для всіх типів Notification.NOTIF_TYPES)."""
+    configured = getattr(settings, 'NOTIFICATION_RETENTION_DAYS', {}) or {}
+    return {
+        notif_type: int(configured.get(notif_type, DEFAULT_RETENTION_DAYS))
+        for notif_type, _ in Notification.NOTIF_TYPES
+    }
+
+
+class Archive:
+    """Архів видалених рядків: один gzip JSONL на запуск, рядок — {'table', ...поля}."""
+
+    def __init__(self, directory: str, now: datetime):
+        path = Path(directory)
+        path.mkdir(parents=True, exist_ok=True)
+        self.path = path / f"notifications-{timezone.localtime(now):%Y%m%d-%H%M%S}.jsonl.gz"
+        self._file = gzip.open(self.path, 'at', encoding='utf-8')
+
+    def write(self, table: str, rows: list[dict]) -> None:
+        for row in rows:
+            self._file.write(json.dumps({'table': table, **row}, cls=DjangoJSONEncoder, ensure_ascii=False) + '\n')
+        self._file.flush()
+
+    def close(self) -> None:
+        self._file.close()
+
+
+def _raw_delete(model, ids: list[int]) -> None:
+    """DELETE за списком id без завантаження об'єктів (на таблиці немає вхідних FK)."""
+    table = connection.ops.quote_name(model._meta.db_table)
+    placeholders = ', '.join(['%s'] * len(ids))
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {table} WHERE id IN ({placeholders})", ids)
+
+
+def _batches(queryset, fields: tuple, batch_size: int):
+    """Пакети рядків за зростанням id; наступний пакет починається після останнього id."""
+    last_id = 0
+    while True:
+        rows = list(queryset.filter(id__gt=last_id).order_by('id').values(*fields)[:batch_size])
+        if not rows:
+            return
+        last_id = rows[-1]['id']
+        yield rows
+
+
+def prune_notifications(
+    now: Optional[datetime] = None,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    archive_dir: Optional[str] = None,
+    dry_run: bool = False,
+    pause: float = 0.0,
+    outbox_days: int = DEFAULT_OUTBOX_RETENTION_DAYS,
+) -> dict:
+    """
+    Видаляє застарілі сповіщення згідно з політикою.
+
+    pause — секунд між пакетами, щоб не навантажувати реплікацію.
+
+    Returns:
+        {'personal': {тип: int}, 'broadcasts': int, 'outbox': int, 'archive': str | None}
+    """
+    from main.services.notification_service import on_notifications_deleted
+
+    now = now or timezone.now()
+    archive = Archive(archive_dir, now) if archive_dir and not dry_run else None
+    stats = {'personal': {}, 'broadcasts': 0, 'outbox': 0, 'archive': str(archive.path) if archive else None}
+    policy = retention_policy()
+
+    try:
+        for notif_type, days in policy.items():
+            expired = Notification.objects.filter(
+                Q(is_read=True, created_at__lt=now - timedelta(days=days))
+                | Q(created_at__lt=now - timedelta(days=days * UNREAD_RETENTION_FACTOR)),
+                notif_type=notif_type,
+            )
+            deleted = 0
+            for rows in _batches(expired, _NOTIFICATION_FIELDS, batch_size):
+                deleted += len(rows)
+                if dry_run:
+                    continue
+                if archive:
+                    archive.write('notifications', rows)
+                _raw_delete(Notification, [row['id'] for row in rows])
+                # Лічильники змінюються лише від непрочитаних
+                on_notifications_deleted(row['recipient_id'] for row in rows if not row['is_read'])
+                if pause:
+                    time.sleep(pause)
+            stats['personal'][notif_type] = deleted
+
+        # Масові сповіщення — за TTL їхнього типу; позначки прочитання видаляються каскадом
+        for notif_type, days in policy.items():
+            expired = BroadcastNotification.objects.filter(
+                notif_type=notif_type, created_at__lt=now - timedelta(days=days),
+            )
+            for rows in _batches(expired, _BROADCAST_FIELDS, batch_size):
+                stats['broadcasts'] += len(rows)
+                if dry_run:
+                    continue
+                if archive:
+                    archive.write('broadcast_notifications', rows)
+                with transaction.atomic():
+                    BroadcastNotification.objects.filter(id__in=[row['id'] for row in rows]).delete()
+                if pause:
+                    time.sleep(pause)
+
+        # Виконані повідомлення черги ('dead' лишаються для розбору)
+        done = OutboxMessage.objects.filter(status='done', processed_at__lt=now - timedelta(days=outbox_days))
+        for rows in _batches(done, ('id',), batch_size):
+            stats['outbox'] += len(rows)
+            if not dry_run:
+                _raw_delete(OutboxMessage, [row['id'] for row in rows])
+                if pause:
+                    time.sleep(pause)
+    finally:
+        if archive:
+            archive.close()
+    return stats
@@ -0,0 +1,280 @@
+"""
+Notification Service - особисті та масові сповіщення
+
+Цей модуль містить функції для:
+- Масових сповіщень (BroadcastNotification): один запис на допис незалежно
+  від кількості отримувачів; аудиторія визначається при читанні
+- Стрічки сповіщень користувача: злиття особистих і видимих масових
+  за часом створення фіксованою кількістю запитів
+- Стану прочитання масових сповіщень: курсор (усе до моменту
+  "прочитати все") плюс набір окремо прочитаних після курсора
+- Лічильника непрочитаних: особисті рахуються в БД за індексом
+  notif_recipient_unread_idx (їх створює також воркер черги, тож кешована
+  копія розходилася б між процесами); масові — кешуються разом з поколінням
+  масових сповіщень і перераховуються, лише коли воно змінилось
+- Потоку подій (SSE) для дзвіночка: процес стежить лише за версією в кеші
+  і звертається до БД, коли вона змінилась
+"""
+
+import asyncio
+import json
+import time
+from datetime import datetime
+from typing import AsyncIterator, Optional
+
+from asgiref.sync import sync_to_async
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
+from django.db.models import Q, QuerySet
+from django.utils import timezone
+
+from main.models import (
+    BroadcastNotification,
+    BroadcastRead,
+    Notification,
+    NotificationReadCursor,
+    Post,
+    TeachingAssignment,
+    User,
+)
+
+DEFAULT_LIMIT = 30
+
+BROADCAST_UNREAD_KEY = 'notif:bunread:{}'   # (stamp, непрочитані масові)
+USER_VERSION_KEY = 'notif:version:{}'       # змінюється з кожною зміною особистих сповіщень
+BROADCAST_STAMP_KEY = 'notif:broadcast_stamp'  # покоління масових сповіщень
+UNREAD_TTL = 60 * 60 * 24  # сек
+
+UNREAD_POLL_INTERVAL = 15  # сек; опитування лічильника без SSE (WSGI)
+STREAM_POLL_INTERVAL = 2  # сек між перевірками версії в кеші
+STREAM_HEARTBEAT = 25     # сек; коментар-пінг, щоб проксі не закривали з'єднання
+STREAM_LIFETIME = 5 * 60  # сек; далі браузер сам перепідключається (EventSource)
+
+TYPE_ICONS = {
+    'news':    '📢',
+    'comment': '💬',
+    'grade':   '📊',
+    'absence': '⚠️',
+}
+
+
+def visible_broadcasts(user: User) -> QuerySet:
+    """Масові сповіщення, адресовані користувачу (без урахування прочитання)."""
+    if user.role == 'student':
+        audience = Q(audience='all')
+        if user.group_id:
+            audience |= Q(audience='group', group_id=user.group_id)
+    elif user.role == 'teacher':
+        audience = Q(audience='all') | Q(
+            audience='group',
+            group_id__in=TeachingAssignment.objects.filter(teacher=user, is_active=True).values('group_id'),
+        )
+    else:
+        return BroadcastNotification.objects.none()
+    return (
+        BroadcastNotification.objects
+        .filter(audience, created_at__gte=user.created_at)
+        .exclude(author_id=user.id)
+    )
+
+
+def broadcast_post(post: Post, author_label: str) -> BroadcastNotification:
+    """Сповіщення про новий допис — один запис для всієї аудиторії."""
+    return BroadcastNotification.objects.create(
+        notif_type='news',
+        title=f"Нова публікація від {author_label}",
+        message=post.title or post.content[:60],
+        audience='group' if post.post_type == 'group' else 'all',
+        group_id=post.group_id if post.post_type == 'group' else None,
+        author_id=post.author_id,
+        post=post,
+    )
+
+
+def _broadcast_stamp() -> int:
+    # Початкове значення з часу — щоб після витіснення ключа не збігтися зі старим поколінням
+    return cache.get_or_set(BROADCAST_STAMP_KEY, lambda: int(time.time() * 1000), None)
+
+
+def _read_until(user: User):
+    return (
+        NotificationReadCursor.objects.filter(user=user).values_list('read_until', flat=True).first()
+    )
+
+
+def _unread_broadcasts(user: User, read_until) -> QuerySet:
+    qs = visible_broadcasts(user)
+    if read_until is not None:
+        qs = qs.filter(created_at__gt=read_until)
+    return qs.exclude(reads__user=user)
+
+
+def _serialize(item, kind: str, is_read: bool) -> dict:
+    return {
+        'id':         item.id,
+        'kind':       kind,
+        'type':       item.notif_type,
+        'icon':       TYPE_ICONS.get(item.notif_type, '🔔'),
+        'title':      item.title,
+        'message':    item.message,
+        'is_read':    is_read,
+        'created_at': timezone.localtime(item.created_at).strftime('%d.%m.%Y %H:%M'),
+        'post_id':    item.post_id,
+    }
+
+
+def get_notifications(user: User, limit: int = DEFAULT_LIMIT) -> dict:
+    """
+    Останні limit сповіщень (особисті й масові разом) та кількість непрочитаних.
+
+    Returns:
+        {'notifications': [{id, kind: 'personal'|'broadcast', type, icon, title, message,
+          is_read, created_at, post_id}], 'unread_count': int}
+    """
+    read_until = _read_until(user)
+    personal = list(Notification.objects.filter(recipient=user).order_by('-created_at')[:limit])
+    broadcasts = list(visible_broadcasts(user).order_by('-created_at')[:limit])
+    read_ids = set(
+        BroadcastRead.objects.filter(user=user, broadcast_id__in=[b.id for b in broadcasts])
+        .values_list('broadcast_id', flat=True)
+    ) if broadcasts else set()
+
+    items = [(n.created_at, _serialize(n, 'personal', n.is_read)) for n in personal]
+    items += [
+        (b.created_at, _serialize(
+            b, 'broadcast', b.id in read_ids or (read_until is not None and b.created_at <= read_until),
+        ))
+        for b in broadcasts
+    ]
+    items.sort(key=lambda pair: pair[0], reverse=True)
+    return {
+        'notifications': [data for _, data in items[:limit]],
+        'unread_count': count_unread(user),
+    }
+
+
+def count_unread(user: User) -> int:
+    """
+    Непрочитані особисті + масові після курсора, не позначені окремо.
+
+    Особисті — COUNT за індексом (recipient, is_read); масові — з кешу,
+    запит до БД лише при промаху або коли з'явилось нове масове сповіщення.
+    """
+    personal = Notification.objects.filter(recipient=user, is_read=False).count()
+
+    stamp = _broadcast_stamp()
+    cached = cache.get(BROADCAST_UNREAD_KEY.format(user.id))
+    if cached is not None and cached[0] == stamp:
+        broadcasts = cached[1]
+    else:
+        broadcasts = _unread_broadcasts(user, _read_until(user)).count()
+        cache.set(BROADCAST_UNREAD_KEY.format(user.id), (stamp, broadcasts), UNREAD_TTL)
+    return personal + broadcasts
+
+
+def _bump_version(user_id: int) -> None:
+    try:
+        cache.incr(USER_VERSION_KEY.format(user_id))
+    except ValueError:
+        cache.set(USER_VERSION_KEY.format(user_id), 1, None)
+
+
+def on_notification_created(recipient_id: int) -> None:
+    """Викликається після коміту створення особистого сповіщення (сигнал у models.py)."""
+    _bump_version(recipient_id)
+
+
+def on_notifications_deleted(recipient_ids) -> None:
+    for recipient_id in set(recipient_ids):
+        _bump_version(recipient_id)
+
+
+def invalidate_broadcast_unread(user_ids) -> None:
+    cache.delete_many([BROADCAST_UNREAD_KEY.format(user_id) for user_id in user_ids])
+    for user_id in user_ids:
+        _bump_version(user_id)
+
+
+def on_broadcasts_changed() -> None:
+    """Нове або видалене масове сповіщення робить застарілими кешовані лічильники масових."""
+    try:
+        cache.incr(BROADCAST_STAMP_KEY)
+    except ValueError:
+        _broadcast_stamp()
+
+
+def stream_token(user_id: int) -> str:
+    """Змінюється, коли міг змінитись стан сповіщень користувача."""
+    return f"{cache.get(USER_VERSION_KEY.format(user_id), 0)}:{_broadcast_stamp()}"
+
+
+def poll_unread(user: User, token: str = '') -> dict:
+    """
+    Опитування лічильника (без SSE): якщо token клієнта актуальний — лише
+    читання кешу, інакше кількість непрочитаних і новий token.
+
+    Returns:
+        {'changed': bool, 'token': str, 'unread_count': int | None}
+    """
+    current = stream_token(user.id)
+    if token == current:
+        return {'changed': False, 'token': current, 'unread_count': None}
+    return {'changed': True, 'token': current, 'unread_count': count_unread(user)}
+
+
+def mark_read(user: User, notification_id: int, kind: str = 'personal') -> bool:
+    """Позначає одне сповіщення прочитаним; False, якщо воно недоступне або вже прочитане."""
+    if kind == 'broadcast':
+        broadcast = visible_broadcasts(user).filter(id=notification_id).only('id', 'created_at').first()
+        if broadcast is None:
+            return False
+        try:
+            with transaction.atomic():
+                _, created = BroadcastRead.objects.get_or_create(user=user, broadcast_id=notification_id)
+        except IntegrityError:
+            created = False  # паралельний запит уже позначив
+        read_until = _read_until(user) if created else None
+        if created and (read_until is None or broadcast.created_at > read_until):
+            key = BROADCAST_UNREAD_KEY.format(user.id)
+            cached = cache.get(key)
+            if cached is not None:
+                cache.set(key, (cached[0], max(cached[1] - 1, 0)), UNREAD_TTL)
+            _bump_version(user.id)
+        return created
+    updated = Notification.objects.filter(id=notification_id, recipient=user, is_read=False).update(is_read=True)
+    if updated:
+        _bump_version(user.id)
+    return bool(updated)
+
+
+def mark_all_read(user: User, now: Optional[datetime] = None) -> None:
+    """Особисті — прапорцем, масові — зсувом курсора (окремі позначки стають зайвими)."""
+    now = now or timezone.now()
+    with transaction.atomic():
+        Notification.objects.filter(recipient=user, is_read=False).update(is_read=True)
+        NotificationReadCursor.objects.update_or_create(user=user, defaults={'read_until': now})
+        BroadcastRead.objects.filter(user=user, broadcast__created_at__lte=now).delete()
+    cache.set(BROADCAST_UNREAD_KEY.format(user.id), (_broadcast_stamp(), 0), UNREAD_TTL)
+    _bump_version(user.id)
+
+
+async def notification_events(user: User, lifetime: int = STREAM_LIFETIME) -> AsyncIterator[str]:
+    """
+    Потік SSE: подія "unread" з кількістю непрочитаних при підключенні та
+    щоразу, коли змінюється stream_token; між ними — лише читання кешу.
+    """
+    loop = asyncio.get_running_loop()
+    started = last_sent = loop.time()
+    token = None
+    yield f"retry: {STREAM_POLL_INTERVAL * 1000}\n\n"
+    while loop.time() - started < lifetime:
+        current = await sync_to_async(stream_token)(user.id)
+        if current != token:
+            token = current
+            unread = await sync_to_async(count_unread)(user)
+            yield f"event: unread\ndata: {json.dumps({'unread_count': unread})}\n\n"
+            last_sent = loop.time()
+        elif loop.time() - last_sent >= STREAM_HEARTBEAT:
+            yield ": ping\n\n"
+            last_sent = loop.time()
+        await asyncio.sleep(STREAM_POLL_INTERVAL)
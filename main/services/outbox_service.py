@@ -0,0 +1,162 @@
+"""
+Outbox Service - транзакційна черга сповіщень і SMS
+
+Цей модуль містить функції для:
+- Постановки побічних дій у чергу (OutboxMessage) в транзакції бізнес-зміни:
+  якщо зміна відкотилась, повідомлення теж не буде
+- Обробки черги пакетами (python manage.py run_outbox_worker): захоплення
+  рядків з орендою (SELECT ... FOR UPDATE SKIP LOCKED, тож кілька обробників
+  не беруть одне повідомлення), повтори з експоненційною затримкою, після
+  вичерпання спроб — статус 'dead' з текстом помилки
+- Повернення "мертвих" повідомлень у чергу (дія в адмінці)
+
+Обробники сповіщень у БД виконуються в одній транзакції з позначкою
+'done', тож повтор не створить дубліката. SMS — "щонайменше один раз".
+"""
+
+import logging
+from datetime import datetime, timedelta
+from typing import Callable, Iterable, Optional
+
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from main.models import Notification, OutboxMessage, User
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_SIZE = 100
+MAX_ATTEMPTS = 8
+BASE_RETRY_DELAY = 30  # сек; далі 1, 2, 4 ... хв
+MAX_RETRY_DELAY = 60 * 60
+LEASE_SECONDS = 5 * 60  # захоплене повідомлення, не завершене за цей час, повертається в обробку
+
+
+def _deliver_notification(payload: dict) -> None:
+    Notification.objects.create(
+        recipient_id=payload['recipient_id'],
+        notif_type=payload['notif_type'],
+        title=payload['title'],
+        message=payload.get('message', ''),
+        post_id=payload.get('post_id'),
+    )
+
+
+def _deliver_sms(payload: dict) -> None:
+    from main.services.sms_service import deliver_sms
+
+    phone = User.objects.filter(pk=payload['user_id']).values_list('phone', flat=True).first()
+    if phone:
+        deliver_sms(phone, payload['message'])
+
+
+# kind -> (обробник, чи виконувати в транзакції разом з позначкою 'done')
+HANDLERS: dict[str, tuple[Callable[[dict], None], bool]] = {
+    'notification': (_deliver_notification, True),
+    'sms': (_deliver_sms, False),
+}
+
+
+def enqueue(kind: str, payload: dict) -> OutboxMessage:
+    """Ставить дію в чергу; викликайте всередині транзакції бізнес-зміни."""
+    if kind not in HANDLERS:
+        raise ValueError(f"Невідомий тип повідомлення черги: {kind}")
+    return OutboxMessage.objects.create(kind=kind, payload=payload)
+
+
+def enqueue_notification(
+    recipient_id: int,
+    notif_type: str,
+    title: str,
+    message: str = '',
+    post_id: Optional[int] = None,
+) -> OutboxMessage:
+    return enqueue('notification', {
+        'recipient_id': recipient_id,
+        'notif_type': notif_type,
+        'title': title,
+        'message': message,
+        'post_id': post_id,
+    })
+
+
+def enqueue_sms(user_id: int, message: str) -> OutboxMessage:
+    """Номер телефону береться під час відправки — актуальний на той момент."""
+    return enqueue('sms', {'user_id': user_id, 'message': message})
+
+
+def retry_delay(attempts: int) -> timedelta:
+    return timedelta(seconds=min(BASE_RETRY_DELAY * 2 ** max(attempts - 1, 0), MAX_RETRY_DELAY))
+
+
+def _claim(batch_size: int, now: datetime) -> list[OutboxMessage]:
+    """Захоплює до batch_size готових повідомлень: +1 спроба і оренда до now + LEASE_SECONDS."""
+    with transaction.atomic():
+        ids = list(
+            OutboxMessage.objects.select_for_update(skip_locked=True)
+            .filter(status='pending', available_at__lte=now)
+            .order_by('id').values_list('id', flat=True)[:batch_size]
+        )
+        if not ids:
+            return []
+        OutboxMessage.objects.filter(id__in=ids).update(
+            attempts=F('attempts') + 1,
+            available_at=now + timedelta(seconds=LEASE_SECONDS),
+        )
+    return list(OutboxMessage.objects.filter(id__in=ids).order_by('id'))
+
+
+def _fail(message: OutboxMessage, error: str, now: datetime) -> str:
+    if message.attempts >= MAX_ATTEMPTS:
+        OutboxMessage.objects.filter(id=message.id).update(status='dead', last_error=error, processed_at=now)
+        logger.error("Outbox #%s (%s): спроби вичерпано: %s", message.id, message.kind, error)
+        return 'dead'
+    OutboxMessage.objects.filter(id=message.id).update(
+        last_error=error, available_at=now + retry_delay(message.attempts),
+    )
+    logger.warning("Outbox #%s (%s), спроба %s: %s", message.id, message.kind, message.attempts, error)
+    return 'retried'
+
+
+def process_batch(batch_size: int = DEFAULT_BATCH_SIZE, now: Optional[datetime] = None) -> dict:
+    """
+    Обробляє один пакет черги.
+
+    Returns:
+        {'claimed': int, 'done': int, 'retried': int, 'dead': int}
+    """
+    now = now or timezone.now()
+    stats = {'claimed': 0, 'done': 0, 'retried': 0, 'dead': 0}
+    for message in _claim(batch_size, now):
+        stats['claimed'] += 1
+        handler, atomic = HANDLERS.get(message.kind, (None, False))
+        if handler is None:
+            # Невідомий тип не виправиться повтором
+            message.attempts = MAX_ATTEMPTS
+            stats[_fail(message, f"Невідомий тип повідомлення: {message.kind}", now)] += 1
+            continue
+        try:
+            if atomic:
+                with transaction.atomic():
+                    handler(message.payload)
+                    _mark_done(message, now)
+            else:
+                handler(message.payload)
+                _mark_done(message, now)
+        except Exception as exc:
+            stats[_fail(message, f"{type(exc).__name__}: {exc}", now)] += 1
+        else:
+            stats['done'] += 1
+    return stats
+
+
+def _mark_done(message: OutboxMessage, now: datetime) -> None:
+    OutboxMessage.objects.filter(id=message.id).update(status='done', processed_at=now, last_error='')
+
+
+def requeue(message_ids: Iterable[int]) -> int:
+    """Повертає повідомлення (зазвичай 'dead') у чергу з новим лічильником спроб."""
+    return OutboxMessage.objects.filter(id__in=list(message_ids)).exclude(status='done').update(
+        status='pending', attempts=0, available_at=timezone.now(), processed_at=None,
+    )
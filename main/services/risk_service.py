@@ -0,0 +1,247 @@
+"""
+Risk Service - інкрементальний рушій оцінки ризику студентів
+
+Цей модуль містить функції для:
+- Розрахунку компонент ризику (неповажні пропуски, спад оцінок,
+  пропущені ДЗ, низький зважений бал) пакетом студентів
+- Збереження балу в індексовану таблицю StudentRiskScore (upsert)
+- Швидких top-N запитів по викладачу, групі або курсу
+
+Оновлення запускається сигналами після кожної зміни оцінки, пропуску чи
+здачі ДЗ (лише для зачепленого студента), а також щоночі командою
+recompute_risk_scores — вона підхоплює ДЗ, дедлайн яких минув без записів.
+"""
+
+from typing import Iterable, Optional
+
+from django.db.models import Avg, Count, F, Sum, Window
+from django.db.models.functions import RowNumber
+from django.utils import timezone
+
+from main.models import (
+    HomeworkSubmission,
+    Lesson,
+    StudentPerformance,
+    StudentRiskScore,
+    TeachingAssignment,
+    User,
+)
+from main.services.db_utils import bulk_upsert
+
+# Внесок кожної компоненти в бал 0–100 та рівень "насичення"
+ABSENCE_WEIGHT, ABSENCE_CAP = 35.0, 10         # 10+ неповажних пропусків = максимум
+TREND_WEIGHT, TREND_CAP = 20.0, 1.0            # спад на 1 бал за оцінку = максимум
+HOMEWORK_WEIGHT, HOMEWORK_CAP = 20.0, 5        # 5+ пропущених ДЗ = максимум
+GRADE_WEIGHT = 25.0
+GRADE_OK, GRADE_MIN = 7.0, 1.0                 # "Добре" і нижня межа шкали
+
+TREND_WINDOW = 10          # кількість останніх оцінок для тренду
+RISK_SCORE_THRESHOLD = 25  # нижче цього студент не потрапляє на радар
+BATCH_SIZE = 500
+
+
+def _trend_slope(values: list[float]) -> float:
+    """Нахил лінійної регресії (бал на одну оцінку) для хронологічного ряду."""
+    n = len(values)
+    if n < 3:
+        return 0.0
+    mean_x = (n - 1) / 2
+    mean_y = sum(values) / n
+    cov = sum((i - mean_x) * (v - mean_y) for i, v in enumerate(values))
+    var = sum((i - mean_x) ** 2 for i in range(n))
+    return cov / var if var else 0.0
+
+
+def score_components(
+    unexcused_absences: int,
+    grade_trend: float,
+    missing_homework: int,
+    weighted_grade: Optional[float],
+) -> float:
+    """
+    Зведення компонент у бал ризику 0–100.
+
+    Example:
+        >>> score_components(10, -1.0, 5, 1.0)
+        100.0
+        >>> score_components(0, 0.5, 0, 10.0)
+        0.0
+    """
+    score = ABSENCE_WEIGHT * min(unexcused_absences / ABSENCE_CAP, 1.0)
+    score += TREND_WEIGHT * min(max(-grade_trend, 0.0) / TREND_CAP, 1.0)
+    score += HOMEWORK_WEIGHT * min(missing_homework / HOMEWORK_CAP, 1.0)
+    if weighted_grade is not None:
+        score += GRADE_WEIGHT * min(max(GRADE_OK - weighted_grade, 0.0) / (GRADE_OK - GRADE_MIN), 1.0)
+    return round(score, 2)
+
+
+def compute_risk_rows(student_ids: list[int]) -> list[StudentRiskScore]:
+    """
+    Обчислення ризику для пакета студентів фіксованою кількістю запитів (6),
+    незалежно від розміру пакета.
+    """
+    students = list(
+        User.objects.filter(id__in=student_ids, role='student')
+        .values_list('id', 'group_id', 'group__course')
+    )
+    if not students:
+        return []
+    ids = [s[0] for s in students]
+    group_ids = {s[1] for s in students if s[1]}
+
+    # 1. Неповажні пропуски
+    absences = dict(
+        StudentPerformance.objects.filter(student_id__in=ids, absence__is_respectful=False)
+        .order_by().values('student_id').annotate(n=Count('id')).values_list('student_id', 'n')
+    )
+
+    # 2. Зважений бал (як у рейтингу: Σ(бал × вага) / Σ(вага), інакше просте середнє)
+    weighted = {}
+    for row in (
+        StudentPerformance.objects.filter(student_id__in=ids, earned_points__isnull=False)
+        .order_by().values('student_id').annotate(
+            ws=Sum(F('earned_points') * F('lesson__evaluation_type__weight_percent')),
+            wt=Sum('lesson__evaluation_type__weight_percent'),
+            avg=Avg('earned_points'),
+        )
+    ):
+        wt = float(row['wt'] or 0)
+        weighted[row['student_id']] = float(row['ws']) / wt if wt > 0 else float(row['avg'])
+
+    # 3. Тренд останніх TREND_WINDOW оцінок (віконна функція замість N запитів)
+    recent: dict[int, list[float]] = {}
+    for sid, points in (
+        StudentPerformance.objects.filter(student_id__in=ids, earned_points__isnull=False)
+        .annotate(rn=Window(
+            RowNumber(),
+            partition_by=F('student_id'),
+            order_by=[F('lesson__date').desc(), F('lesson__start_time').desc()],
+        ))
+        .filter(rn__lte=TREND_WINDOW)
+        .order_by('student_id', '-rn')
+        .values_list('student_id', 'earned_points')
+    ):
+        recent.setdefault(sid, []).append(float(points))
+
+    # 4. Пропущені ДЗ: уроки з ДЗ і дедлайном у минулому без здачі
+    now = timezone.now()
+    homework_lessons: dict[int, set[int]] = {}
+    for lesson_id, gid in (
+        Lesson.objects.filter(group_id__in=group_ids, deadline__lt=now, is_cancelled=False)
+        .exclude(homework='').values_list('id', 'group_id')
+    ):
+        homework_lessons.setdefault(gid, set()).add(lesson_id)
+    all_hw_lessons = set().union(*homework_lessons.values()) if homework_lessons else set()
+    done: dict[int, set[int]] = {}
+    if all_hw_lessons:
+        for sid, lesson_id in HomeworkSubmission.objects.filter(
+            student_id__in=ids,
+            lesson_id__in=all_hw_lessons,
+            status__in=('turned_in', 'graded'),
+        ).values_list('student_id', 'lesson_id'):
+            done.setdefault(sid, set()).add(lesson_id)
+
+    rows = []
+    for sid, gid, course in students:
+        unexcused = absences.get(sid, 0)
+        trend = _trend_slope(recent.get(sid, []))
+        missing = len(homework_lessons.get(gid, set()) - done.get(sid, set()))
+        grade = weighted.get(sid)
+        rows.append(StudentRiskScore(
+            student_id=sid,
+            group_id=gid,
+            course=course,
+            unexcused_absences=unexcused,
+            grade_trend=round(trend, 3),
+            missing_homework=missing,
+            weighted_grade=round(grade, 2) if grade is not None else None,
+            score=score_components(unexcused, trend, missing, grade),
+            updated_at=now,
+        ))
+    return rows
+
+
+def recalculate_risk(student_ids: Iterable[int]) -> int:
+    """
+    Перерахунок та upsert ризику для переданих студентів.
+
+    Returns:
+        Кількість оновлених рядків
+    """
+    ids = list({sid for sid in student_ids if sid})
+    updated = 0
+    for start in range(0, len(ids), BATCH_SIZE):
+        rows = compute_risk_rows(ids[start:start + BATCH_SIZE])
+        bulk_upsert(
+            StudentRiskScore,
+            rows,
+            unique_fields=['student'],
+            update_fields=[
+                'group', 'course', 'score', 'unexcused_absences', 'grade_trend',
+                'missing_homework', 'weighted_grade', 'updated_at',
+            ],
+        )
+        updated += len(rows)
+    return updated
+
+
+def recalculate_group_risk(group_id: int) -> int:
+    """Перерахунок ризику всіх студентів групи (напр. після зміни ДЗ уроку)."""
+    return recalculate_risk(
+        User.objects.filter(group_id=group_id, role='student').values_list('id', flat=True)
+    )
+
+
+def recalculate_all_risk(batch_size: int = BATCH_SIZE) -> int:
+    """Повний перерахунок (нічна задача). Видаляє рядки колишніх студентів."""
+    StudentRiskScore.objects.exclude(student__role='student').delete()
+    ids = list(User.objects.filter(role='student').order_by('id').values_list('id', flat=True))
+    updated = 0
+    for start in range(0, len(ids), batch_size):
+        updated += recalculate_risk(ids[start:start + batch_size])
+    return updated
+
+
+def get_top_risk_students(
+    teacher_id: Optional[int] = None,
+    group_id: Optional[int] = None,
+    course: Optional[int] = None,
+    limit: int = 10,
+    min_score: float = RISK_SCORE_THRESHOLD,
+) -> list[dict]:
+    """
+    Top-N студентів за балом ризику (один запит по індексу (group, -score)).
+
+    Returns:
+        [{student_id, name, group, score, unexcused_absences, grade_trend,
+          missing_homework, weighted_grade}, ...]
+    """
+    qs = StudentRiskScore.objects.filter(score__gte=min_score)
+    if teacher_id:
+        qs = qs.filter(group_id__in=TeachingAssignment.objects.filter(teacher_id=teacher_id).values('group_id'))
+    if group_id:
+        qs = qs.filter(group_id=group_id)
+    if course:
+        qs = qs.filter(course=course)
+
+    return list(
+        qs.order_by('-score').values(
+            'student_id', 'score', 'unexcused_absences', 'grade_trend',
+            'missing_homework', 'weighted_grade',
+            name=F('student__full_name'), group_name=F('group__name'),
+        )[:limit]
+    )
+
+
+def describe_risk(row: dict) -> str:
+    """Короткий людський опис головних причин ризику."""
+    parts = []
+    if row['unexcused_absences']:
+        parts.append(f"{row['unexcused_absences']} пропусків")
+    if row['grade_trend'] <= -0.2:
+        parts.append("спад оцінок")
+    if row['missing_homework']:
+        parts.append(f"{row['missing_homework']} ДЗ не здано")
+    if row['weighted_grade'] is not None and row['weighted_grade'] < GRADE_OK:
+        parts.append(f"бал {row['weighted_grade']:.1f}")
+    return ' · '.join(parts) or 'ризик'
@@ -0,0 +1,273 @@
+"""
+Room Utilisation Service - завантаженість аудиторій за матеріалізованими уроками
+
+Цей модуль містить функції для:
+- Звіту по кожній аудиторії: зайняті хвилини (об'єднання інтервалів),
+  пікова кількість одночасних занять, вікна простою в межах робочого дня,
+  відповідність місткості розміру груп
+- Зведень по корпусах і поверхах: пікова кількість одночасно зайнятих
+  аудиторій та її час
+
+Усе рахується одним проходом сканувальної прямої по уроках, відсортованих
+базою за (аудиторія, дата, початок), — 4 запити на будь-який період.
+"""
+
+from dataclasses import dataclass, field
+from datetime import date, time, timedelta
+from typing import Optional
+
+from django.db.models import Count
+
+from main.models import Classroom, Holiday, Lesson, User
+from main.services.schedule_index import to_minutes
+
+DEFAULT_DAY_START = time(8, 0)
+DEFAULT_DAY_END = time(18, 0)
+DEFAULT_MIN_IDLE = 30  # хв; коротші перерви між парами простоєм не вважаються
+UNDERFILLED_RATIO = 0.5
+
+
+@dataclass
+class RoomStats:
+    id: int
+    name: str
+    building: str
+    floor: Optional[int]
+    capacity: Optional[int]
+    type: str
+    sessions: int = 0
+    occupied_minutes: int = 0
+    peak_concurrency: int = 0
+    idle_minutes: int = 0
+    idle_windows: int = 0
+    longest_idle: Optional[dict] = None
+    over_capacity: int = 0
+    underfilled: int = 0
+    fill_sum: float = 0.0
+    fill_count: int = 0
+    busy_days: set = field(default_factory=set)
+
+    def as_dict(self, available_minutes: int) -> dict:
+        return {
+            'id': self.id,
+            'name': self.name,
+            'building': self.building,
+            'floor': self.floor,
+            'capacity': self.capacity,
+            'type': self.type,
+            'sessions': self.sessions,
+            'occupied_minutes': self.occupied_minutes,
+            'utilisation': round(self.occupied_minutes / available_minutes * 100, 1) if available_minutes else 0.0,
+            'peak_concurrency': self.peak_concurrency,
+            'idle_minutes': self.idle_minutes,
+            'idle_windows': self.idle_windows,
+            'longest_idle': self.longest_idle,
+            'over_capacity': self.over_capacity,
+            'underfilled': self.underfilled,
+            'avg_fill': round(self.fill_sum / self.fill_count * 100, 1) if self.fill_count else None,
+            'busy_days': len(self.busy_days),
+        }
+
+
+def _working_days(date_from: date, date_to: date, lesson_dates: set[date]) -> list[date]:
+    """Пн–Пт без свят, плюс будь-які інші дати, на які є уроки."""
+    holidays = set(Holiday.objects.filter(date__range=(date_from, date_to)).values_list('date', flat=True))
+    days = []
+    day = date_from
+    while day <= date_to:
+        if (day.isoweekday() <= 5 and day not in holidays) or day in lesson_dates:
+            days.append(day)
+        day += timedelta(days=1)
+    return days
+
+
+def _fmt(minutes: int) -> str:
+    return f"{minutes // 60:02d}:{minutes % 60:02d}"
+
+
+def _peak(intervals: list[tuple[int, int]]) -> tuple[int, int]:
+    """Максимум одночасних інтервалів та хвилина, коли він досягається (кінець раніше початку)."""
+    events = sorted([(start, 1) for start, _ in intervals] + [(end, -1) for _, end in intervals])
+    current = peak = peak_at = 0
+    for minute, delta in events:
+        current += delta
+        if current > peak:
+            peak, peak_at = current, minute
+    return peak, peak_at
+
+
+def room_utilisation(
+    date_from: date,
+    date_to: date,
+    day_start: time = DEFAULT_DAY_START,
+    day_end: time = DEFAULT_DAY_END,
+    min_idle: int = DEFAULT_MIN_IDLE,
+    building: Optional[str] = None,
+) -> dict:
+    """
+    Завантаженість аудиторій за період.
+
+    Returns:
+        {'params': {...}, 'days': int, 'rooms': [...], 'buildings': [...], 'floors': [...],
+         'totals': {...}} — рядки аудиторій впорядковані за завантаженістю (спадання)
+    """
+    window_start, window_end = to_minutes(day_start), to_minutes(day_end)
+    classrooms = Classroom.objects.filter(is_active=True)
+    if building:
+        classrooms = classrooms.filter(building=building)
+    rooms = {
+        pk: RoomStats(id=pk, name=name, building=bld or '', floor=floor, capacity=capacity, type=kind)
+        for pk, name, bld, floor, capacity, kind in classrooms.order_by('building', 'floor', 'name').values_list(
+            'id', 'name', 'building', 'floor', 'capacity', 'type',
+        )
+    }
+    group_sizes = dict(
+        User.objects.filter(role='student', is_active=True, group__isnull=False)
+        .values_list('group_id').annotate(n=Count('id')).values_list('group_id', 'n')
+    )
+    rows = (
+        Lesson.objects.filter(date__range=(date_from, date_to), is_cancelled=False, classroom_id__in=list(rooms))
+        .order_by('classroom_id', 'date', 'start_time')
+        .values_list('classroom_id', 'date', 'start_time', 'end_time', 'group_id')
+    )
+
+    # (аудиторія, дата) -> [(start, end, group_id)], уже в порядку початку
+    by_room_day: dict[tuple[int, date], list[tuple[int, int, int]]] = {}
+    for room_id, day, start, end, group_id in rows:
+        by_room_day.setdefault((room_id, day), []).append((to_minutes(start), to_minutes(end), group_id))
+
+    days = _working_days(date_from, date_to, {day for _, day in by_room_day})
+    # Об'єднані зайняті інтервали кожної аудиторії по датах — для піків корпусів і поверхів
+    occupied_by_day: dict[date, list[tuple[int, int, int]]] = {}
+
+    for (room_id, day), lessons in by_room_day.items():
+        room = rooms[room_id]
+        room.busy_days.add(day)
+
+        # Сесія — уроки з тим самим часом (спільна пара кількох груп)
+        sessions: dict[tuple[int, int], int] = {}
+        for start, end, group_id in lessons:
+            sessions[(start, end)] = sessions.get((start, end), 0) + group_sizes.get(group_id, 0)
+        room.sessions += len(sessions)
+        room.peak_concurrency = max(room.peak_concurrency, _peak(list(sessions))[0])
+        if room.capacity:
+            for students in sessions.values():
+                if not students:
+                    continue
+                ratio = students / room.capacity
+                room.fill_sum += ratio
+                room.fill_count += 1
+                room.over_capacity += ratio > 1
+                room.underfilled += ratio < UNDERFILLED_RATIO
+
+        # Об'єднання інтервалів (вони відсортовані за початком)
+        merged: list[list[int]] = []
+        for start, end in sorted(sessions):
+            if merged and start <= merged[-1][1]:
+                merged[-1][1] = max(merged[-1][1], end)
+            else:
+                merged.append([start, end])
+        for start, end in merged:
+            clipped = min(end, window_end) - max(start, window_start)
+            if clipped > 0:
+                room.occupied_minutes += clipped
+            occupied_by_day.setdefault(day, []).append((start, end, room_id))
+
+        # Простій між заняттями в межах робочого вікна
+        cursor = window_start
+        for start, end in merged + [[window_end, window_end]]:
+            gap_end = min(start, window_end)
+            if gap_end - cursor >= min_idle:
+                _add_idle(room, day, cursor, gap_end)
+            cursor = max(cursor, end)
+
+    # Аудиторії без жодного заняття в робочий день — простій увесь день
+    for room in rooms.values():
+        for day in days:
+            if day not in room.busy_days and window_end - window_start >= min_idle:
+                _add_idle(room, day, window_start, window_end)
+
+    available = len(days) * max(window_end - window_start, 0)
+    room_rows = sorted(
+        (room.as_dict(available) for room in rooms.values()),
+        key=lambda r: (-r['utilisation'], r['building'], r['name']),
+    )
+    return {
+        'params': {
+            'date_from': date_from.isoformat(),
+            'date_to': date_to.isoformat(),
+            'day_start': day_start.strftime('%H:%M'),
+            'day_end': day_end.strftime('%H:%M'),
+            'min_idle': min_idle,
+            'building': building or '',
+        },
+        'days': len(days),
+        'rooms': room_rows,
+        'buildings': _aggregate(rooms, occupied_by_day, available, lambda r: (r.building,)),
+        'floors': _aggregate(rooms, occupied_by_day, available, lambda r: (r.building, r.floor)),
+        'totals': _aggregate(rooms, occupied_by_day, available, lambda r: ())[0] if rooms else None,
+    }
+
+
+def _add_idle(room: RoomStats, day: date, start: int, end: int) -> None:
+    room.idle_minutes += end - start
+    room.idle_windows += 1
+    if room.longest_idle is None or end - start > room.longest_idle['minutes']:
+        room.longest_idle = {'date': day.isoformat(), 'start': _fmt(start), 'end': _fmt(end), 'minutes': end - start}
+
+
+def _aggregate(rooms: dict[int, RoomStats], occupied_by_day: dict, available: int, key) -> list[dict]:
+    """
+    Зведення за ключем (корпус / корпус+поверх / усе): сума хвилин та пік
+    одночасно зайнятих аудиторій — та сама сканувальна пряма по об'єднаних інтервалах.
+    """
+    groups: dict[tuple, dict] = {}
+    for room in rooms.values():
+        entry = groups.setdefault(key(room), {'rooms': 0, 'occupied_minutes': 0, 'peak': (0, None, None)})
+        entry['rooms'] += 1
+        entry['occupied_minutes'] += room.occupied_minutes
+
+    for day, intervals in occupied_by_day.items():
+        by_group: dict[tuple, list[tuple[int, int]]] = {}
+        for start, end, room_id in intervals:
+            by_group.setdefault(key(rooms[room_id]), []).append((start, end))
+        for group_key, group_intervals in by_group.items():
+            count, at = _peak(group_intervals)
+            if count > groups[group_key]['peak'][0]:
+                groups[group_key]['peak'] = (count, day.isoformat(), _fmt(at))
+
+    result = []
+    for group_key, entry in groups.items():
+        capacity = available * entry['rooms']
+        row = dict(zip(('building', 'floor'), group_key))
+        row.update({
+            'rooms': entry['rooms'],
+            'occupied_minutes': entry['occupied_minutes'],
+            'utilisation': round(entry['occupied_minutes'] / capacity * 100, 1) if capacity else 0.0,
+            'peak_rooms': entry['peak'][0],
+            'peak_date': entry['peak'][1],
+            'peak_time': entry['peak'][2],
+        })
+        result.append(row)
+    return sorted(result, key=lambda r: (r.get('building', ''), r.get('floor') if r.get('floor') is not None else -1))
+
+
+UTILISATION_CSV_HEADER = [
+    'Аудиторія', 'Корпус', 'Поверх', 'Тип', 'Місткість', 'Занять', 'Зайнято, хв', 'Завантаженість, %',
+    'Пік одночасних', 'Простій, хв', 'Вікон простою', 'Найдовший простій', 'Переповнених', 'Недозаповнених',
+    'Сер. заповнення, %',
+]
+
+
+def utilisation_csv_rows(report: dict) -> list[list]:
+    rows = []
+    for r in report['rooms']:
+        idle = r['longest_idle']
+        rows.append([
+            r['name'], r['building'], r['floor'] if r['floor'] is not None else '', r['type'], r['capacity'] or '',
+            r['sessions'], r['occupied_minutes'], r['utilisation'], r['peak_concurrency'],
+            r['idle_minutes'], r['idle_windows'],
+            f"{idle['date']} {idle['start']}–{idle['end']}" if idle else '',
+            r['over_capacity'], r['underfilled'], r['avg_fill'] if r['avg_fill'] is not None else '',
+        ])
+    return rows
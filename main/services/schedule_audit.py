@@ -0,0 +1,157 @@
+"""
+Schedule Audit - глобальна перевірка шаблонів розкладу на конфлікти
+
+Цей модуль містить функції для:
+- Пошуку перетинів груп, викладачів та аудиторій одним проходом
+  сканувальної прямої (sweep line) по шаблонах, відсортованих за початком:
+  O(n log n + k), де k — кількість знайдених конфліктів
+- Врахування "спільної пари" (той самий предмет і час початку для
+  викладача; плюс той самий викладач для аудиторії), типу тижня
+  (чисельник/знаменник) та періодів дії шаблонів
+- Підсумку для management-команди та адмін-сторінки стану розкладу
+"""
+
+from dataclasses import asdict, dataclass
+from datetime import date
+from typing import Iterable, Optional
+
+from main.models import ScheduleTemplate
+from main.services.schedule_index import RESOURCE_KINDS, to_minutes
+from main.services.schedule_service import DAY_SHORT_NAMES
+
+
+@dataclass(frozen=True)
+class AuditSlot:
+    id: int
+    day: int
+    start: int
+    end: int
+    lesson_number: int
+    group_id: int
+    teacher_id: Optional[int]
+    classroom_id: Optional[int]
+    subject_id: int
+    week_type: str
+    valid_from: date
+    valid_to: Optional[date]
+    group_name: str
+    teacher_name: str
+    classroom_name: str
+    subject_name: str
+
+    @property
+    def start_time(self) -> str:
+        return f"{self.start // 60:02d}:{self.start % 60:02d}"
+
+    def resource(self, kind: str) -> Optional[int]:
+        return getattr(self, f'{kind}_id')
+
+
+def load_audit_slots(active_only: bool = True) -> list[AuditSlot]:
+    """Усі шаблони розкладу з назвами ресурсів (1 запит)."""
+    qs = ScheduleTemplate.objects.all()
+    if active_only:
+        qs = qs.filter(is_active=True)
+    rows = qs.values_list(
+        'id', 'day_of_week', 'start_time', 'duration_minutes', 'lesson_number',
+        'group_id', 'teacher_id', 'classroom_id', 'subject_id', 'week_type', 'valid_from', 'valid_to',
+        'group__name', 'teacher__full_name', 'classroom__name', 'subject__name',
+    )
+    slots = []
+    for (pk, day, start_time, duration, number, group_id, teacher_id, classroom_id, subject_id,
+         week_type, valid_from, valid_to, group_name, teacher_name, classroom_name, subject_name) in rows:
+        start = to_minutes(start_time)
+        slots.append(AuditSlot(
+            id=pk, day=day, start=start, end=start + duration, lesson_number=number,
+            group_id=group_id, teacher_id=teacher_id, classroom_id=classroom_id, subject_id=subject_id,
+            week_type=week_type or '', valid_from=valid_from, valid_to=valid_to,
+            group_name=group_name or '', teacher_name=teacher_name or '',
+            classroom_name=classroom_name or '', subject_name=subject_name or '',
+        ))
+    return slots
+
+
+def _can_coexist(a: AuditSlot, b: AuditSlot) -> bool:
+    """Пари з різним типом тижня або періодами дії, що не перетинаються, ніколи не збігаються."""
+    if a.week_type and b.week_type and a.week_type != b.week_type:
+        return True
+    if a.valid_to and a.valid_to < b.valid_from:
+        return True
+    if b.valid_to and b.valid_to < a.valid_from:
+        return True
+    return False
+
+
+def _is_shared_lesson(kind: str, a: AuditSlot, b: AuditSlot) -> bool:
+    """Той самий виняток, що й у validate_schedule_slot."""
+    if kind == 'teacher':
+        return a.subject_id == b.subject_id and a.start == b.start
+    if kind == 'classroom':
+        return a.teacher_id == b.teacher_id and a.subject_id == b.subject_id and a.start == b.start
+    return False
+
+
+def find_conflicts(slots: list[AuditSlot], kinds: Iterable[str] = RESOURCE_KINDS) -> list[dict]:
+    """
+    Sweep line: шаблони обходяться за (день, початок); для кожного ресурсу
+    тримається список "відкритих" інтервалів, з яких при кожному новому
+    початку викидаються ті, що вже закінчились. Кожен відкритий інтервал
+    того самого ресурсу — перетин.
+
+    Returns:
+        Список конфліктів {kind, resource_id, resource_name, day, overlap_minutes, first, second}
+    """
+    kinds = tuple(kinds)
+    open_intervals: dict[tuple[str, int], list[AuditSlot]] = {}
+    current_day = None
+    conflicts = []
+
+    for slot in sorted(slots, key=lambda s: (s.day, s.start, s.end, s.id)):
+        if slot.day != current_day:
+            open_intervals.clear()
+            current_day = slot.day
+        for kind in kinds:
+            resource_id = slot.resource(kind)
+            if not resource_id:
+                continue
+            active = [s for s in open_intervals.get((kind, resource_id), ()) if s.end > slot.start]
+            for other in active:
+                if _can_coexist(other, slot) or _is_shared_lesson(kind, other, slot):
+                    continue
+                conflicts.append({
+                    'kind': kind,
+                    'resource_id': resource_id,
+                    'resource_name': getattr(slot, f'{kind}_name'),
+                    'day': slot.day,
+                    'day_name': DAY_SHORT_NAMES.get(slot.day, ''),
+                    'overlap_minutes': min(other.end, slot.end) - slot.start,
+                    'first': _describe(other),
+                    'second': _describe(slot),
+                })
+            active.append(slot)
+            open_intervals[(kind, resource_id)] = active
+    return conflicts
+
+
+def _describe(slot: AuditSlot) -> dict:
+    data = asdict(slot)
+    data['start_time'] = slot.start_time
+    data['valid_from'] = slot.valid_from.isoformat() if slot.valid_from else None
+    data['valid_to'] = slot.valid_to.isoformat() if slot.valid_to else None
+    return data
+
+
+def audit_schedule(kinds: Iterable[str] = RESOURCE_KINDS, active_only: bool = True) -> dict:
+    """
+    Повний звіт про стан розкладу.
+
+    Returns:
+        {'templates': int, 'conflicts': [...], 'by_kind': {kind: count}}
+    """
+    kinds = tuple(kinds)
+    slots = load_audit_slots(active_only=active_only)
+    conflicts = find_conflicts(slots, kinds)
+    by_kind = {kind: 0 for kind in kinds}
+    for conflict in conflicts:
+        by_kind[conflict['kind']] += 1
+    return {'templates': len(slots), 'conflicts': conflicts, 'by_kind': by_kind}
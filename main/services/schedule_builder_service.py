@@ -0,0 +1,111 @@
+"""
+Schedule Builder Service - дані конструктора тижневого розкладу
+
+Цей модуль містить функції для:
+- Тижня однієї групи на вимогу (конструктор редагує по одній групі,
+  тож сторінка не завантажує шаблони всього закладу)
+- Зайнятості викладачів в інших групах — лише для запитаних викладачів
+- Мапи предмет -> викладачі одним згрупованим запитом з кешуванням
+  (інвалідація — сигнали навантажень і викладачів у models.py)
+"""
+
+from typing import Iterable, Optional
+
+from django.core.cache import cache
+
+from main.models import ScheduleTemplate, Subject, TeachingAssignment
+
+SUBJECT_TEACHERS_KEY = 'schedule_builder:subject_teachers'
+SUBJECT_TEACHERS_TTL = 60 * 60 * 24  # сек
+
+
+def get_group_week(group_id: int) -> dict:
+    """
+    Шаблони групи у форматі конструктора (1 запит).
+
+    Returns:
+        {day: {lesson_number: {subject_id, subject_name, teacher_id, teacher_name,
+          start_time, duration, classroom}}} — ключі рядкові, як у JSON
+    """
+    week: dict[str, dict] = {}
+    rows = ScheduleTemplate.objects.filter(group_id=group_id).values_list(
+        'day_of_week', 'lesson_number', 'subject_id', 'subject__name', 'teacher_id', 'teacher__full_name',
+        'start_time', 'duration_minutes', 'classroom__name',
+    )
+    for day, number, subject_id, subject_name, teacher_id, teacher_name, start, duration, classroom in rows:
+        if not number:
+            continue
+        week.setdefault(str(day), {})[str(number)] = {
+            'subject_id': subject_id,
+            'subject_name': subject_name,
+            'teacher_id': teacher_id,
+            'teacher_name': teacher_name or '',
+            'start_time': start.strftime('%H:%M'),
+            'duration': duration,
+            'classroom': classroom or '',
+        }
+    return week
+
+
+def get_group_teacher_ids(group_id: int, week: Optional[dict] = None) -> set[int]:
+    """Викладачі, яких конструктор групи покаже першими: з її навантажень і поточного тижня."""
+    teacher_ids = set(TeachingAssignment.objects.filter(group_id=group_id).values_list('teacher_id', flat=True))
+    for lessons in (week or {}).values():
+        teacher_ids.update(lesson['teacher_id'] for lesson in lessons.values() if lesson['teacher_id'])
+    return teacher_ids
+
+
+def get_teacher_busy(teacher_ids: Iterable[int], exclude_group_id: Optional[int] = None) -> dict:
+    """
+    Слоти, де викладачі вже ведуть пари в інших групах (1 запит).
+
+    Returns:
+        {teacher_id: {day: {lesson_number: [назви груп]}}} — ключі рядкові
+    """
+    teacher_ids = {int(tid) for tid in teacher_ids if tid}
+    busy: dict[str, dict] = {str(tid): {} for tid in teacher_ids}
+    if not teacher_ids:
+        return busy
+    qs = ScheduleTemplate.objects.filter(teacher_id__in=teacher_ids)
+    if exclude_group_id:
+        qs = qs.exclude(group_id=exclude_group_id)
+    rows = qs.order_by('group__name').values_list('teacher_id', 'day_of_week', 'lesson_number', 'group__name')
+    for teacher_id, day, number, group_name in rows:
+        groups = busy[str(teacher_id)].setdefault(str(day), {}).setdefault(str(number), [])
+        if group_name not in groups:
+            groups.append(group_name)
+    return busy
+
+
+def build_subject_teachers_map() -> dict:
+    """
+    Предмет -> викладачі одним запитом по навантаженнях (замість запиту на предмет).
+
+    Returns:
+        {'subjects': [{'id', 'name'}], 'teachers': {subject_id: [{'id', 'name'}]}} —
+        лише предмети, які хтось викладає
+    """
+    rows = TeachingAssignment.objects.values_list(
+        'subject_id', 'teacher_id', 'teacher__full_name',
+    ).distinct().order_by('subject_id', 'teacher__full_name', 'teacher_id')
+    teachers: dict[int, list[dict]] = {}
+    for subject_id, teacher_id, teacher_name in rows:
+        teachers.setdefault(subject_id, []).append({'id': teacher_id, 'name': teacher_name})
+    subjects = [
+        {'id': pk, 'name': name}
+        for pk, name in Subject.objects.filter(id__in=teachers).order_by('name').values_list('id', 'name')
+    ]
+    return {'subjects': subjects, 'teachers': teachers}
+
+
+def get_subject_teachers_map() -> dict:
+    """Мапа з кешу; будується при промаху (2 запити)."""
+    data = cache.get(SUBJECT_TEACHERS_KEY)
+    if data is None:
+        data = build_subject_teachers_map()
+        cache.set(SUBJECT_TEACHERS_KEY, data, SUBJECT_TEACHERS_TTL)
+    return data
+
+
+def invalidate_subject_teachers_map() -> None:
+    cache.delete(SUBJECT_TEACHERS_KEY)
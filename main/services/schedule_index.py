@@ -0,0 +1,160 @@
+"""
+Schedule Index - інтервальний індекс шаблонів розкладу
+
+Цей модуль містить:
+- ScheduleIndex: відсортовані масиви хвилинних зсувів по (ресурс, день)
+  для груп, викладачів та аудиторій з пошуком перетинів за O(log n + k)
+- Завантаження індексу одним запитом: повного (кешується для UI, що лише
+  читає) або звуженого до днів і ресурсів (свіжий з БД для перевірок перед записом)
+- Інвалідацію кешу при зміні ScheduleTemplate (див. сигнали в models.py);
+  разом з індексом скидається похідна матриця зайнятості (availability_service)
+"""
+
+from bisect import bisect_left
+from dataclasses import dataclass
+from datetime import time
+from typing import Iterable, Iterator, Optional
+
+from django.core.cache import cache
+from django.db.models import Q
+
+from main.models import ScheduleTemplate
+
+SCHEDULE_INDEX_KEY = 'schedule:interval_index'
+FREEBUSY_KEY = 'schedule:freebusy'
+SCHEDULE_INDEX_TTL = 60 * 60  # сек
+
+RESOURCE_KINDS = ('group', 'teacher', 'classroom')
+
+
+def to_minutes(value: time) -> int:
+    """Хвилини від початку доби."""
+    return value.hour * 60 + value.minute
+
+
+@dataclass(frozen=True)
+class SlotInterval:
+    """Проєкція ScheduleTemplate, достатня для перевірки конфліктів та повідомлень."""
+    id: int
+    day: int
+    start: int  # хвилини від початку доби
+    end: int
+    start_time: time
+    lesson_number: int
+    group_id: int
+    teacher_id: Optional[int]
+    classroom_id: Optional[int]
+    subject_id: int
+    group_name: str
+    subject_name: str
+
+
+class _DayIntervals:
+    """Інтервали одного ресурсу в один день: сортування за початком + префіксний максимум кінців."""
+
+    __slots__ = ('starts', 'max_ends', 'items')
+
+    def __init__(self, items: list[SlotInterval]):
+        self.items = sorted(items, key=lambda i: (i.start, i.end))
+        self.starts = [i.start for i in self.items]
+        self.max_ends = []
+        running = -1
+        for item in self.items:
+            running = max(running, item.end)
+            self.max_ends.append(running)
+
+    def overlapping(self, start: int, end: int) -> Iterator[SlotInterval]:
+        """Інтервали з перетином [start, end), від найпізнішого початку."""
+        i = bisect_left(self.starts, end) - 1
+        while i >= 0 and self.max_ends[i] > start:
+            if self.items[i].end > start:
+                yield self.items[i]
+            i -= 1
+
+
+class ScheduleIndex:
+    """Інтервальний індекс усіх шаблонів розкладу по (вид ресурсу, ID, день тижня)."""
+
+    def __init__(self, intervals: list[SlotInterval]):
+        buckets: dict[tuple[str, int, int], list[SlotInterval]] = {}
+        for interval in intervals:
+            for kind in RESOURCE_KINDS:
+                resource_id = getattr(interval, f'{kind}_id')
+                if resource_id:
+                    buckets.setdefault((kind, resource_id, interval.day), []).append(interval)
+        self._index = {key: _DayIntervals(items) for key, items in buckets.items()}
+        self.intervals = intervals
+
+    @classmethod
+    def load(
+        cls,
+        days: Optional[Iterable[int]] = None,
+        group_ids: Iterable[int] = (),
+        teacher_ids: Iterable[int] = (),
+        classroom_ids: Iterable[int] = (),
+    ) -> 'ScheduleIndex':
+        """
+        Побудова індексу з БД (1 запит, лише потрібні колонки).
+
+        Якщо задано days або ID ресурсів — лише слоти цих днів, що займають
+        хоча б один із ресурсів (достатньо для перевірки конкретних слотів).
+        """
+        templates = ScheduleTemplate.objects.all()
+        if days is not None:
+            templates = templates.filter(day_of_week__in=list(days))
+        scope = Q()
+        for field, ids in (('group_id', group_ids), ('teacher_id', teacher_ids), ('classroom_id', classroom_ids)):
+            ids = [pk for pk in ids if pk]
+            if ids:
+                scope |= Q(**{f'{field}__in': ids})
+        if scope:
+            templates = templates.filter(scope)
+        rows = templates.values_list(
+            'id', 'day_of_week', 'start_time', 'duration_minutes', 'lesson_number',
+            'group_id', 'teacher_id', 'classroom_id', 'subject_id',
+            'group__name', 'subject__name',
+        )
+        intervals = []
+        for (pk, day, start_time, duration, number,
+             group_id, teacher_id, classroom_id, subject_id, group_name, subject_name) in rows:
+            start = to_minutes(start_time)
+            intervals.append(SlotInterval(
+                id=pk, day=day, start=start, end=start + duration, start_time=start_time,
+                lesson_number=number, group_id=group_id, teacher_id=teacher_id,
+                classroom_id=classroom_id, subject_id=subject_id,
+                group_name=group_name, subject_name=subject_name,
+            ))
+        return cls(intervals)
+
+    def overlapping(
+        self,
+        kind: str,
+        resource_id: Optional[int],
+        day: int,
+        start_time: time,
+        duration: int,
+    ) -> Iterator[SlotInterval]:
+        """Слоти ресурсу в цей день, що перетинаються з [start_time, +duration)."""
+        bucket = self._index.get((kind, resource_id, day))
+        if bucket is None:
+            return iter(())
+        start = to_minutes(start_time)
+        return bucket.overlapping(start, start + duration)
+
+
+def get_schedule_index() -> ScheduleIndex:
+    """
+    Повний індекс з кешу; будується при промаху.
+
+    Лише для читання: кеш скидається після коміту, тож перевірки перед
+    записом беруть ScheduleIndex.load() у своїй транзакції.
+    """
+    index = cache.get(SCHEDULE_INDEX_KEY)
+    if index is None:
+        index = ScheduleIndex.load()
+        cache.set(SCHEDULE_INDEX_KEY, index, SCHEDULE_INDEX_TTL)
+    return index
+
+
+def invalidate_schedule_index() -> None:
+    cache.delete_many([SCHEDULE_INDEX_KEY, FREEBUSY_KEY])
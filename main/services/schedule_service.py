@@ -4,20 +4,26 @@ Schedule Service - Business Logic для системи розкладу
 Цей модуль містить функції для:
 - Валідації розкладу
 - Перевірки конфліктів (час, викладач, аудиторія)
-- Управління шаблонами розкладу
+- Управління шаблонами розкладу (пакетне збереження тижня групи)
 """
 
-from datetime import date, time, datetime, timedelta
-from typing import Optional, Tuple
+from datetime import datetime, time
+from typing import Iterable, Optional, Tuple
+
+from django.db import transaction
+from django.utils import timezone
 
-from django.db.models import Q
 from main.models import (
     ScheduleTemplate,
     StudyGroup,
+    TeachingAssignment,
     User,
     Classroom,
     Subject,
 )
+from main.services.availability_service import get_freebusy_matrix
+from main.services.schedule_index import ScheduleIndex, invalidate_schedule_index, to_minutes
+from main.services.schedule_version_service import record_schedule_versions
 
 
 def check_time_overlap(
@@ -44,16 +50,12 @@ def check_time_overlap(
         >>> check_time_overlap(time(8, 30), 80, time(10, 0), 80)
         False  # 08:30-09:50 не перетинається з 10:00-11:20
     """
-    # Конвертуємо часи в datetime для розрахунків
-    base_date = date.today()
-    start1_dt = datetime.combine(base_date, start1)
-    end1_dt = start1_dt + timedelta(minutes=duration1)
-    
-    start2_dt = datetime.combine(base_date, start2)
-    end2_dt = start2_dt + timedelta(minutes=duration2)
-    
+    # Хвилини від початку доби (без datetime-об'єктів на кожне порівняння)
+    begin1 = start1.hour * 60 + start1.minute
+    begin2 = start2.hour * 60 + start2.minute
+
     # Перетин інтервалів: max(start) < min(end)
-    return max(start1_dt, start2_dt) < min(end1_dt, end2_dt)
+    return max(begin1, begin2) < min(begin1 + duration1, begin2 + duration2)
 
 
 def validate_schedule_slot(
@@ -66,7 +68,8 @@ def validate_schedule_slot(
     teacher: Optional[User] = None,
     classroom: Optional[Classroom] = None,
     exclude_slot_id: Optional[int] = None,
-    check_current_group: bool = True
+    check_current_group: bool = True,
+    index: Optional[ScheduleIndex] = None,
 ) -> Tuple[bool, str]:
     """
     Валідація слоту розкладу на наявність конфліктів.
@@ -76,6 +79,10 @@ def validate_schedule_slot(
     2. Чи не зайнятий викладач в цей час
     3. Чи не зайнята аудиторія в цей час
     
+    Пошук виконується в інтервальному індексі; за замовчуванням він
+    завантажується з БД лише для цього дня, групи, викладача й аудиторії
+    (1 запит), тож бачить і незакомічені зміни поточної транзакції.
+    
     Args:
         group: Група
         day: День тижня (1-7)
@@ -87,114 +94,318 @@ def validate_schedule_slot(
         classroom: Аудиторія (опціонально)
         exclude_slot_id: ID слоту, який не враховувати (для редагування)
         check_current_group: Чи перевіряти конфлікти всередині групи (False при повному перезаписі)
+        index: Готовий індекс (для пакетної валідації); за замовчуванням — свіжий з БД
     
     Returns:
         Tuple (is_valid, error_message)
         - is_valid: True якщо валідний, False якщо є конфлікт
         - error_message: Опис помилки або пустий рядок
     """
+    if index is None:
+        index = ScheduleIndex.load(
+            days=[day],
+            group_ids=[group.id],
+            teacher_ids=[teacher.id] if teacher else (),
+            classroom_ids=[classroom.id] if classroom else (),
+        )
+
+    def conflicts(kind: str, resource_id: int):
+        for slot in index.overlapping(kind, resource_id, day, start_time, duration):
+            if slot.id == exclude_slot_id:
+                continue
+            # Якщо перезаписуємо групу, ігноруємо її старі записи
+            if not check_current_group and slot.group_id == group.id:
+                continue
+            yield slot
+
     # 1. Перевірка конфліктів з іншими парами тієї ж групи (тільки якщо потрібно)
     if check_current_group:
-        group_conflicts = ScheduleTemplate.objects.filter(
-            group=group,
-            day_of_week=day
-        )
-        
-        if exclude_slot_id:
-            group_conflicts = group_conflicts.exclude(id=exclude_slot_id)
-        
-        for conflict in group_conflicts:
-            if check_time_overlap(
-                start_time, duration,
-                conflict.start_time, conflict.duration_minutes
-            ):
-                return (
-                    False,
-                    f"Конфлікт: Пара №{conflict.lesson_number} "
-                    f"({conflict.start_time.strftime('%H:%M')}) перетинається з цим часом"
-                )
+        for conflict in conflicts('group', group.id):
+            return (
+                False,
+                f"Конфлікт: Пара №{conflict.lesson_number} "
+                f"({conflict.start_time.strftime('%H:%M')}) перетинається з цим часом"
+            )
     
     # 2. Перевірка зайнятості викладача
     if teacher:
-        print(f"🔍 DEBUG: Перевіряємо викладача {teacher.full_name}, група={group.name} (ID:{group.id}), check_current_group={check_current_group}")
-        
-        teacher_conflicts = ScheduleTemplate.objects.filter(
-            teacher=teacher,
-            day_of_week=day
-        )
-        
-        print(f"🔍 DEBUG: Знайдено {teacher_conflicts.count()} конфліктів викладача до виключення")
-        
-        if exclude_slot_id:
-            teacher_conflicts = teacher_conflicts.exclude(id=exclude_slot_id)
-            print(f"🔍 DEBUG: Після exclude(id={exclude_slot_id}): {teacher_conflicts.count()} конфліктів")
-        
-        # Якщо перезаписуємо групу, ігноруємо її старі записи
-        if not check_current_group:
-            print(f"🔍 DEBUG: Виключаємо групу {group.name} (ID:{group.id}) з перевірки")
-            teacher_conflicts = teacher_conflicts.exclude(group_id=group.id)
-            print(f"🔍 DEBUG: Після exclude(group_id={group.id}): {teacher_conflicts.count()} конфліктів")
-        
-        for conflict in teacher_conflicts:
-            print(f"🔍 DEBUG: Перевіряємо конфлікт: ID={conflict.id}, Група={conflict.group.name} (ID:{conflict.group_id}), {conflict.subject.name}, {conflict.start_time}")
-            if check_time_overlap(
-                start_time, duration,
-                conflict.start_time, conflict.duration_minutes
-            ):
-                # Перевірка на "Спільну пару" (Shared Lesson / Joint Class)
-                # Допускаємо перетин, якщо це той самий викладач, предмет, та час початку.
-                # Аудиторія може бути різною (наприклад, онлайн лекція для кількох груп)
-                is_shared_lesson = (
-                    conflict.subject_id == subject.id and
-                    conflict.start_time == start_time
-                )
-                if is_shared_lesson:
-                    continue
-                
-                return (
-                    False,
-                    f"Викладач {teacher.full_name} уже зайнятий у групі {conflict.group.name} "
-                    f"на предметі '{conflict.subject.name}' о {conflict.start_time.strftime('%H:%M')} (ID: {conflict.id})"
-                )
+        for conflict in conflicts('teacher', teacher.id):
+            # Перевірка на "Спільну пару" (Shared Lesson / Joint Class)
+            # Допускаємо перетин, якщо це той самий викладач, предмет, та час початку.
+            # Аудиторія може бути різною (наприклад, онлайн лекція для кількох груп)
+            is_shared_lesson = (
+                conflict.subject_id == subject.id and
+                conflict.start_time == start_time
+            )
+            if is_shared_lesson:
+                continue
+            
+            return (
+                False,
+                f"Викладач {teacher.full_name} уже зайнятий у групі {conflict.group_name} "
+                f"на предметі '{conflict.subject_name}' о {conflict.start_time.strftime('%H:%M')} (ID: {conflict.id})"
+            )
     
     # 3. Перевірка зайнятості аудиторії
     if classroom:
-        classroom_conflicts = ScheduleTemplate.objects.filter(
-            classroom=classroom,
-            day_of_week=day
-        )
-        
-        if exclude_slot_id:
-            classroom_conflicts = classroom_conflicts.exclude(id=exclude_slot_id)
-        
-        # Якщо перезаписуємо групу, ігноруємо її старі записи
-        if not check_current_group:
-            classroom_conflicts = classroom_conflicts.exclude(group_id=group.id)
-        
-        for conflict in classroom_conflicts:
-            if check_time_overlap(
-                start_time, duration,
-                conflict.start_time, conflict.duration_minutes
-            ):
-                # Також перевіряємо на спільну пару
-                is_shared_lesson = (
-                    conflict.teacher_id == (teacher.id if teacher else None) and
-                    conflict.subject_id == subject.id and
-                    conflict.start_time == start_time
-                )
-                if is_shared_lesson:
-                    continue
-                
-                return (
-                    False,
-                    f"Аудиторія {classroom.name} зайнята групою {conflict.group.name} "
-                    f"на предметі '{conflict.subject.name}' о {conflict.start_time.strftime('%H:%M')} (ID: {conflict.id})"
-                )
+        for conflict in conflicts('classroom', classroom.id):
+            # Також перевіряємо на спільну пару
+            is_shared_lesson = (
+                conflict.teacher_id == (teacher.id if teacher else None) and
+                conflict.subject_id == subject.id and
+                conflict.start_time == start_time
+            )
+            if is_shared_lesson:
+                continue
+            
+            return (
+                False,
+                f"Аудиторія {classroom.name} зайнята групою {conflict.group_name} "
+                f"на предметі '{conflict.subject_name}' о {conflict.start_time.strftime('%H:%M')} (ID: {conflict.id})"
+            )
     
     # Всі перевірки пройдені
     return (True, "")
 
 
+DAY_SHORT_NAMES = {1: 'Пн', 2: 'Вт', 3: 'Ср', 4: 'Чт', 5: 'Пт', 6: 'Сб', 7: 'Нд'}
+
+
+def _parse_week_entries(schedule_entries: dict) -> list[dict]:
+    """
+    Нормалізація тижня з редактора: {day: {lesson_number: subject_id | {...}}}.
+
+    Raises:
+        ValueError: некоректний день, номер пари, час чи тривалість
+    """
+    slots = []
+    for day_str, lessons in schedule_entries.items():
+        day = int(day_str)
+        for lesson_num_str, lesson_data in lessons.items():
+            if isinstance(lesson_data, dict):
+                subject_id = lesson_data.get('subject_id')
+                teacher_id = lesson_data.get('teacher_id')
+                start_time_str = lesson_data.get('startTime', lesson_data.get('start_time', "08:30"))
+                classroom_name = (lesson_data.get('classroom') or "").strip()
+                duration = int(lesson_data.get('duration', 90))
+            else:
+                subject_id, teacher_id = lesson_data, None
+                start_time_str, classroom_name, duration = "08:30", "", 90
+
+            if not subject_id:
+                continue
+            slots.append({
+                'day': day,
+                'lesson_number': int(lesson_num_str),
+                'subject_id': int(subject_id),
+                'teacher_id': int(teacher_id) if teacher_id else None,
+                'start_time': datetime.strptime(start_time_str, "%H:%M").time(),
+                'duration': duration,
+                'classroom_name': classroom_name,
+            })
+    return slots
+
+
+def _slot_prefix(slot: dict) -> str:
+    day_name = DAY_SHORT_NAMES.get(slot['day'], str(slot['day']))
+    return f"Конфлікт ({day_name}, пара №{slot['lesson_number']})"
+
+
+def _find_week_overlap(slots: list[dict]) -> str:
+    """Перший перетин слотів тижня між собою (сортування за початком у межах дня) або ''."""
+    by_day: dict[int, list[dict]] = {}
+    for slot in slots:
+        by_day.setdefault(slot['day'], []).append(slot)
+    for day_slots in by_day.values():
+        day_slots.sort(key=lambda s: (to_minutes(s['start_time']), s['lesson_number']))
+        latest = None  # слот з найпізнішим кінцем серед попередніх
+        for slot in day_slots:
+            start = to_minutes(slot['start_time'])
+            if latest and to_minutes(latest['start_time']) + latest['duration'] > start:
+                return f"{_slot_prefix(slot)}: перетинається з парою №{latest['lesson_number']} цього ж тижня"
+            if latest is None or start + slot['duration'] > to_minutes(latest['start_time']) + latest['duration']:
+                latest = slot
+    return ''
+
+
+def lock_schedule_resources(
+    group_ids: Iterable[int] = (),
+    teacher_ids: Iterable[int] = (),
+    classroom_names: Iterable[str] = (),
+) -> None:
+    """
+    SELECT ... FOR UPDATE рядків груп, викладачів та аудиторій (викликати в transaction.atomic).
+
+    Фіксований порядок (групи, викладачі, аудиторії; за id) — без взаємоблокувань.
+    """
+    list(StudyGroup.objects.select_for_update().filter(id__in=list(group_ids)).order_by('id').values_list('id'))
+    list(User.objects.select_for_update().filter(id__in=list(teacher_ids)).order_by('id').values_list('id'))
+    list(Classroom.objects.select_for_update().filter(name__in=list(classroom_names)).order_by('id').values_list('id'))
+
+
+def save_group_week(
+    group: StudyGroup,
+    schedule_entries: dict,
+    index: Optional[ScheduleIndex] = None,
+    user: Optional[User] = None,
+) -> dict:
+    """
+    Пакетне збереження тижневого розкладу групи (повний перезапис).
+
+    Конвеєр:
+    1. Розбір усіх слотів тижня
+    2. Попереднє завантаження предметів, викладачів, навантажень, аудиторій
+       та наявних слотів групи — кількома запитами на весь тиждень
+    3. Валідація всього тижня в пам'яті: слоти тижня між собою, потім —
+       у транзакції після блокування групи, викладачів та аудиторій —
+       проти свіжого індексу слотів інших груп
+    4. Запис тією ж транзакцією: bulk_update наявних (день, пара),
+       bulk_create нових, видалення зайвих, фіксація версії розкладу
+
+    Args:
+        group: Група, чий розклад перезаписується
+        schedule_entries: Тиждень у форматі редактора
+        index: Готовий інтервальний індекс (за замовчуванням — свіжий з БД для днів і ресурсів тижня)
+        user: Автор зміни (для історії версій)
+
+    Returns:
+        dict: {'status': 'success'|'error', 'message': str}
+    """
+    try:
+        slots = _parse_week_entries(schedule_entries)
+    except (TypeError, ValueError):
+        return {'status': 'error', 'message': 'Некоректні дані слоту (день, пара, час чи тривалість)'}
+
+    # 2. Попереднє завантаження довідників
+    subjects = Subject.objects.in_bulk({s['subject_id'] for s in slots})
+    teachers = User.objects.in_bulk({s['teacher_id'] for s in slots if s['teacher_id']})
+
+    assignments = {}
+    assignments_by_subject = {}
+    for assignment in TeachingAssignment.objects.filter(group=group).select_related('teacher').order_by('id'):
+        assignments[(assignment.subject_id, assignment.teacher_id)] = assignment
+        assignments_by_subject.setdefault(assignment.subject_id, assignment)
+
+    for slot in slots:
+        prefix = _slot_prefix(slot)
+        subject = subjects.get(slot['subject_id'])
+        if subject is None:
+            return {'status': 'error', 'message': f"{prefix}: предмет не знайдено"}
+        teacher = teachers.get(slot['teacher_id']) if slot['teacher_id'] else None
+        if slot['teacher_id'] and teacher is None:
+            return {'status': 'error', 'message': f"{prefix}: викладача не знайдено"}
+
+        assignment = assignments.get((subject.id, teacher.id)) if teacher else assignments_by_subject.get(subject.id)
+        if teacher is None and assignment:
+            teacher = assignment.teacher
+        slot['subject'], slot['teacher'] = subject, teacher
+
+    # 3а. Слоти тижня між собою: усі вони належать групі, тож будь-який
+    # перетин (зокрема того самого викладача чи аудиторії) — конфлікт
+    err = _find_week_overlap(slots)
+    if err:
+        return {'status': 'error', 'message': err}
+
+    classroom_names = {s['classroom_name'] for s in slots if s['classroom_name']}
+
+    # 4. Запис
+    with transaction.atomic():
+        classrooms = {c.name: c for c in Classroom.objects.filter(name__in=classroom_names)}
+        missing_rooms = classroom_names - classrooms.keys()
+        if missing_rooms:
+            Classroom.objects.bulk_create([Classroom(name=name) for name in missing_rooms], ignore_conflicts=True)
+
+        # Блокування групи, викладачів та аудиторій тижня: паралельні збереження,
+        # що претендують на ті самі ресурси, виконуються по черзі
+        lock_schedule_resources(
+            group_ids=[group.id],
+            teacher_ids={s['teacher'].id for s in slots if s['teacher']},
+            classroom_names=classroom_names,
+        )
+        classrooms = {c.name: c for c in Classroom.objects.filter(name__in=classroom_names)}
+
+        # 3б. Валідація проти слотів інших груп — уже під блокуванням, свіжим індексом
+        if index is None:
+            index = ScheduleIndex.load(
+                days={s['day'] for s in slots},
+                teacher_ids={s['teacher'].id for s in slots if s['teacher']},
+                classroom_ids=[c.id for c in classrooms.values()],
+            )
+        for slot in slots:
+            is_valid, err = validate_schedule_slot(
+                group=group,
+                day=slot['day'],
+                lesson_number=slot['lesson_number'],
+                start_time=slot['start_time'],
+                duration=slot['duration'],
+                subject=slot['subject'],
+                teacher=slot['teacher'],
+                classroom=classrooms.get(slot['classroom_name']),
+                check_current_group=False,
+                index=index,
+            )
+            if not is_valid:
+                transaction.set_rollback(True)
+                return {'status': 'error', 'message': f"{_slot_prefix(slot)}: {err}"}
+
+        # Нові пари (предмет, викладач) — поодинці, щоб спрацювали сигнали навантаження
+        for slot in slots:
+            teacher = slot['teacher']
+            key = (slot['subject'].id, teacher.id if teacher else None)
+            if teacher and key not in assignments:
+                assignments[key], _ = TeachingAssignment.objects.get_or_create(
+                    group=group, subject=slot['subject'], teacher=teacher,
+                )
+
+        existing = {
+            (t.day_of_week, t.lesson_number): t
+            for t in ScheduleTemplate.objects.select_for_update().filter(group=group)
+        }
+        to_create, to_update = [], []
+        now = timezone.now()
+        for slot in slots:
+            teacher = slot['teacher']
+            if teacher:
+                assignment = assignments[(slot['subject'].id, teacher.id)]
+            else:
+                assignment = assignments_by_subject.get(slot['subject'].id)
+            values = {
+                'subject_id': slot['subject'].id,
+                'teacher_id': teacher.id if teacher else None,
+                'teaching_assignment': assignment,
+                'start_time': slot['start_time'],
+                'duration_minutes': slot['duration'],
+                'classroom': classrooms.get(slot['classroom_name']),
+            }
+            template = existing.pop((slot['day'], slot['lesson_number']), None)
+            if template is None:
+                to_create.append(ScheduleTemplate(
+                    group=group, day_of_week=slot['day'], lesson_number=slot['lesson_number'], **values
+                ))
+            else:
+                for field, value in values.items():
+                    setattr(template, field, value)
+                template.updated_at = now
+                to_update.append(template)
+
+        if existing:
+            ScheduleTemplate.objects.filter(id__in=[t.id for t in existing.values()]).delete()
+        if to_update:
+            ScheduleTemplate.objects.bulk_update(to_update, [
+                'subject', 'teacher', 'teaching_assignment', 'start_time',
+                'duration_minutes', 'classroom', 'updated_at',
+            ])
+        if to_create:
+            ScheduleTemplate.objects.bulk_create(to_create)
+
+        record_schedule_versions([group.id], user=user)
+
+        # bulk-операції не надсилають post_save — скидаємо індекс явно
+        transaction.on_commit(invalidate_schedule_index)
+
+    return {'status': 'success', 'message': f'Розклад для групи {group.name} оновлено'}
+
+
 def get_schedule_conflicts(
     schedule_template: ScheduleTemplate
 ) -> list[dict]:
@@ -283,7 +494,9 @@ def get_available_teachers(
     day: int,
     start_time: time,
     duration: int,
-    subject: Optional[Subject] = None
+    subject: Optional[Subject] = None,
+    exclude_slot_id: Optional[int] = None,
+    filter_by_subject: bool = True,
 ) -> list[User]:
     """
     Отримання списку викладачів, доступних в конкретний час.
@@ -292,47 +505,39 @@ def get_available_teachers(
         day: День тижня (1-7)
         start_time: Час початку
         duration: Тривалість в хвилинах
-        subject: Предмет (фільтрувати тільки викладачів цього предмету)
+        subject: Предмет слоту: спільна пара з цим предметом і часом початку
+            не вважається зайнятістю (як у validate_schedule_slot)
+        exclude_slot_id: Слот, який редагується (його зайнятість не враховується)
+        filter_by_subject: Лишити тільки викладачів цього предмету
     
     Returns:
         Список викладачів (User objects)
     """
-    # Всі викладачі
-    teachers = User.objects.filter(role='teacher')
+    teachers = User.objects.filter(role='teacher').order_by('full_name')
     
-    if subject:
+    if subject and filter_by_subject:
         # Фільтруємо тих, хто читає цей предмет
         teachers = teachers.filter(
             teachingassignment__subject=subject
         ).distinct()
     
-    # Виключаємо зайнятих викладачів
-    busy_teachers = ScheduleTemplate.objects.filter(
-        day_of_week=day
-    ).select_related('teacher')
-    
-    available_teachers = []
-    for teacher in teachers:
-        is_busy = False
-        for slot in busy_teachers.filter(teacher=teacher):
-            if check_time_overlap(
-                start_time, duration,
-                slot.start_time, slot.duration_minutes
-            ):
-                is_busy = True
-                break
-        
-        if not is_busy:
-            available_teachers.append(teacher)
-    
-    return available_teachers
+    # Зайнятість — з кешованої бітової матриці (1 запит на викладачів замість N)
+    teachers = list(teachers)
+    free_ids = set(get_freebusy_matrix().free_resources(
+        'teacher', [t.id for t in teachers], day, start_time, duration, exclude_slot_id,
+        subject_id=subject.id if subject else None,
+    ))
+    return [t for t in teachers if t.id in free_ids]
 
 
 def get_available_classrooms(
     day: int,
     start_time: time,
     duration: int,
-    min_capacity: Optional[int] = None
+    min_capacity: Optional[int] = None,
+    exclude_slot_id: Optional[int] = None,
+    subject: Optional[Subject] = None,
+    teacher: Optional[User] = None,
 ) -> list[Classroom]:
     """
     Отримання списку вільних аудиторій в конкретний час.
@@ -341,66 +546,42 @@ def get_available_classrooms(
         day: День тижня (1-7)
         start_time: Час початку
         duration: Тривалість в хвилинах
-        min_capacity: Мінімальна місткість (опціонально)
+        min_capacity: Мінімальна місткість (опціонально; аудиторії з невідомою місткістю відкидаються)
+        exclude_slot_id: Слот, який редагується (його зайнятість не враховується)
+        subject, teacher: Предмет і викладач слоту: спільна пара з ними
+            не вважається зайнятістю (як у validate_schedule_slot)
     
     Returns:
         Список аудиторій (Classroom objects)
     """
-    classrooms = Classroom.objects.all()
+    classrooms = Classroom.objects.filter(is_active=True).order_by('name')
     
     if min_capacity:
         classrooms = classrooms.filter(capacity__gte=min_capacity)
     
-    # Виключаємо зайняті аудиторії
-    busy_classrooms = ScheduleTemplate.objects.filter(
-        day_of_week=day,
-        classroom__isnull=False
-    ).select_related('classroom')
-    
-    available_classrooms = []
-    for classroom in classrooms:
-        is_busy = False
-        for slot in busy_classrooms.filter(classroom=classroom):
-            if check_time_overlap(
-                start_time, duration,
-                slot.start_time, slot.duration_minutes
-            ):
-                is_busy = True
-                break
-        
-        if not is_busy:
-            available_classrooms.append(classroom)
-    
-    return available_classrooms
+    classrooms = list(classrooms)
+    free_ids = set(get_freebusy_matrix().free_resources(
+        'classroom', [c.id for c in classrooms], day, start_time, duration, exclude_slot_id,
+        subject_id=subject.id if subject else None,
+        teacher_id=teacher.id if teacher else None,
+    ))
+    return [c for c in classrooms if c.id in free_ids]
 
 
 def find_all_schedule_conflicts() -> list[tuple[ScheduleTemplate, ScheduleTemplate]]:
     """
     Системна перевірка всіх шаблонів розкладу на наявність перетинів для викладачів.
     Використовується для діагностики здоров'я бази даних.
+
+    Повна перевірка груп, викладачів та аудиторій — schedule_audit.audit_schedule().
     """
-    all_templates = ScheduleTemplate.objects.all().select_related('teacher', 'group', 'subject')
-    
-    # Групуємо по викладачу та дню
-    by_teacher_day = {}
-    for t in all_templates:
-        if not t.teacher:
-            continue
-        key = (t.teacher.id, t.day_of_week)
-        if key not in by_teacher_day:
-            by_teacher_day[key] = []
-        by_teacher_day[key].append(t)
-    
-    conflicts = []
-    for key, templates in by_teacher_day.items():
-        for i in range(len(templates)):
-            for j in range(i + 1, len(templates)):
-                t1 = templates[i]
-                t2 = templates[j]
-                if check_time_overlap(
-                    t1.start_time, t1.duration_minutes,
-                    t2.start_time, t2.duration_minutes
-                ):
-                    conflicts.append((t1, t2))
-    
-    return conflicts
+    from main.services.schedule_audit import find_conflicts, load_audit_slots
+
+    pairs = [
+        (c['first']['id'], c['second']['id'])
+        for c in find_conflicts(load_audit_slots(active_only=False), kinds=('teacher',))
+    ]
+    templates = ScheduleTemplate.objects.select_related('teacher', 'group', 'subject').in_bulk(
+        {pk for pair in pairs for pk in pair}
+    )
+    return [(templates[a], templates[b]) for a, b in pairs]
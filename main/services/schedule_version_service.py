@@ -0,0 +1,239 @@
+"""
+Schedule Version Service - історія тижневого розкладу груп
+
+Цей модуль містить функції для:
+- Знімків поточних шаблонів групи у версії ScheduleVersion, що не
+  перетинаються в часі: нова версія закриває попередню, збереження без змін
+  змісту нічого не пише
+- Пошуку версії, чинної на дату, по індексу (group, valid_from) — одна
+  вибірка для будь-якої кількості груп
+- Порівняння версій (додані, прибрані та змінені пари)
+
+Версії використовує матеріалізація уроків (materialization_service), тож
+уроки за минулі дати будуються з того розкладу, що діяв тоді.
+"""
+
+import hashlib
+import json
+import threading
+from datetime import date, timedelta
+from typing import Iterable, Optional
+
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from main.models import Classroom, ScheduleTemplate, ScheduleVersion, StudyGroup, Subject, User
+
+_pending = threading.local()
+
+# Поля слоту, що визначають зміст розкладу (template_id — лише посилання)
+SLOT_FIELDS = (
+    'day', 'lesson_number', 'start_time', 'duration', 'subject_id', 'teacher_id', 'classroom_id',
+    'week_type', 'valid_to',
+)
+
+
+def current_group_slots(group_ids: Iterable[int]) -> dict[int, list[dict]]:
+    """Активні шаблони груп у форматі слотів версії (1 запит)."""
+    slots: dict[int, list[dict]] = {gid: [] for gid in group_ids}
+    rows = ScheduleTemplate.objects.filter(group_id__in=list(slots), is_active=True).order_by(
+        'day_of_week', 'lesson_number',
+    ).values_list(
+        'id', 'group_id', 'day_of_week', 'lesson_number', 'start_time', 'duration_minutes',
+        'subject_id', 'teacher_id', 'classroom_id', 'week_type', 'valid_to',
+    )
+    for pk, group_id, day, number, start, duration, subject_id, teacher_id, classroom_id, week_type, valid_to in rows:
+        slots[group_id].append({
+            'template_id': pk,
+            'day': day,
+            'lesson_number': number,
+            'start_time': start.strftime('%H:%M'),
+            'duration': duration,
+            'subject_id': subject_id,
+            'teacher_id': teacher_id,
+            'classroom_id': classroom_id,
+            'week_type': week_type or '',
+            'valid_to': valid_to.isoformat() if valid_to else None,
+        })
+    return slots
+
+
+def slots_checksum(slots: list[dict]) -> str:
+    content = [[slot[field] for field in SLOT_FIELDS] for slot in slots]
+    return hashlib.md5(json.dumps(content, sort_keys=True).encode()).hexdigest()
+
+
+def record_schedule_versions(
+    group_ids: Iterable[int],
+    effective_from: Optional[date] = None,
+    user: Optional[User] = None,
+) -> dict:
+    """
+    Фіксація поточних шаблонів груп як версій з effective_from (за замовчуванням — сьогодні).
+
+    Для кожної групи:
+    - зміст збігається з чинною версією — нічого не пишеться;
+    - чинна версія почалась того ж дня — вона уточнюється (або видаляється,
+      якщо зміст повернувся до попередньої версії);
+    - інакше чинна версія закривається днем раніше і відкривається нова.
+
+    Returns:
+        {'created': int, 'updated': int, 'reverted': int, 'unchanged': int}
+    """
+    effective_from = effective_from or timezone.localdate()
+    stats = {'created': 0, 'updated': 0, 'reverted': 0, 'unchanged': 0}
+    # Група може бути видалена разом із шаблонами (каскад) — її версії вже не потрібні
+    group_ids = set(StudyGroup.objects.filter(id__in=set(group_ids)).values_list('id', flat=True))
+    if not group_ids:
+        return stats
+
+    with transaction.atomic():
+        current = _effective_queryset(group_ids, effective_from).select_for_update()
+        versions = {v.group_id: v for v in current}
+        for group_id, slots in current_group_slots(group_ids).items():
+            checksum = slots_checksum(slots)
+            version = versions.get(group_id)
+
+            if version is not None and version.checksum == checksum:
+                stats['unchanged'] += 1
+            elif version is not None and version.valid_from == effective_from:
+                previous = ScheduleVersion.objects.filter(
+                    group_id=group_id, valid_to=effective_from - timedelta(days=1),
+                ).first()
+                if previous is not None and previous.checksum == checksum:
+                    previous.valid_to = version.valid_to
+                    version.delete()
+                    previous.save(update_fields=['valid_to'])
+                    stats['reverted'] += 1
+                else:
+                    version.slots, version.checksum = slots, checksum
+                    version.created_by = user or version.created_by
+                    version.save(update_fields=['slots', 'checksum', 'created_by'])
+                    stats['updated'] += 1
+            elif version is None and not slots:
+                stats['unchanged'] += 1  # порожній розклад без історії — фіксувати нічого
+            else:
+                if version is not None:
+                    valid_to = version.valid_to
+                    version.valid_to = effective_from - timedelta(days=1)
+                    version.save(update_fields=['valid_to'])
+                else:
+                    following = ScheduleVersion.objects.filter(
+                        group_id=group_id, valid_from__gt=effective_from,
+                    ).order_by('valid_from').values_list('valid_from', flat=True).first()
+                    valid_to = following - timedelta(days=1) if following else None
+                ScheduleVersion.objects.create(
+                    group_id=group_id, valid_from=effective_from, valid_to=valid_to,
+                    slots=slots, checksum=checksum, created_by=user,
+                )
+                stats['created'] += 1
+    return stats
+
+
+def record_versions_on_commit(group_id: int) -> None:
+    """
+    Відкладений знімок після коміту. Групи накопичуються, тож сотня
+    змінених шаблонів у транзакції дає один знімок, а не сотню.
+    """
+    groups = getattr(_pending, 'groups', None)
+    if groups is None:
+        groups = _pending.groups = set()
+    groups.add(group_id)
+    transaction.on_commit(_flush_pending_versions)
+
+
+def _flush_pending_versions() -> None:
+    groups = getattr(_pending, 'groups', None)
+    if groups:
+        _pending.groups = set()
+        record_schedule_versions(groups)
+
+
+def _effective_queryset(group_ids: Iterable[int], day: date):
+    return ScheduleVersion.objects.filter(group_id__in=list(group_ids), valid_from__lte=day).filter(
+        Q(valid_to__isnull=True) | Q(valid_to__gte=day)
+    )
+
+
+def get_versions_as_of(group_ids: Iterable[int], day: date) -> dict[int, ScheduleVersion]:
+    """Версії, чинні на дату, для кількох груп (1 запит)."""
+    return {v.group_id: v for v in _effective_queryset(group_ids, day)}
+
+
+def get_version_as_of(group_id: int, day: date) -> Optional[ScheduleVersion]:
+    """Версія групи, чинна на дату: остання, що почалась не пізніше day."""
+    version = ScheduleVersion.objects.filter(group_id=group_id, valid_from__lte=day).order_by('-valid_from').first()
+    if version is None or (version.valid_to and version.valid_to < day):
+        return None
+    return version
+
+
+def diff_slots(old: list[dict], new: list[dict]) -> dict:
+    """
+    Різниця двох наборів слотів по (день, пара).
+
+    Returns:
+        {'added': [slot], 'removed': [slot],
+         'changed': [{'day', 'lesson_number', 'fields': [...], 'before': slot, 'after': slot}]}
+    """
+    before = {(s['day'], s['lesson_number']): s for s in old}
+    after = {(s['day'], s['lesson_number']): s for s in new}
+    changed = []
+    for key in sorted(before.keys() & after.keys()):
+        fields = [f for f in SLOT_FIELDS if before[key].get(f) != after[key].get(f)]
+        if fields:
+            changed.append({
+                'day': key[0], 'lesson_number': key[1], 'fields': fields,
+                'before': before[key], 'after': after[key],
+            })
+    return {
+        'added': [after[key] for key in sorted(after.keys() - before.keys())],
+        'removed': [before[key] for key in sorted(before.keys() - after.keys())],
+        'changed': changed,
+    }
+
+
+def diff_versions(old: Optional[ScheduleVersion], new: ScheduleVersion) -> dict:
+    """Різниця між версіями; без old — уся нова версія як додана."""
+    return diff_slots(old.slots if old else [], new.slots)
+
+
+def label_slots(slots: Iterable[dict]) -> list[dict]:
+    """Копії слотів з назвами предмета, викладача й аудиторії (3 запити на будь-яку кількість)."""
+    slots = list(slots)
+    subjects = dict(Subject.objects.filter(id__in={s['subject_id'] for s in slots}).values_list('id', 'name'))
+    teachers = dict(User.objects.filter(id__in={s['teacher_id'] for s in slots if s['teacher_id']}).values_list(
+        'id', 'full_name',
+    ))
+    rooms = dict(Classroom.objects.filter(id__in={s['classroom_id'] for s in slots if s['classroom_id']}).values_list(
+        'id', 'name',
+    ))
+    return [
+        {
+            **slot,
+            'subject_name': subjects.get(slot['subject_id'], ''),
+            'teacher_name': teachers.get(slot['teacher_id'], ''),
+            'classroom_name': rooms.get(slot['classroom_id'], ''),
+        }
+        for slot in slots
+    ]
+
+
+def label_diff(diff: dict) -> dict:
+    """diff_slots з назвами в усіх слотах (ті самі 3 запити на весь diff)."""
+    changed = diff['changed']
+    labelled = label_slots(
+        diff['added'] + diff['removed'] + [c['before'] for c in changed] + [c['after'] for c in changed]
+    )
+    added, removed = len(diff['added']), len(diff['removed'])
+    befores = labelled[added + removed:added + removed + len(changed)]
+    afters = labelled[added + removed + len(changed):]
+    return {
+        'added': labelled[:added],
+        'removed': labelled[added:added + removed],
+        'changed': [
+            {**change, 'before': before, 'after': after}
+            for change, before, after in zip(changed, befores, afters)
+        ],
+    }
@@ -1,6 +1,9 @@
 """
 SMS notification service via Twilio.
 Відправляє SMS студентам при виставленні оцінки або пропуску.
+
+Оцінки й пропуски ставлять SMS у чергу (outbox_service); фоновий обробник
+викликає deliver_sms, помилки якого призводять до повторних спроб.
 """
 
 import logging
@@ -9,16 +12,26 @@ from django.conf import settings
 logger = logging.getLogger(__name__)
 
 
-def send_sms(to_phone: str, message: str) -> bool:
-    """
-    Відправляє SMS на вказаний номер телефону.
-    Повертає True при успіху, False при помилці.
-    """
+class SmsDeliveryError(Exception):
+    """Помилка передачі SMS, яку варто повторити."""
+
+
+def _twilio_config():
     account_sid = getattr(settings, 'TWILIO_ACCOUNT_SID', None)
     auth_token  = getattr(settings, 'TWILIO_AUTH_TOKEN', None)
     from_number = getattr(settings, 'TWILIO_FROM_NUMBER', None)
-
     if not all([account_sid, auth_token, from_number]):
+        return None
+    return account_sid, auth_token, from_number
+
+
+def deliver_sms(to_phone: str, message: str) -> bool:
+    """
+    Відправляє SMS; False — відправка не потрібна або неможлива за налаштуваннями
+    (Twilio не налаштовано, немає номера). Помилки передачі піднімає як SmsDeliveryError.
+    """
+    config = _twilio_config()
+    if config is None:
         logger.warning("SMS не відправлено: Twilio не налаштовано (TWILIO_ACCOUNT_SID/AUTH_TOKEN/FROM_NUMBER)")
         return False
 
@@ -26,43 +39,61 @@ def send_sms(to_phone: str, message: str) -> bool:
         logger.debug("SMS не відправлено: у студента не вказаний номер телефону")
         return False
 
+    account_sid, auth_token, from_number = config
     try:
         from twilio.rest import Client
+    except ImportError:
+        raise SmsDeliveryError("пакет 'twilio' не встановлено. Виконайте: pip install twilio")
+    try:
         client = Client(account_sid, auth_token)
         client.messages.create(
             body=message,
             from_=from_number,
             to=to_phone,
         )
-        logger.info("SMS успішно відправлено на %s", to_phone)
-        return True
-    except ImportError:
-        logger.error("SMS не відправлено: пакет 'twilio' не встановлено. Виконайте: pip install twilio")
-        return False
-    except Exception:
-        logger.exception("SMS не відправлено: помилка при відправці на %s", to_phone)
-        return False
+    except Exception as exc:
+        raise SmsDeliveryError(f"помилка при відправці на {to_phone}: {exc}") from exc
+    logger.info("SMS успішно відправлено на %s", to_phone)
+    return True
 
 
-def notify_grade(student, subject_name: str, lesson_date: str, grade_value) -> bool:
-    """Відправляє SMS студенту про нову оцінку."""
-    if not student.phone:
+def send_sms(to_phone: str, message: str) -> bool:
+    """
+    Відправляє SMS на вказаний номер телефону.
+    Повертає True при успіху, False при помилці.
+    """
+    try:
+        return deliver_sms(to_phone, message)
+    except SmsDeliveryError:
+        logger.exception("SMS не відправлено")
         return False
-    message = (
+
+
+def grade_message(subject_name: str, lesson_date: str, grade_value) -> str:
+    return (
         f"MyBosco: Нова оцінка з {subject_name}\n"
         f"Дата: {lesson_date}\n"
         f"Оцінка: {grade_value} балів"
     )
-    return send_sms(student.phone, message)
 
 
-def notify_absence(student, subject_name: str, lesson_date: str, absence_name: str, absence_code: str) -> bool:
-    """Відправляє SMS студенту про відмічений пропуск."""
-    if not student.phone:
-        return False
-    message = (
+def absence_message(subject_name: str, lesson_date: str, absence_name: str, absence_code: str) -> str:
+    return (
         f"MyBosco: Відмічено пропуск з {subject_name}\n"
         f"Дата: {lesson_date}\n"
         f"Причина: {absence_name} ({absence_code})"
     )
-    return send_sms(student.phone, message)
+
+
+def notify_grade(student, subject_name: str, lesson_date: str, grade_value) -> bool:
+    """Відправляє SMS студенту про нову оцінку."""
+    if not student.phone:
+        return False
+    return send_sms(student.phone, grade_message(subject_name, lesson_date, grade_value))
+
+
+def notify_absence(student, subject_name: str, lesson_date: str, absence_name: str, absence_code: str) -> bool:
+    """Відправляє SMS студенту про відмічений пропуск."""
+    if not student.phone:
+        return False
+    return send_sms(student.phone, absence_message(subject_name, lesson_date, absence_name, absence_code))
@@ -0,0 +1,199 @@
+"""
+Substitution Service - підбір замін на час відсутності викладача
+
+Цей модуль містить функції для:
+- Плану замін: усі уроки викладача за період і для кожного — кваліфіковані
+  викладачі, вільні в цей час, упорядковані за навантаженням того тижня
+- Попередньо побудованих структур на весь період (фіксована кількість
+  запитів незалежно від кількості уроків і кандидатів):
+  мапа предмет -> викладачі з навантажень, бітові маски зайнятості
+  (викладач, дата) з уроків, а для тижнів, де в кандидата ще немає
+  жодного уроку, — з кешованої матриці шаблонів (availability_service);
+  недоступність викладачів
+- Призначення обраних замін з повторною перевіркою за тим самим планом
+"""
+
+from datetime import date, timedelta
+from typing import Optional
+
+from django.db import transaction
+
+from main.models import Lesson, TeacherUnavailability, TeachingAssignment, User
+from main.services.availability_service import TICKS_PER_DAY, get_freebusy_matrix, interval_mask
+from main.services.schedule_index import to_minutes
+from main.services.timetable_solver import load_slots
+
+FULL_DAY_MASK = (1 << TICKS_PER_DAY) - 1
+
+
+def _week_start(day: date) -> date:
+    return day - timedelta(days=day.weekday())
+
+
+def _lesson_mask(start_time, end_time) -> int:
+    return interval_mask(to_minutes(start_time), to_minutes(end_time))
+
+
+def plan_substitutions(
+    teacher_id: int,
+    date_from: date,
+    date_to: date,
+    limit: Optional[int] = 5,
+) -> dict:
+    """
+    Уроки відсутнього викладача з рейтингом можливих замін.
+
+    Кандидат — активний викладач з навантаженням з цього предмета (у будь-якій
+    групі), вільний на весь час уроку і не позначений недоступним. Рейтинг:
+    менше пар того тижня, далі — ті, хто вже веде цю групу.
+
+    "suggested" — жадібний розподіл по уроках у хронологічному порядку: кожна
+    призначена заміна займає кандидата і додає йому пару тижня, тож два
+    одночасні уроки не отримають одного викладача.
+
+    Returns:
+        {'lessons': [{id, date, start_time, end_time, group_id, group_name, subject_id,
+          subject_name, classroom_name, candidates: [{id, name, week_load, teaches_group}],
+          suggested: id | None}], 'uncovered': int}
+    """
+    lessons = list(
+        Lesson.objects.filter(teacher_id=teacher_id, date__range=(date_from, date_to), is_cancelled=False)
+        .order_by('date', 'start_time')
+        .values('id', 'date', 'start_time', 'end_time', 'group_id', 'group__name', 'subject_id',
+                'subject__name', 'classroom__name')
+    )
+    if not lessons:
+        return {'lessons': [], 'uncovered': 0}
+
+    # Кваліфікація: предмет -> викладачі; плюс хто вже веде яку групу
+    qualified: dict[int, set[int]] = {}
+    teaches_group: set[tuple[int, int]] = set()
+    for subject_id, tid, group_id in TeachingAssignment.objects.filter(
+        subject_id__in={l['subject_id'] for l in lessons}, teacher__is_active=True,
+    ).exclude(teacher_id=teacher_id).values_list('subject_id', 'teacher_id', 'group_id'):
+        qualified.setdefault(subject_id, set()).add(tid)
+        teaches_group.add((tid, group_id))
+    candidate_ids = set().union(*qualified.values()) if qualified else set()
+    names = dict(User.objects.filter(id__in=candidate_ids).values_list('id', 'full_name'))
+
+    # Зайнятість і навантаження кандидатів за повні тижні періоду
+    span_from, span_to = _week_start(date_from), _week_start(date_to) + timedelta(days=6)
+    busy: dict[tuple[int, date], int] = {}
+    week_load: dict[tuple[int, date], int] = {}
+    materialized: set[tuple[int, date]] = set()  # (викладач, понеділок), де вже є уроки
+    for tid, day, start, end, cancelled in Lesson.objects.filter(
+        teacher_id__in=candidate_ids, date__range=(span_from, span_to),
+    ).values_list('teacher_id', 'date', 'start_time', 'end_time', 'is_cancelled'):
+        materialized.add((tid, _week_start(day)))
+        if cancelled:
+            continue
+        busy[(tid, day)] = busy.get((tid, day), 0) | _lesson_mask(start, end)
+        week_load[(tid, _week_start(day))] = week_load.get((tid, _week_start(day)), 0) + 1
+    matrix = get_freebusy_matrix()
+
+    bells = {slot.lesson_number: _lesson_mask(slot.start_time, slot.end_time) for slot in load_slots(days=(1,))}
+    unavailable: dict[tuple[int, int], int] = {}
+    for tid, day_of_week, number in TeacherUnavailability.objects.filter(
+        teacher_id__in=candidate_ids,
+    ).values_list('teacher_id', 'day_of_week', 'lesson_number'):
+        mask = bells.get(number, 0) if number else FULL_DAY_MASK
+        unavailable[(tid, day_of_week)] = unavailable.get((tid, day_of_week), 0) | mask
+
+    def busy_mask(tid: int, day: date) -> int:
+        mask = unavailable.get((tid, day.isoweekday()), 0)
+        if (tid, _week_start(day)) in materialized:
+            return mask | busy.get((tid, day), 0)
+        # Уроки тижня ще не створені — зайнятість за шаблонами
+        return mask | matrix.busy_mask('teacher', tid, day.isoweekday())
+
+    planned: dict[tuple[int, date], int] = {}  # зайнятість від уже запропонованих замін
+    uncovered = 0
+    for lesson in lessons:
+        wanted = _lesson_mask(lesson['start_time'], lesson['end_time'])
+        monday = _week_start(lesson['date'])
+        free = [
+            tid for tid in qualified.get(lesson['subject_id'], ())
+            if not busy_mask(tid, lesson['date']) & wanted
+        ]
+        free.sort(key=lambda tid: (
+            week_load.get((tid, monday), 0),
+            (tid, lesson['group_id']) not in teaches_group,
+            names.get(tid, ''),
+        ))
+        suggested = next(
+            (tid for tid in free if not planned.get((tid, lesson['date']), 0) & wanted), None
+        )
+        shown = free[:limit]
+        if suggested is not None and suggested not in shown:
+            shown.append(suggested)
+        lesson['candidates'] = [
+            {
+                'id': tid,
+                'name': names.get(tid, ''),
+                'week_load': week_load.get((tid, monday), 0),
+                'teaches_group': (tid, lesson['group_id']) in teaches_group,
+            }
+            for tid in shown
+        ]
+        lesson['suggested'] = suggested
+        if suggested is None:
+            uncovered += 1
+        else:
+            planned[(suggested, lesson['date'])] = planned.get((suggested, lesson['date']), 0) | wanted
+            week_load[(suggested, monday)] = week_load.get((suggested, monday), 0) + 1
+
+        lesson['group_name'] = lesson.pop('group__name')
+        lesson['subject_name'] = lesson.pop('subject__name')
+        lesson['classroom_name'] = lesson.pop('classroom__name') or ''
+    return {'lessons': lessons, 'uncovered': uncovered}
+
+
+def apply_substitutions(
+    teacher_id: int,
+    date_from: date,
+    date_to: date,
+    assignments: dict[int, int],
+) -> dict:
+    """
+    Призначення замін {lesson_id: teacher_id}. Кожна заміна перевіряється
+    за свіжим планом (кандидат усе ще кваліфікований і вільний).
+
+    Returns:
+        {'status': 'success'|'error', 'message': str, 'applied': int}
+    """
+    plan = plan_substitutions(teacher_id, date_from, date_to, limit=None)
+    allowed = {l['id']: {c['id'] for c in l['candidates']} for l in plan['lessons']}
+    errors = [lid for lid, tid in assignments.items() if tid not in allowed.get(lid, ())]
+    if errors:
+        return {
+            'status': 'error',
+            'message': f"Заміни вже неможливі для {len(errors)} уроків — оновіть план",
+            'applied': 0,
+        }
+
+    by_day: dict[tuple[int, date], list[int]] = {}
+    lessons = {l['id']: l for l in plan['lessons']}
+    for lid, tid in assignments.items():
+        wanted = _lesson_mask(lessons[lid]['start_time'], lessons[lid]['end_time'])
+        key = (tid, lessons[lid]['date'])
+        if any(mask & wanted for mask in by_day.get(key, ())):
+            return {'status': 'error', 'message': 'Одному викладачу призначено одночасні уроки', 'applied': 0}
+        by_day.setdefault(key, []).append(wanted)
+
+    with transaction.atomic():
+        # Поштучне збереження — щоб спрацювали сигнали кешів розкладу та дашбордів
+        for lesson in Lesson.objects.select_for_update().filter(id__in=assignments):
+            # replaced_teacher — викладач за розкладом (при повторній заміні не змінюється);
+            # поки він задано, materialize_lessons не повертає його в урок
+            replaced = lesson.replaced_teacher_id or lesson.teacher_id
+            lesson.teacher_id = assignments[lesson.id]
+            lesson.replaced_teacher_id = None if replaced == lesson.teacher_id else replaced
+            lesson.save(update_fields=['teacher', 'replaced_teacher', 'updated_at'])
+    return {'status': 'success', 'message': f"Призначено замін: {len(assignments)}", 'applied': len(assignments)}
+
+
+def get_substitution_window(date_from: Optional[date], date_to: Optional[date], today: date) -> tuple[date, date]:
+    """Період за замовчуванням — поточний навчальний тиждень."""
+    date_from = date_from or today
+    date_to = date_to or max(date_from, _week_start(date_from) + timedelta(days=4))
+    return date_from, date_to
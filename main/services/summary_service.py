@@ -0,0 +1,174 @@
+"""
+Summary Service - денормалізоване зведення студента для дашборду
+
+Цей модуль містить функції для:
+- Пакетної (пере)побудови StudentSummary фіксованою кількістю запитів
+- Оновлення зведення при записі оцінки чи пропуску: лічильники
+  рахуються одним агрегатом по студенту, а буфер останніх оцінок
+  змінюється на місці без повторного читання журналу
+- Отримання зведення для student_dashboard_view (один рядок)
+"""
+
+from typing import Iterable, Optional
+
+from django.db import transaction
+from django.db.models import Count, F, Q, Sum, Window
+from django.db.models.functions import RowNumber
+
+from main.models import StudentPerformance, StudentSummary, User
+from main.services.db_utils import bulk_upsert
+
+RECENT_GRADES_SIZE = 30  # ємність буфера (точки графіка на дашборді)
+
+# Поля уроку, що потрапляють у буфер останніх оцінок
+_ENTRY_FIELDS = (
+    'lesson_id', 'earned_points', 'lesson__date', 'lesson__start_time',
+    'lesson__subject__name', 'lesson__teacher__full_name', 'lesson__topic',
+)
+
+
+def _grade_entry(row: dict) -> dict:
+    """Елемент буфера з рядка values(*_ENTRY_FIELDS)."""
+    return {
+        'lesson_id': row['lesson_id'],
+        'date': row['lesson__date'].isoformat(),
+        'time': row['lesson__start_time'].strftime('%H:%M'),
+        'points': float(row['earned_points']),
+        'subject': row['lesson__subject__name'] or '',
+        'teacher': row['lesson__teacher__full_name'] or '',
+        'topic': row['lesson__topic'] or '',
+    }
+
+
+def _entry_sort_key(entry: dict) -> tuple:
+    return (entry['date'], entry['time'], entry['lesson_id'])
+
+
+def _counters_queryset(student_ids: Iterable[int]):
+    return (
+        StudentPerformance.objects.filter(student_id__in=student_ids)
+        .order_by().values('student_id').annotate(
+            lessons_count=Count('id'),
+            graded_count=Count('id', filter=Q(earned_points__isnull=False)),
+            points_sum=Sum('earned_points'),
+            respectful_absences=Count('id', filter=Q(absence__is_respectful=True)),
+            unrespectful_absences=Count('id', filter=Q(absence__is_respectful=False)),
+        )
+    )
+
+
+def _apply_counters(summary: StudentSummary, row: Optional[dict]) -> None:
+    row = row or {}
+    summary.lessons_count = row.get('lessons_count', 0)
+    summary.graded_count = row.get('graded_count', 0)
+    summary.points_sum = row.get('points_sum') or 0
+    summary.respectful_absences = row.get('respectful_absences', 0)
+    summary.unrespectful_absences = row.get('unrespectful_absences', 0)
+
+
+def _recent_entries(student_ids: list[int]) -> dict[int, list[dict]]:
+    """Останні RECENT_GRADES_SIZE оцінок кожного студента одним віконним запитом."""
+    recent: dict[int, list[dict]] = {}
+    rows = (
+        StudentPerformance.objects.filter(student_id__in=student_ids, earned_points__isnull=False)
+        .annotate(rn=Window(
+            RowNumber(),
+            partition_by=F('student_id'),
+            order_by=[F('lesson__date').desc(), F('lesson__start_time').desc(), F('lesson_id').desc()],
+        ))
+        .filter(rn__lte=RECENT_GRADES_SIZE)
+        .order_by('student_id', '-rn')
+        .values('student_id', *_ENTRY_FIELDS)
+    )
+    for row in rows:
+        recent.setdefault(row['student_id'], []).append(_grade_entry(row))
+    return recent
+
+
+def rebuild_student_summaries(student_ids: Iterable[int]) -> int:
+    """
+    Повна перебудова зведень (3 запити на пакет).
+
+    Returns:
+        Кількість збережених зведень
+    """
+    ids = list(User.objects.filter(id__in=set(student_ids), role='student').values_list('id', flat=True))
+    if not ids:
+        return 0
+
+    counters = {row['student_id']: row for row in _counters_queryset(ids)}
+    recent = _recent_entries(ids)
+
+    summaries = []
+    for sid in ids:
+        summary = StudentSummary(student_id=sid, recent_grades=recent.get(sid, []))
+        _apply_counters(summary, counters.get(sid))
+        summaries.append(summary)
+
+    bulk_upsert(
+        StudentSummary,
+        summaries,
+        unique_fields=['student'],
+        update_fields=[
+            'lessons_count', 'graded_count', 'points_sum', 'respectful_absences',
+            'unrespectful_absences', 'recent_grades', 'updated_at',
+        ],
+    )
+    return len(summaries)
+
+
+def apply_performance_change(student_id: int, lesson_id: int) -> None:
+    """
+    Оновлення зведення після збереження/видалення запису StudentPerformance.
+
+    Лічильники перераховуються агрегатом по одному студенту; у буфері
+    замінюється лише елемент цього уроку. Буфер перечитується повністю,
+    тільки якщо з повного буфера зникла оцінка (видалення/зняття бала).
+    """
+    with transaction.atomic():
+        summary = StudentSummary.objects.select_for_update().filter(student_id=student_id).first()
+        if summary is None:
+            rebuild_student_summaries([student_id])
+            return
+
+        _apply_counters(summary, next(iter(_counters_queryset([student_id])), None))
+
+        row = (
+            StudentPerformance.objects.filter(student_id=student_id, lesson_id=lesson_id, earned_points__isnull=False)
+            .values(*_ENTRY_FIELDS).first()
+        )
+        buffer = [e for e in summary.recent_grades if e['lesson_id'] != lesson_id]
+        removed = len(buffer) < len(summary.recent_grades)
+
+        if row is not None:
+            entry = _grade_entry(row)
+            buffer.append(entry)
+            buffer.sort(key=_entry_sort_key)
+            buffer = buffer[-RECENT_GRADES_SIZE:]
+        elif removed and len(summary.recent_grades) == RECENT_GRADES_SIZE:
+            # У буфері звільнилось місце — можливо, є старіша оцінка поза ним
+            buffer = _recent_entries([student_id]).get(student_id, [])
+
+        summary.recent_grades = buffer
+        summary.save()
+
+
+def refresh_lesson_entries(lesson_id: int) -> int:
+    """
+    Перебудова зведень студентів, оцінених на уроці (зміна дати, теми,
+    предмета чи викладача уроку змінює елементи їхніх буферів).
+    """
+    student_ids = list(
+        StudentPerformance.objects.filter(lesson_id=lesson_id, earned_points__isnull=False)
+        .values_list('student_id', flat=True)
+    )
+    return rebuild_student_summaries(student_ids) if student_ids else 0
+
+
+def get_student_summary(student_id: int) -> StudentSummary:
+    """Зведення студента; будується при першому зверненні."""
+    summary = StudentSummary.objects.filter(student_id=student_id).first()
+    if summary is None:
+        rebuild_student_summaries([student_id])
+        summary = StudentSummary.objects.filter(student_id=student_id).first() or StudentSummary(student_id=student_id)
+    return summary
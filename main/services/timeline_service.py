@@ -0,0 +1,131 @@
+"""
+Timeline Service - тижневий таймлайн розкладу групи
+
+Цей модуль містить функції для:
+- Побудови тижня групи одним запитом уроків (дзвінки — з bell_schedule_service),
+  з індексом уроків по (дата, час початку) замість запиту на кожен слот
+- Кешування структури по (група, тиждень) без "живих" полів
+  (статус минула/поточна пара та прогрес накладаються при кожному запиті)
+- Інвалідації при записі уроків (див. сигнали в models.py) та зміні дзвінків
+"""
+
+from datetime import date, datetime, timedelta
+from typing import Iterable
+
+from django.core.cache import cache
+
+from main.models import Lesson
+from main.services.bell_schedule_service import get_bell_schedule
+from main.services.schedule_index import to_minutes
+
+TIMELINE_TTL = 60 * 60 * 24  # сек
+TIMELINE_VERSION_KEY = 'timeline:version'
+
+DAY_NAMES = {1: 'Понеділок', 2: 'Вівторок', 3: 'Середа', 4: 'Четвер', 5: "П'ятниця"}
+
+_LESSON_FIELDS = (
+    'id', 'date', 'start_time', 'is_cancelled', 'cancellation_reason', 'homework', 'materials',
+    'subject__name', 'teacher__full_name',
+)
+
+
+def week_start(day: date) -> date:
+    return day - timedelta(days=day.weekday())
+
+
+def _timeline_key(group_id: int, monday: date) -> str:
+    # Версія змінюється разом з розкладом дзвінків і робить усі старі ключі недосяжними
+    version = cache.get_or_set(TIMELINE_VERSION_KEY, 1, None)
+    return f"timeline:{version}:{group_id}:{monday.isoformat()}"
+
+
+def build_week_timeline(group_id: int, monday: date) -> list[dict]:
+    """
+    Тиждень групи: для кожного дня — усі слоти дзвінків з уроком або None.
+
+    Returns:
+        [{'day_num', 'day_name', 'date', 'lessons': [{'slot', 'assignment', 'duration',
+          'start_min', 'end_min'}]}] — slot та assignment є словниками
+    """
+    slots = [
+        {'lesson_number': number, 'start_time': start, 'end_time': end}
+        for number, start, end in ((b.lesson_number, b.start_time, b.end_time) for b in get_bell_schedule())
+    ]
+    lessons = {
+        (row['date'], row['start_time']): {
+            'id': row['id'],
+            'is_cancelled': row['is_cancelled'],
+            'cancellation_reason': row['cancellation_reason'],
+            'homework': row['homework'],
+            'materials': row['materials'],
+            'subject': {'name': row['subject__name']},
+            'teacher': {'full_name': row['teacher__full_name'] or ''},
+        }
+        for row in Lesson.objects.filter(
+            group_id=group_id, date__range=(monday, monday + timedelta(days=len(DAY_NAMES) - 1))
+        ).values(*_LESSON_FIELDS)
+    }
+
+    days = []
+    for day_num, day_name in DAY_NAMES.items():
+        day_date = monday + timedelta(days=day_num - 1)
+        day_lessons = []
+        for slot in slots:
+            start_min, end_min = to_minutes(slot['start_time']), to_minutes(slot['end_time'])
+            day_lessons.append({
+                'slot': slot,
+                'assignment': lessons.get((day_date, slot['start_time'])),
+                'duration': end_min - start_min,
+                'start_min': start_min,
+                'end_min': end_min,
+            })
+        days.append({'day_num': day_num, 'day_name': day_name, 'date': day_date, 'lessons': day_lessons})
+    return days
+
+
+def get_week_timeline(group_id: int, monday: date) -> list[dict]:
+    """Тиждень з кешу; будується при промаху."""
+    key = _timeline_key(group_id, monday)
+    days = cache.get(key)
+    if days is None:
+        days = build_week_timeline(group_id, monday)
+        cache.set(key, days, TIMELINE_TTL)
+    return days
+
+
+def apply_live_status(days: list[dict], now: datetime) -> list[dict]:
+    """
+    Накладання статусу (past/current/future) і прогресу поточної пари.
+    Повертає нові словники — кешована структура не змінюється.
+    """
+    today = now.date()
+    now_min = now.hour * 60 + now.minute
+    result = []
+    for day in days:
+        lessons = []
+        for item in day['lessons']:
+            status, progress = 'future', 0
+            if day['date'] < today or (day['date'] == today and now_min > item['end_min']):
+                status = 'past'
+            elif day['date'] == today and now_min >= item['start_min']:
+                status = 'current'
+                if item['duration'] > 0:
+                    progress = int((now_min - item['start_min']) / item['duration'] * 100)
+            lessons.append({**item, 'status': status, 'progress': min(max(progress, 0), 100)})
+        result.append({**day, 'is_today': day['date'] == today, 'lessons': lessons})
+    return result
+
+
+def invalidate_timeline(entries: Iterable[tuple[int, date]]) -> None:
+    """Скидає тижні для пар (група, будь-яка дата тижня)."""
+    keys = {_timeline_key(group_id, week_start(day)) for group_id, day in entries if group_id and day}
+    if keys:
+        cache.delete_many(list(keys))
+
+
+def invalidate_all_timelines() -> None:
+    """Зміна розкладу дзвінків зачіпає всі тижні всіх груп."""
+    try:
+        cache.incr(TIMELINE_VERSION_KEY)
+    except ValueError:
+        cache.set(TIMELINE_VERSION_KEY, 2, None)
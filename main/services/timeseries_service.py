@@ -0,0 +1,149 @@
+"""
+Timeseries Service - часові ряди оцінок студента для графіків
+
+Цей модуль містить функції для:
+- Побудови рядів оцінок по предметах проєкцією values_list (без моделей)
+- Серверного проріджування рядів до бюджету точок (LTTB або тижневі середні)
+- Версіонування відповіді (ETag) на основі StudentSummary.updated_at
+"""
+
+import hashlib
+from datetime import date
+from typing import Optional
+
+from django.core.cache import cache
+
+from main.models import StudentPerformance, StudentSummary
+
+DOWNSAMPLE_METHODS = ('lttb', 'weekly')
+DEFAULT_POINT_BUDGET = 60
+MAX_POINT_BUDGET = 500
+SERIES_CACHE_TTL = 60 * 60 * 24  # ключ містить версію, тож TTL лише прибирає сміття
+
+Point = tuple[int, float]  # (ordinal дати, бал)
+
+
+def lttb(points: list[Point], threshold: int) -> list[Point]:
+    """
+    Largest-Triangle-Three-Buckets: вибирає threshold точок, що найкраще
+    зберігають форму ряду. Перша й остання точки зберігаються завжди.
+
+    Example:
+        >>> lttb([(1, 5.0), (2, 9.0), (3, 4.0), (4, 8.0)], 3)
+        [(1, 5.0), (2, 9.0), (4, 8.0)]
+    """
+    n = len(points)
+    if threshold >= n or threshold < 3:
+        return points if threshold >= n else points[:1] + points[-1:]
+
+    sampled = [points[0]]
+    bucket = (n - 2) / (threshold - 2)
+    a = 0
+    for i in range(threshold - 2):
+        # Середня точка наступного кошика — "третя вершина" трикутника
+        nxt_start = int((i + 1) * bucket) + 1
+        nxt_end = min(int((i + 2) * bucket) + 1, n)
+        nxt = points[nxt_start:nxt_end]
+        avg_x = sum(p[0] for p in nxt) / len(nxt)
+        avg_y = sum(p[1] for p in nxt) / len(nxt)
+
+        start, end = int(i * bucket) + 1, int((i + 1) * bucket) + 1
+        ax, ay = points[a]
+        best, best_area = start, -1.0
+        for j in range(start, end):
+            x, y = points[j]
+            area = abs((ax - avg_x) * (y - ay) - (ax - x) * (avg_y - ay))
+            if area > best_area:
+                best, best_area = j, area
+        sampled.append(points[best])
+        a = best
+    sampled.append(points[-1])
+    return sampled
+
+
+def weekly_means(points: list[Point], threshold: int) -> list[Point]:
+    """
+    Середні по календарних тижнях (точка — понеділок тижня); якщо тижнів
+    більше за бюджет, сусідні тижні об'єднуються в рівні вікна.
+    """
+    if not points:
+        return []
+    first_monday = points[0][0] - date.fromordinal(points[0][0]).weekday()
+    weeks_total = (points[-1][0] - first_monday) // 7 + 1
+    span = max(1, -(-weeks_total // max(threshold, 1)))  # тижнів у вікні (ceil)
+
+    buckets: dict[int, list[float]] = {}
+    for x, y in points:
+        buckets.setdefault((x - first_monday) // (7 * span), []).append(y)
+    return [
+        (first_monday + idx * 7 * span, round(sum(ys) / len(ys), 2))
+        for idx, ys in sorted(buckets.items())
+    ]
+
+
+def series_version(student_id: int) -> str:
+    """Версія даних студента: змінюється з кожним записом оцінки (див. summary_service)."""
+    updated_at = (
+        StudentSummary.objects.filter(student_id=student_id)
+        .values_list('updated_at', flat=True).first()
+    )
+    return updated_at.isoformat() if updated_at else '0'
+
+
+def series_etag(student_id: int, budget: int, method: str, subject_id: Optional[int] = None) -> str:
+    raw = f"{student_id}:{series_version(student_id)}:{budget}:{method}:{subject_id or ''}"
+    return hashlib.md5(raw.encode()).hexdigest()
+
+
+def build_grade_series(
+    student_id: int,
+    budget: int = DEFAULT_POINT_BUDGET,
+    method: str = 'lttb',
+    subject_id: Optional[int] = None,
+) -> dict:
+    """
+    Ряди оцінок студента по предметах, проріджені до budget точок на предмет.
+
+    Returns:
+        {'method', 'budget', 'subjects': [{'id', 'name', 'count', 'points': [[ISO дата, бал], ...]}]}
+    """
+    qs = StudentPerformance.objects.filter(student_id=student_id, earned_points__isnull=False)
+    if subject_id:
+        qs = qs.filter(lesson__subject_id=subject_id)
+    rows = qs.order_by('lesson__subject_id', 'lesson__date', 'lesson__start_time').values_list(
+        'lesson__subject_id', 'lesson__subject__name', 'lesson__date', 'earned_points'
+    )
+
+    raw: dict[int, tuple[str, list[Point]]] = {}
+    for sid, name, day, points in rows:
+        raw.setdefault(sid, (name, []))[1].append((day.toordinal(), float(points)))
+
+    downsample = weekly_means if method == 'weekly' else lttb
+    subjects = []
+    for sid, (name, points) in raw.items():
+        sampled = downsample(points, budget)
+        subjects.append({
+            'id': sid,
+            'name': name,
+            'count': len(points),
+            'points': [[date.fromordinal(x).isoformat(), y] for x, y in sampled],
+        })
+    subjects.sort(key=lambda s: s['name'])
+    return {'method': method, 'budget': budget, 'subjects': subjects}
+
+
+def get_grade_series(
+    student_id: int,
+    budget: int = DEFAULT_POINT_BUDGET,
+    method: str = 'lttb',
+    subject_id: Optional[int] = None,
+    etag: Optional[str] = None,
+) -> dict:
+    """Ряди з кешу; ключ містить ETag, тож нова оцінка автоматично дає промах."""
+    etag = etag or series_etag(student_id, budget, method, subject_id)
+    key = f"timeseries:grades:{etag}"
+    data = cache.get(key)
+    if data is None:
+        data = build_grade_series(student_id, budget, method, subject_id)
+        cache.set(key, data, SERIES_CACHE_TTL)
+    return data
@@ -0,0 +1,593 @@
+"""
+Timetable Solver - автоматична генерація тижневого шаблону розкладу
+
+Цей модуль містить функції для:
+- Завантаження задачі з БД: потреби навантажень (TeachingAssignment.weekly_lessons),
+  аудиторії (місткість, тип), недоступність викладачів, розклад дзвінків
+  та зайнятість, яку генератор не змінює (інші групи, закріплені слоти)
+- Пошуку безконфліктного розкладу: жадібне розміщення найскладніших пар
+  першими, ремонт нерозміщених пар витісненням (min-conflicts) та
+  локальний пошук (перенесення/обмін) для м'яких обмежень — у межах бюджету часу
+- Запису результату в ScheduleTemplate однією транзакцією
+
+Жорсткі обмеження: група, викладач і аудиторія не зайняті двічі в один
+слот, викладач доступний, аудиторія вміщує групу й має потрібний тип.
+М'які: той самий предмет двічі на день, "вікна" у групи та викладача,
+перевантажені дні, пізні пари.
+"""
+
+import random
+import time
+from dataclasses import dataclass, field
+from datetime import time as dt_time
+from typing import Iterable, Optional
+
+from django.db import transaction
+from django.db.models import Count
+
+from main.models import Classroom, ScheduleTemplate, TeacherUnavailability, TeachingAssignment, User
+from main.services.bell_schedule_service import get_bell_schedule
+from main.services.schedule_index import invalidate_schedule_index, to_minutes
+from main.services.schedule_version_service import record_schedule_versions
+
+DEFAULT_DAYS = (1, 2, 3, 4, 5)
+DEFAULT_TIME_BUDGET = 10.0  # сек на весь пошук
+
+# Ваги м'яких обмежень
+MAX_LESSONS_PER_DAY = 4
+LATE_SLOT_FROM = 5  # пари, починаючи з цієї позиції в дні, штрафуються
+PENALTY_SAME_SUBJECT_DAY = 10
+PENALTY_DAY_OVERLOAD = 6
+PENALTY_GROUP_GAP = 3
+PENALTY_TEACHER_GAP = 1
+PENALTY_LATE_SLOT = 1
+
+FIXED = -1  # зайнятість, яку генератор не змінює
+
+
+@dataclass(frozen=True)
+class Slot:
+    day: int
+    lesson_number: int
+    position: int  # порядковий номер пари в дні (для "вікон" та пізніх пар)
+    start_time: dt_time
+    end_time: dt_time
+
+    @property
+    def duration(self) -> int:
+        return to_minutes(self.end_time) - to_minutes(self.start_time)
+
+
+@dataclass
+class Event:
+    """Одна пара, яку потрібно розмістити."""
+    id: int
+    assignment_id: int
+    group_id: int
+    subject_id: int
+    teacher_id: int
+    rooms: list[int]  # придатні аудиторії, від найменшої
+    slot: Optional[int] = None
+    room: Optional[int] = None
+
+
+@dataclass
+class TimetableProblem:
+    slots: list[Slot]
+    events: list[Event]
+    group_ids: list[int]
+    # (вид ресурсу, ID, індекс слота) — зайнято поза генератором
+    fixed: set[tuple[str, int, int]] = field(default_factory=set)
+    # (група, день, предмет) -> кількість закріплених пар
+    fixed_subjects: dict[tuple[int, int, int], int] = field(default_factory=dict)
+    rooms_required: bool = True
+    warnings: list[str] = field(default_factory=list)
+
+
+def load_slots(days: Iterable[int] = DEFAULT_DAYS) -> list[Slot]:
+    """Слоти тижня з розкладу дзвінків (bell_schedule_service)."""
+    bells = get_bell_schedule()
+    return [
+        Slot(day=day, lesson_number=bell.lesson_number, position=pos, start_time=bell.start_time,
+             end_time=bell.end_time)
+        for day in days
+        for pos, bell in enumerate(bells)
+    ]
+
+
+def _overlapping_slots(slots: list[Slot], day: int, start_time: dt_time, duration: int) -> list[int]:
+    start = to_minutes(start_time)
+    return [
+        i for i, s in enumerate(slots)
+        if s.day == day and to_minutes(s.start_time) < start + duration and start < to_minutes(s.end_time)
+    ]
+
+
+def load_problem(group_ids: Optional[Iterable[int]] = None, days: Iterable[int] = DEFAULT_DAYS) -> TimetableProblem:
+    """
+    Задача для груп group_ids (за замовчуванням — усі групи з weekly_lessons > 0).
+
+    Незакріплені шаблони цих груп вважаються такими, що будуть замінені;
+    закріплені та шаблони інших груп займають групу, викладача й аудиторію.
+    """
+    slots = load_slots(days)
+    assignments = TeachingAssignment.objects.filter(is_active=True, weekly_lessons__gt=0)
+    if group_ids is not None:
+        assignments = assignments.filter(group_id__in=list(group_ids))
+    assignment_rows = list(assignments.order_by('id').values_list(
+        'id', 'group_id', 'subject_id', 'teacher_id', 'weekly_lessons', 'subject__required_classroom_type',
+    ))
+    targets = sorted(set(group_ids) if group_ids is not None else {row[1] for row in assignment_rows})
+    target_set = set(targets)
+    problem = TimetableProblem(slots=slots, events=[], group_ids=targets)
+
+    sizes = dict(
+        User.objects.filter(role='student', group_id__in=targets)
+        .order_by().values('group_id').annotate(n=Count('id')).values_list('group_id', 'n')
+    )
+    rooms = list(
+        Classroom.objects.filter(is_active=True).order_by('capacity', 'id')
+        .values_list('id', 'capacity', 'type')
+    )
+    problem.rooms_required = bool(rooms)
+
+    # Зайнятість, яку генератор не змінює
+    demand_used: dict[tuple[int, int, int], int] = {}
+    templates = ScheduleTemplate.objects.filter(is_active=True).values_list(
+        'group_id', 'subject_id', 'teacher_id', 'classroom_id', 'day_of_week',
+        'start_time', 'duration_minutes', 'is_pinned',
+    )
+    for group_id, subject_id, teacher_id, classroom_id, day, start_time, duration, pinned in templates:
+        if group_id in target_set and not pinned:
+            continue
+        covered = _overlapping_slots(slots, day, start_time, duration)
+        for i in covered:
+            problem.fixed.add(('group', group_id, i))
+            if teacher_id:
+                problem.fixed.add(('teacher', teacher_id, i))
+            if classroom_id:
+                problem.fixed.add(('room', classroom_id, i))
+        if group_id in target_set:
+            key = (group_id, subject_id, teacher_id)
+            demand_used[key] = demand_used.get(key, 0) + 1
+            subject_key = (group_id, day, subject_id)
+            problem.fixed_subjects[subject_key] = problem.fixed_subjects.get(subject_key, 0) + 1
+
+    for teacher_id, day, number in TeacherUnavailability.objects.values_list('teacher_id', 'day_of_week', 'lesson_number'):
+        for i, s in enumerate(slots):
+            if s.day == day and (number is None or s.lesson_number == number):
+                problem.fixed.add(('teacher', teacher_id, i))
+
+    for aid, group_id, subject_id, teacher_id, weekly, room_type in assignment_rows:
+        size = sizes.get(group_id, 0)
+        fitting = [
+            rid for rid, capacity, rtype in rooms
+            if (capacity is None or capacity >= size) and (not room_type or rtype == room_type)
+        ]
+        if problem.rooms_required and not fitting:
+            problem.warnings.append(f"Навантаження {aid}: немає аудиторії на {size} місць типу '{room_type or 'будь-який'}'")
+        # Закріплені пари зараховуються в тижневу потребу
+        pinned = demand_used.pop((group_id, subject_id, teacher_id), 0)
+        for _ in range(max(weekly - pinned, 0)):
+            problem.events.append(Event(
+                id=len(problem.events), assignment_id=aid, group_id=group_id,
+                subject_id=subject_id, teacher_id=teacher_id, rooms=fitting,
+            ))
+
+    # Явна неможливість: пар більше, ніж вільних слотів ресурсу
+    for kind, attr in (('group', 'group_id'), ('teacher', 'teacher_id')):
+        demand: dict[int, int] = {}
+        for event in problem.events:
+            demand[getattr(event, attr)] = demand.get(getattr(event, attr), 0) + 1
+        for resource_id, count in demand.items():
+            free = sum(1 for i in range(len(slots)) if (kind, resource_id, i) not in problem.fixed)
+            if count > free:
+                label = 'Група' if kind == 'group' else 'Викладач'
+                problem.warnings.append(f"{label} {resource_id}: потрібно {count} пар, вільних слотів {free}")
+    return problem
+
+
+class TimetableSolver:
+    """
+    Евристичний пошук розкладу для TimetableProblem.
+
+    Стан — словники зайнятості (вид, ID, слот) -> ID пари або FIXED, тож
+    перевірка жорстких обмежень та зміна вартості при переміщенні пари
+    рахуються за O(пар у дні), без повного перерахунку.
+    """
+
+    def __init__(self, problem: TimetableProblem, seed: int = 0):
+        self.problem = problem
+        self.slots = problem.slots
+        self.events = problem.events
+        self.rng = random.Random(seed)
+        self.busy: dict[tuple[str, int, int], int] = {key: FIXED for key in problem.fixed}
+        # (група/викладач, день) -> позиції зайнятих пар (разом із закріпленими)
+        self.group_days: dict[tuple[int, int], list[int]] = {}
+        self.teacher_days: dict[tuple[int, int], list[int]] = {}
+        self.subject_days: dict[tuple[int, int, int], int] = dict(problem.fixed_subjects)
+        for kind, resource_id, i in problem.fixed:
+            if kind == 'group':
+                self.group_days.setdefault((resource_id, self.slots[i].day), []).append(self.slots[i].position)
+            elif kind == 'teacher':
+                self.teacher_days.setdefault((resource_id, self.slots[i].day), []).append(self.slots[i].position)
+        self.by_group: dict[int, list[Event]] = {}
+        for event in self.events:
+            self.by_group.setdefault(event.group_id, []).append(event)
+        self.iterations = 0
+
+    # --- Стан ---
+
+    def _free_room(self, event: Event, i: int) -> Optional[int]:
+        for room in event.rooms:
+            if ('room', room, i) not in self.busy:
+                return room
+        return None
+
+    def _place(self, event: Event, i: int, room: Optional[int]) -> None:
+        slot = self.slots[i]
+        event.slot, event.room = i, room
+        self.busy[('group', event.group_id, i)] = event.id
+        self.busy[('teacher', event.teacher_id, i)] = event.id
+        if room is not None:
+            self.busy[('room', room, i)] = event.id
+        self.group_days.setdefault((event.group_id, slot.day), []).append(slot.position)
+        self.teacher_days.setdefault((event.teacher_id, slot.day), []).append(slot.position)
+        key = (event.group_id, slot.day, event.subject_id)
+        self.subject_days[key] = self.subject_days.get(key, 0) + 1
+
+    def _unplace(self, event: Event) -> None:
+        i, slot = event.slot, self.slots[event.slot]
+        del self.busy[('group', event.group_id, i)]
+        del self.busy[('teacher', event.teacher_id, i)]
+        if event.room is not None:
+            del self.busy[('room', event.room, i)]
+        self.group_days[(event.group_id, slot.day)].remove(slot.position)
+        self.teacher_days[(event.teacher_id, slot.day)].remove(slot.position)
+        self.subject_days[(event.group_id, slot.day, event.subject_id)] -= 1
+        event.slot = event.room = None
+
+    def _feasible(self, event: Event, i: int) -> tuple[bool, Optional[int]]:
+        """(можна поставити, аудиторія) для незайнятої пари."""
+        if ('group', event.group_id, i) in self.busy or ('teacher', event.teacher_id, i) in self.busy:
+            return False, None
+        if not self.problem.rooms_required:
+            return True, None
+        room = self._free_room(event, i)
+        return room is not None, room
+
+    # --- Вартість ---
+
+    @staticmethod
+    def _gaps(positions: list[int]) -> int:
+        return max(positions) - min(positions) + 1 - len(positions) if positions else 0
+
+    def _marginal_cost(self, event: Event, i: int) -> int:
+        """Зміна штрафу, якщо поставити (не розміщену) пару в слот i."""
+        slot = self.slots[i]
+        group_day = self.group_days.get((event.group_id, slot.day), [])
+        teacher_day = self.teacher_days.get((event.teacher_id, slot.day), [])
+        cost = PENALTY_SAME_SUBJECT_DAY * self.subject_days.get((event.group_id, slot.day, event.subject_id), 0)
+        if len(group_day) >= MAX_LESSONS_PER_DAY:
+            cost += PENALTY_DAY_OVERLOAD
+        if group_day:
+            cost += PENALTY_GROUP_GAP * (self._gaps(group_day + [slot.position]) - self._gaps(group_day))
+        if teacher_day:
+            cost += PENALTY_TEACHER_GAP * (self._gaps(teacher_day + [slot.position]) - self._gaps(teacher_day))
+        cost += PENALTY_LATE_SLOT * max(0, slot.position + 1 - LATE_SLOT_FROM)
+        return cost
+
+    def total_cost(self) -> int:
+        cost = 0
+        for positions in self.group_days.values():
+            cost += PENALTY_GROUP_GAP * self._gaps(positions)
+            cost += PENALTY_DAY_OVERLOAD * max(0, len(positions) - MAX_LESSONS_PER_DAY)
+        for positions in self.teacher_days.values():
+            cost += PENALTY_TEACHER_GAP * self._gaps(positions)
+        for count in self.subject_days.values():
+            cost += PENALTY_SAME_SUBJECT_DAY * count * (count - 1) // 2
+        for event in self.events:
+            if event.slot is not None:
+                cost += PENALTY_LATE_SLOT * max(0, self.slots[event.slot].position + 1 - LATE_SLOT_FROM)
+        return cost
+
+    # --- Фази ---
+
+    def _greedy(self) -> list[Event]:
+        """Найменш гнучкі пари першими, кожна — у найдешевший допустимий слот."""
+        teacher_load: dict[int, int] = {}
+        for event in self.events:
+            teacher_load[event.teacher_id] = teacher_load.get(event.teacher_id, 0) + 1
+
+        def freedom(event: Event) -> int:
+            return sum(
+                1 for i in range(len(self.slots))
+                if ('teacher', event.teacher_id, i) not in self.busy and ('group', event.group_id, i) not in self.busy
+            )
+
+        order = sorted(self.events, key=lambda e: (len(e.rooms), freedom(e), -teacher_load[e.teacher_id], e.id))
+        unplaced = []
+        for event in order:
+            if self.problem.rooms_required and not event.rooms:
+                unplaced.append(event)
+                continue
+            best = None
+            for i in range(len(self.slots)):
+                ok, room = self._feasible(event, i)
+                if ok:
+                    cost = self._marginal_cost(event, i)
+                    if best is None or cost < best[0]:
+                        best = (cost, i, room)
+            if best is None:
+                unplaced.append(event)
+            else:
+                self._place(event, best[1], best[2])
+        return unplaced
+
+    def _repair(self, unplaced: list[Event], deadline: float) -> list[Event]:
+        """
+        Min-conflicts: нерозміщена пара стає в слот з найменшою кількістю
+        конфліктів, витіснені пари повертаються в чергу. Недавно витіснені
+        пари не витісняють своїх "кривдників" (табу), найкращий стан зберігається.
+        """
+        hopeless = [e for e in unplaced if self.problem.rooms_required and not e.rooms]
+        queue = [e for e in unplaced if e.rooms or not self.problem.rooms_required]
+        best_unplaced = len(queue)
+        best_state = self._snapshot()
+        tabu: dict[tuple[int, int], int] = {}  # (пара, слот) -> ітерація, до якої заборонено
+
+        while queue and time.perf_counter() < deadline:
+            self.iterations += 1
+            event = queue.pop(self.rng.randrange(len(queue)))
+            choice = None
+            for i in range(len(self.slots)):
+                if tabu.get((event.id, i), 0) > self.iterations:
+                    continue
+                conflicts = self._conflicts(event, i)
+                if conflicts is None:
+                    continue
+                score = (len(conflicts), self._marginal_cost(event, i), self.rng.random())
+                if choice is None or score < choice[0]:
+                    choice = (score, i, conflicts)
+            if choice is None:
+                queue.append(event)
+                continue
+
+            _, i, conflicts = choice
+            for other in conflicts:
+                tabu[(other.id, i)] = self.iterations + 10
+                self._unplace(other)
+                queue.append(other)
+            ok, room = self._feasible(event, i)
+            if ok:
+                self._place(event, i, room)
+            else:
+                queue.append(event)
+
+            if len(queue) < best_unplaced:
+                best_unplaced = len(queue)
+                best_state = self._snapshot()
+
+        if queue:
+            self._restore(best_state)
+        hopeless_ids = {e.id for e in hopeless}
+        return [e for e in self.events if e.slot is None and e.id not in hopeless_ids] + hopeless
+
+    def _conflicts(self, event: Event, i: int) -> Optional[list[Event]]:
+        """Пари, які потрібно витіснити, щоб поставити event у слот i (None — неможливо)."""
+        conflicts = set()
+        for kind, resource_id in (('group', event.group_id), ('teacher', event.teacher_id)):
+            occupant = self.busy.get((kind, resource_id, i))
+            if occupant == FIXED:
+                return None
+            if occupant is not None:
+                conflicts.add(occupant)
+        if self.problem.rooms_required and self._free_room(event, i) is None:
+            movable = [
+                self.busy[('room', room, i)] for room in event.rooms
+                if self.busy[('room', room, i)] != FIXED
+            ]
+            if not movable:
+                return None
+            # Аудиторія пари, яку вже витісняємо, звільниться безкоштовно
+            if not any(eid in conflicts for eid in movable):
+                conflicts.add(movable[0])
+        return [self.events[eid] for eid in conflicts]
+
+    def _improve(self, deadline: float) -> None:
+        """Локальний пошук: перенесення пари або обмін двох пар групи, поки є покращення."""
+        placed = [e for e in self.events if e.slot is not None]
+        if not placed:
+            return
+        stale = 0
+        while stale < 2 * len(placed) and time.perf_counter() < deadline:
+            self.iterations += 1
+            event = self.rng.choice(placed)
+            if self._try_move(event) or self._try_swap(event):
+                stale = 0
+            else:
+                stale += 1
+
+    def _try_move(self, event: Event) -> bool:
+        old_slot, old_room = event.slot, event.room
+        self._unplace(event)
+        current = self._marginal_cost(event, old_slot)
+        best = None
+        for i in range(len(self.slots)):
+            if i == old_slot:
+                continue
+            ok, room = self._feasible(event, i)
+            if ok:
+                cost = self._marginal_cost(event, i)
+                if cost < current and (best is None or cost < best[0]):
+                    best = (cost, i, room)
+        if best is None:
+            self._place(event, old_slot, old_room)
+            return False
+        self._place(event, best[1], best[2])
+        return True
+
+    def _try_swap(self, event: Event) -> bool:
+        partners = [
+            e for e in self.by_group[event.group_id]
+            if e.slot is not None and e.subject_id != event.subject_id
+        ]
+        if not partners:
+            return False
+        other = self.rng.choice(partners)
+        a_slot, a_room, b_slot, b_room = event.slot, event.room, other.slot, other.room
+
+        # Внески обох пар рахуються послідовно — так до і після порівнюються точно
+        self._unplace(event)
+        before = self._marginal_cost(event, a_slot)
+        self._unplace(other)
+        before += self._marginal_cost(other, b_slot)
+        ok_a, room_a = self._feasible(event, b_slot)
+        after = None
+        if ok_a:
+            after = self._marginal_cost(event, b_slot)
+            self._place(event, b_slot, room_a)
+            ok_b, room_b = self._feasible(other, a_slot)
+            if ok_b:
+                after += self._marginal_cost(other, a_slot)
+                if after < before:
+                    self._place(other, a_slot, room_b)
+                    return True
+            self._unplace(event)
+        self._place(event, a_slot, a_room)
+        self._place(other, b_slot, b_room)
+        return False
+
+    def _snapshot(self) -> list[tuple[Optional[int], Optional[int]]]:
+        return [(e.slot, e.room) for e in self.events]
+
+    def _restore(self, state: list[tuple[Optional[int], Optional[int]]]) -> None:
+        for event in self.events:
+            if event.slot is not None:
+                self._unplace(event)
+        for event, (i, room) in zip(self.events, state):
+            if i is not None:
+                self._place(event, i, room)
+
+    def solve(self, time_budget: float = DEFAULT_TIME_BUDGET) -> dict:
+        """
+        Returns:
+            dict: placements, unplaced, warnings, stats (events, placed, cost, iterations, фази в мс)
+        """
+        started = time.perf_counter()
+        deadline = started + time_budget
+        unplaced = self._greedy()
+        greedy_ms = (time.perf_counter() - started) * 1000
+        greedy_unplaced = len(unplaced)
+        if unplaced:
+            unplaced = self._repair(unplaced, deadline)
+        repair_ms = (time.perf_counter() - started) * 1000 - greedy_ms
+        cost_before = self.total_cost()
+        self._improve(deadline)
+        elapsed_ms = (time.perf_counter() - started) * 1000
+
+        placements = []
+        for event in self.events:
+            if event.slot is None:
+                continue
+            slot = self.slots[event.slot]
+            placements.append({
+                'assignment_id': event.assignment_id,
+                'group_id': event.group_id,
+                'subject_id': event.subject_id,
+                'teacher_id': event.teacher_id,
+                'classroom_id': event.room,
+                'day_of_week': slot.day,
+                'lesson_number': slot.lesson_number,
+                'start_time': slot.start_time,
+                'duration_minutes': slot.duration,
+            })
+        placements.sort(key=lambda p: (p['group_id'], p['day_of_week'], p['lesson_number']))
+        return {
+            'group_ids': self.problem.group_ids,
+            'placements': placements,
+            'unplaced': [
+                {'assignment_id': e.assignment_id, 'group_id': e.group_id,
+                 'subject_id': e.subject_id, 'teacher_id': e.teacher_id}
+                for e in unplaced
+            ],
+            'warnings': self.problem.warnings,
+            'stats': {
+                'events': len(self.events),
+                'placed': len(placements),
+                'unplaced': len(unplaced),
+                'greedy_unplaced': greedy_unplaced,
+                'cost_before_improve': cost_before,
+                'cost': self.total_cost(),
+                'iterations': self.iterations,
+                'greedy_ms': round(greedy_ms, 1),
+                'repair_ms': round(repair_ms, 1),
+                'elapsed_ms': round(elapsed_ms, 1),
+            },
+        }
+
+
+def generate_timetable(
+    group_ids: Optional[Iterable[int]] = None,
+    days: Iterable[int] = DEFAULT_DAYS,
+    time_budget: float = DEFAULT_TIME_BUDGET,
+    seed: int = 0,
+) -> dict:
+    """Завантаження задачі та пошук розкладу (нічого не записує)."""
+    problem = load_problem(group_ids=list(group_ids) if group_ids is not None else None, days=tuple(days))
+    return TimetableSolver(problem, seed=seed).solve(time_budget)
+
+
+def find_hard_conflicts(placements: list[dict]) -> list[str]:
+    """Перевірка результату: повторне використання групи, викладача чи аудиторії в слоті."""
+    seen: dict[tuple, dict] = {}
+    conflicts = []
+    for p in placements:
+        for kind in ('group_id', 'teacher_id', 'classroom_id'):
+            if p[kind] is None:
+                continue
+            key = (kind, p[kind], p['day_of_week'], p['lesson_number'])
+            if key in seen:
+                conflicts.append(f"{kind}={p[kind]}: день {p['day_of_week']}, пара {p['lesson_number']}")
+            else:
+                seen[key] = p
+    return conflicts
+
+
+def apply_timetable(result: dict) -> dict:
+    """
+    Заміна незакріплених шаблонів груп результату на згенеровані.
+
+    Returns:
+        {'status': 'success'|'error', 'message': str, 'created': int, 'deleted': int}
+    """
+    if result['unplaced']:
+        return {
+            'status': 'error',
+            'message': f"Не розміщено {len(result['unplaced'])} пар — розклад не збережено",
+            'created': 0, 'deleted': 0,
+        }
+
+    with transaction.atomic():
+        _, deleted_by_model = ScheduleTemplate.objects.filter(
+            group_id__in=result['group_ids'], is_pinned=False
+        ).delete()
+        deleted = deleted_by_model.get(ScheduleTemplate._meta.label, 0)
+        created = ScheduleTemplate.objects.bulk_create([
+            ScheduleTemplate(
+                teaching_assignment_id=p['assignment_id'], group_id=p['group_id'],
+                subject_id=p['subject_id'], teacher_id=p['teacher_id'], classroom_id=p['classroom_id'],
+                day_of_week=p['day_of_week'], lesson_number=p['lesson_number'],
+                start_time=p['start_time'], duration_minutes=p['duration_minutes'],
+            )
+            for p in result['placements']
+        ])
+        record_schedule_versions(result['group_ids'])
+        # bulk-операції оминають сигнали ScheduleTemplate
+        transaction.on_commit(invalidate_schedule_index)
+
+    return {
+        'status': 'success',
+        'message': f"Збережено {len(created)} пар для {len(result['group_ids'])} груп",
+        'created': len(created), 'deleted': deleted,
+    }
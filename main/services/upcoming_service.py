@@ -0,0 +1,106 @@
+"""
+Upcoming Service - індекс найближчих занять групи та викладача
+
+Цей модуль містить функції для:
+- Побудови компактного списку наступних UPCOMING_SIZE уроків (з уже
+  підтягнутими subject/classroom/teacher/group) для групи чи викладача
+- Пошуку поточної та наступної пари без запитів до БД
+- Інвалідації індексів при створенні, скасуванні чи перенесенні уроку
+
+Індекс будується на день: уроки, що вже минули, відкидаються при читанні,
+а перебудова відбувається при зміні дати або коли список вичерпався
+(тоді — лише з уроків, що ще не закінчились).
+"""
+
+from datetime import date, datetime, time
+from typing import Iterable, Optional
+
+from django.core.cache import cache
+from django.db.models import Q
+
+from main.models import Lesson
+
+UPCOMING_SIZE = 10
+UPCOMING_TTL = 60 * 60 * 6  # сек
+
+_FILTER_FIELDS = {'group': 'group_id', 'teacher': 'teacher_id'}
+
+
+def _upcoming_key(kind: str, object_id: int) -> str:
+    return f"upcoming:{kind}:{object_id}"
+
+
+def build_upcoming_index(kind: str, object_id: int, today: date, now_time: Optional[time] = None) -> dict:
+    """
+    Наступні UPCOMING_SIZE нескасованих уроків групи/викладача, починаючи з today (1 запит).
+
+    Args:
+        kind: 'group' або 'teacher'
+        object_id: ID групи або викладача
+        today: дата побудови
+        now_time: якщо задано — сьогоднішні уроки, що вже закінчились, не беруться
+
+    Returns:
+        {'day': today, 'full': чи заповнено весь ліміт, 'lessons': [Lesson, ...]}
+    """
+    window = Q(date__gte=today) if now_time is None else Q(date__gt=today) | Q(date=today, end_time__gte=now_time)
+    lessons = list(
+        Lesson.objects.filter(window, **{_FILTER_FIELDS[kind]: object_id}, is_cancelled=False)
+        .select_related('group', 'subject', 'classroom', 'teacher')
+        .order_by('date', 'start_time')[:UPCOMING_SIZE]
+    )
+    return {'day': today, 'full': len(lessons) == UPCOMING_SIZE, 'lessons': lessons}
+
+
+def get_upcoming_lessons(kind: str, object_id: Optional[int], now: Optional[datetime] = None) -> list[Lesson]:
+    """
+    Уроки, що ще не закінчились (поточний — першим), з кешованого індексу.
+    """
+    if not object_id:
+        return []
+    now = now or datetime.now()
+    today, now_time = now.date(), now.time()
+    key = _upcoming_key(kind, object_id)
+
+    index = cache.get(key)
+    if index is None or index['day'] != today:
+        index = build_upcoming_index(kind, object_id, today)
+        cache.set(key, index, UPCOMING_TTL)
+
+    lessons = [l for l in index['lessons'] if l.date > today or l.end_time >= now_time]
+    if not lessons and index['full']:
+        # Усі проіндексовані пари вже минули сьогодні — наступне вікно від поточного моменту
+        index = build_upcoming_index(kind, object_id, today, now_time)
+        cache.set(key, index, UPCOMING_TTL)
+        lessons = [l for l in index['lessons'] if l.date > today or l.end_time >= now_time]
+    return lessons
+
+
+def get_current_and_next_lesson(
+    kind: str,
+    object_id: Optional[int],
+    now: Optional[datetime] = None,
+) -> tuple[Optional[Lesson], Optional[Lesson]]:
+    """
+    Поточна та наступна пара (без запитів при теплому кеші).
+
+    Returns:
+        (current_lesson, next_lesson) — будь-який з них може бути None
+    """
+    now = now or datetime.now()
+    current_lesson = next_lesson = None
+    for lesson in get_upcoming_lessons(kind, object_id, now):
+        if lesson.date == now.date() and lesson.start_time <= now.time():
+            current_lesson = current_lesson or lesson
+        else:
+            next_lesson = lesson
+            break
+    return current_lesson, next_lesson
+
+
+def invalidate_upcoming(group_ids: Iterable[Optional[int]] = (), teacher_ids: Iterable[Optional[int]] = ()) -> None:
+    """Скидає індекси для переданих груп та викладачів."""
+    keys = [_upcoming_key('group', gid) for gid in set(group_ids) if gid]
+    keys += [_upcoming_key('teacher', tid) for tid in set(teacher_ids) if tid]
+    if keys:
+        cache.delete_many(keys)
@@ -3,6 +3,8 @@ import json
 from datetime import date as dt_date, timedelta
 from django import template
 
+from main.services.bell_schedule_service import get_bell_schedule
+
 register = template.Library()
 
 @register.filter
@@ -14,23 +16,14 @@ def get_item(dictionary, key):
 @register.simple_tag
 def get_lesson_at(lessons, date_obj, lesson_num):
     """Шукає урок для конкретної дати та номеру пари."""
-    times = {
-        1: "08:00",
-        2: "09:00",
-        3: "10:00",
-        4: "12:00",
-        5: "13:00",
-        6: "14:00",
-        7: "15:00",
-    }
-    target_time = times.get(int(lesson_num))
+    target_time = get_bell_schedule().start_for(lesson_num)
     if not target_time or not lessons: return None
     
     for l in lessons:
         try:
-            if l.date == date_obj and l.start_time.strftime('%H:%M') == target_time:
+            if l.date == date_obj and l.start_time == target_time:
                 return l
-        except:
+        except AttributeError:
             continue
     return None
 
@@ -51,16 +44,8 @@ def get_schedule_template_at(templates, day_of_week, lesson_num):
 @register.simple_tag
 def lesson_hours(num):
     """Повертає часовий інтервал для номеру пари."""
-    times = {
-        1: "08:00 - 08:50",
-        2: "09:00 - 09:50",
-        3: "10:00 - 10:50",
-        4: "12:00 - 12:50",
-        5: "13:00 - 13:50",
-        6: "14:00 - 14:50",
-        7: "15:00 - 15:50",
-    }
-    return times.get(int(num), "")
+    bell = get_bell_schedule().get(num)
+    return bell.label() if bell else ""
 
 @register.filter
 def format_teacher_short(full_name):
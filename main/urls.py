@@ -18,10 +18,17 @@ urlpatterns = [
     path('users/', views.users_list_view, name='users_list'),
     path('schedule/', views.schedule_view, name='schedule_view'),
     path('schedule/timeline/', views.timeline_schedule_view, name='timeline_schedule'),
+    path('calendar/<str:token>.ics', views.calendar_feed_view, name='calendar_feed'),
+    path('api/calendar/reset/', views.api_reset_calendar_feeds, name='api_reset_calendar_feeds'),
     path('schedule/set/', views.set_weekly_schedule_view, name='set_weekly_schedule'),
     path('schedule/save/', views.save_schedule_changes, name='save_schedule'),
+    path('api/schedule/builder/group/<int:group_id>/', views.api_schedule_builder_group, name='api_schedule_builder_group'),
+    path('api/schedule/builder/teacher-busy/', views.api_schedule_builder_teacher_busy, name='api_schedule_builder_teacher_busy'),
     path('schedule/editor/', views.schedule_editor_view, name='schedule_editor'),
     path('api/schedule/slot/save/', views.api_save_schedule_slot, name='api_save_schedule_slot'),
+    path('api/schedule/free-resources/', views.api_schedule_free_resources, name='api_schedule_free_resources'),
+    path('api/schedule/versions/<int:group_id>/', views.api_schedule_versions, name='api_schedule_versions'),
+    path('api/schedule/versions/diff/<int:version_id>/', views.api_schedule_version_diff, name='api_schedule_version_diff'),
     # Управління Користувачами (CRUD)
     path('users/edit/<int:pk>/', views.user_edit_view, name='user_edit'),
     path('users/delete/<int:pk>/', views.user_delete_view, name='user_delete'),
@@ -56,6 +63,10 @@ urlpatterns = [
         views.report_weekly_absences_view,
         name='report_weekly_absences',
     ),
+    path('admin/reports/export/', views.report_performance_export_view, name='report_performance_export'),
+    path('admin/reports/schedule-health/', views.schedule_health_view, name='schedule_health'),
+    path('admin/reports/rooms/', views.room_utilisation_view, name='room_utilisation'),
+    path('admin/substitutions/', views.substitutions_view, name='substitutions'),
     # =========================
     # 4. ВИКЛАДАЧ ТА ЖУРНАЛ
     # =========================
@@ -81,12 +92,15 @@ urlpatterns = [
     path('student/grades/', views.student_grades_view, name='student_grades'),
     path('student/attendance/', views.student_attendance_view, name='student_attendance'),
     path('student/dashboard/', views.student_dashboard_view, name='student_dashboard'),
+    path('api/student/grades/series/', views.api_student_grade_series, name='api_student_grade_series'),
     path('profile/', views.profile_view, name='profile'),
     path('api/set-theme/', views.api_set_theme, name='api_set_theme'),
     # =========================
     # 6. СТРІЧКА НОВИН
     # =========================
     path('news/', views.news_feed_view, name='news_feed'),
+    path('api/news/feed/', views.api_news_feed_page, name='api_news_feed_page'),
+    path('api/news/post/<int:pk>/comments/', views.api_news_post_comments, name='api_news_post_comments'),
     path('api/news/post/create/', views.api_news_create_post, name='api_news_create_post'),
     path('api/news/post/delete/<int:pk>/', views.api_news_delete_post, name='api_news_delete_post'),
     path('api/news/comment/create/', views.api_news_create_comment, name='api_news_create_comment'),
@@ -95,6 +109,8 @@ urlpatterns = [
     # 7. СПОВІЩЕННЯ
     # =========================
     path('api/notifications/', views.api_notifications_list, name='api_notifications_list'),
+    path('api/notifications/unread/', views.api_notifications_unread, name='api_notifications_unread'),
+    path('api/notifications/stream/', views.api_notifications_stream, name='api_notifications_stream'),
     path('api/notifications/mark-read/<int:pk>/', views.api_notifications_mark_read, name='api_notifications_mark_read'),
     path('api/notifications/mark-all-read/', views.api_notifications_mark_all_read, name='api_notifications_mark_all_read'),
     # =========================
@@ -13,7 +13,7 @@ from django.contrib.auth.decorators import login_required
 from django.core.exceptions import ObjectDoesNotExist
 from django.core.paginator import Paginator
 from django.db import IntegrityError, transaction
-from django.db.models import Avg, Count, F, Max, Min, Prefetch, Q, Sum
+from django.db.models import Avg, Count, F, Max, Min, Q, Sum
 from django.http import HttpRequest, HttpResponse, JsonResponse
 from django.shortcuts import get_object_or_404, redirect, render
 from django.views.decorators.http import require_POST, require_http_methods
@@ -33,13 +33,11 @@ from .models import (
     TeachingAssignment,
     User,
     ScheduleTemplate,
-    TimeSlot,
     Classroom,
     GradingScale,
     GradeRule,
     Post,
     Comment,
-    Notification,
 )
 
 # =========================
@@ -783,96 +781,66 @@ def classroom_delete_view(request, pk):
 # --- SCHEDULE ---
 @role_required('admin')
 def set_weekly_schedule_view(request):
-    """Сторінка налаштування розкладу."""
+    """
+    Сторінка налаштування розкладу.
+
+    Тиждень групи підвантажується через api_schedule_builder_group при виборі
+    групи, тож вартість сторінки не залежить від кількості груп.
+    """
     if request.method == 'POST':
         return save_schedule_changes(request)
-    
-    groups = StudyGroup.objects.all().order_by('name')
-    
-    assignments = TeachingAssignment.objects.select_related(
-        'subject', 'teacher', 'group'
-    ).order_by('group__name', 'subject__name')
-    
-    subject_teachers = defaultdict(list)
-    for assignment in assignments:
-        subj_id = assignment.subject.id
-        teacher_tuple = (assignment.teacher.id, assignment.teacher.full_name)
-        if teacher_tuple not in subject_teachers[subj_id]:
-            subject_teachers[subj_id].append(teacher_tuple)
-    
-    current_schedule = ScheduleTemplate.objects.all().select_related(
-        'subject',
-        'teacher',
-        'group'
-    )
-    
-    schedule_map_temp = defaultdict(lambda: defaultdict(dict))
-    for item in current_schedule:
-        grp_id = str(item.group.id)
-        day = str(item.day_of_week)
-        
-        # Зберегти всі уроки, незалежно від часу
-        # Використовувати lesson_number з бази даних (він повинен бути встановлений коректно)
-        lesson_num = item.lesson_number
-        if lesson_num:
-            schedule_map_temp[grp_id][day][str(lesson_num)] = {
-                'subject_id': item.subject.id,
-                'subject_name': item.subject.name,
-                'teacher_id': item.teacher.id,
-                'teacher_name': item.teacher.full_name,
-                'start_time': item.start_time.strftime("%H:%M"),
-                'duration': item.duration_minutes, # Важливо
-                'classroom': item.classroom.name if item.classroom else ""
-            }
-    
-    schedule_map = {}
-    for grp_id, days in schedule_map_temp.items():
-        schedule_map[grp_id] = {}
-        for day, lessons in days.items():
-            schedule_map[grp_id][day] = dict(lessons)
 
-    subjects = Subject.objects.all().order_by('name')
-    subject_data = []
-    subject_teachers_map = {}
-
-    for subject in subjects:
-        teachers = TeachingAssignment.objects.filter(
-            subject=subject
-        ).select_related('teacher').values_list('teacher_id', 'teacher__full_name').distinct()
-        teachers_list = list(teachers)
-
-        if teachers_list:
-            subject_teachers_map[subject.id] = [
-                {'id': tid, 'name': tname} for tid, tname in teachers_list
-            ]
-            subject_data.append({
-                'id': subject.id,
-                'name': subject.name,
-            })
+    from main.services.bell_schedule_service import get_bell_schedule
+    from main.services.schedule_builder_service import get_subject_teachers_map
 
+    subject_map = get_subject_teachers_map()
+    bells = get_bell_schedule()
     lesson_times = {
-        1: ("08:00", "08:50"),
-        2: ("09:00", "09:50"),
-        3: ("10:00", "10:50"),
-        4: ("12:00", "12:50"),
-        5: ("13:00", "13:50"),
-        6: ("14:00", "14:50"),
-        7: ("15:00", "15:50"),
+        b.lesson_number: (b.start_time.strftime('%H:%M'), b.end_time.strftime('%H:%M')) for b in bells
     }
 
     context = {
-        'groups': groups,
-        'schedule_map': schedule_map,
-        'subject_data': subject_data,
-        'subject_teachers_map': subject_teachers_map,
+        'groups': StudyGroup.objects.order_by('name').only('id', 'name'),
+        'subject_data': subject_map['subjects'],
+        'subject_teachers_map': subject_map['teachers'],
         'days': [(1, 'Понеділок'), (2, 'Вівторок'), (3, 'Середа'), (4, 'Четвер'), (5, "П'ятниця")],
-        'lesson_numbers': range(1, 8),
+        'lesson_numbers': bells.numbers,
         'lesson_times': lesson_times,
         'active_page': 'schedule_builder',
     }
     return render(request, 'main/schedule_builder.html', context)
 
 
+@role_required('admin')
+def api_schedule_builder_group(request: HttpRequest, group_id: int) -> JsonResponse:
+    """
+    Тиждень однієї групи для конструктора разом із зайнятістю в інших групах
+    викладачів, яких найімовірніше оберуть (навантаження групи + поточний тиждень).
+    """
+    from main.services.schedule_builder_service import get_group_teacher_ids, get_group_week, get_teacher_busy
+
+    group = get_object_or_404(StudyGroup, id=group_id)
+    week = get_group_week(group.id)
+    return JsonResponse({
+        'group_id': group.id,
+        'schedule': week,
+        'teacher_busy': get_teacher_busy(get_group_teacher_ids(group.id, week), exclude_group_id=group.id),
+    })
+
+
+@role_required('admin')
+def api_schedule_builder_teacher_busy(request: HttpRequest) -> JsonResponse:
+    """Зайнятість довільних викладачів (догрузка при виборі викладача поза навантаженнями групи)."""
+    from main.services.schedule_builder_service import get_teacher_busy
+
+    try:
+        teacher_ids = [int(tid) for tid in request.GET.get('teacher_ids', '').split(',') if tid.strip()]
+        exclude_group_id = int(request.GET['group_id']) if request.GET.get('group_id') else None
+    except ValueError:
+        return JsonResponse({'error': 'Невірні параметри'}, status=400)
+    return JsonResponse({'teacher_busy': get_teacher_busy(teacher_ids[:50], exclude_group_id=exclude_group_id)})
+
+
 @require_POST
 @role_required('admin')
 def save_schedule_changes(request: HttpRequest) -> JsonResponse:
@@ -887,130 +855,10 @@ def save_schedule_changes(request: HttpRequest) -> JsonResponse:
         
         group = get_object_or_404(StudyGroup, id=group_id)
         
-        with transaction.atomic():
-            # Імпорт валідаційного сервісу
-            from main.services.schedule_service import validate_schedule_slot
-            
-            # Крок 1: Підготовка та валідація ВСІХ нових слотів (перед видаленням!)
-            # Це дозволяє exclude_slot_id працювати правильно, оскільки старі слоти ще в БД
-            slots_to_create = []
-            
-            for day_str, lessons in schedule_entries.items():
-                day = int(day_str)
-                for lesson_num_str, lesson_data in lessons.items():
-                    lesson_num = int(lesson_num_str)
-                    
-                    if isinstance(lesson_data, dict):
-                        subject_id = lesson_data.get('subject_id')
-                        teacher_id = lesson_data.get('teacher_id')
-                    else:
-                        subject_id = lesson_data
-                        teacher_id = None
-                    
-                    if subject_id:
-                        # Підготовка даних для слоту
-                        assignment = None
-                        if teacher_id:
-                            teacher = User.objects.filter(id=teacher_id).first()
-                            if teacher:
-                                assignment, _ = TeachingAssignment.objects.get_or_create(
-                                    group=group,
-                                    subject_id=subject_id,
-                                    teacher=teacher
-                                )
-                        
-                        if not assignment:
-                            assignment = TeachingAssignment.objects.filter(
-                                group=group,
-                                subject_id=subject_id
-                            ).first()
-                        
-                        start_time_str = "08:30"
-                        classroom_name = ""
-                        duration = 90
-                        if isinstance(lesson_data, dict):
-                            start_time_str = lesson_data.get('startTime', lesson_data.get('start_time', "08:30"))
-                            classroom_name = lesson_data.get('classroom', "").strip()
-                            duration = int(lesson_data.get('duration', 90))
-                        
-                        classroom_obj = None
-                        if classroom_name:
-                            classroom_obj, _ = Classroom.objects.get_or_create(name=classroom_name)
-
-                        import datetime as _dt
-                        start_time_obj = _dt.datetime.strptime(start_time_str, "%H:%M").time()
-
-                        teacher_obj = None
-                        if teacher_id:
-                            teacher_obj = User.objects.filter(id=teacher_id).first()
-                        elif assignment:
-                            teacher_obj = assignment.teacher
-
-                        # Знайти існуючий слот для виключення з перевірки конфліктів
-                        existing_slot = ScheduleTemplate.objects.filter(
-                            group=group,
-                            day_of_week=day,
-                            lesson_number=lesson_num
-                        ).first()
-                        exclude_id = existing_slot.id if existing_slot else None
-
-                        # ВАЛІДАЦІЯ: check_current_group=False ігнорує конфлікти з цією ж групою,
-                        # оскільки ми зараз перезаписуємо весь її розклад
-                        is_valid, err = validate_schedule_slot(
-                            group=group,
-                            day=day,
-                            lesson_number=lesson_num,
-                            start_time=start_time_obj,
-                            duration=duration,
-                            subject=Subject.objects.filter(id=subject_id).first(),
-                            teacher=teacher_obj,
-                            classroom=classroom_obj,
-                            exclude_slot_id=exclude_id,
-                            check_current_group=False
-                        )
-
-                        if not is_valid:
-                            day_name = {1:'Пн', 2:'Вт', 3:'Ср', 4:'Чт', 5:'Пт', 6:'Сб', 7:'Нд'}.get(day, str(day))
-                            return JsonResponse({
-                                'status': 'error',
-                                'message': f"Конфлікт ({day_name}, пара №{lesson_num}): {err}"
-                            }, status=400)
-
-                        # Зберігаємо дані для створення після видалення
-                        slots_to_create.append({
-                            'group': group,
-                            'subject_id': subject_id,
-                            'teacher_id': teacher_id or (assignment.teacher_id if assignment else None),
-                            'assignment': assignment,
-                            'day_of_week': day,
-                            'lesson_number': lesson_num,
-                            'start_time': start_time_str,
-                            'duration_minutes': duration,
-                            'classroom': classroom_obj,
-                        })
-            
-            # Крок 2: Видалити ВСІ старі слоти (валідація вже пройдена!)
-            ScheduleTemplate.objects.filter(group=group).delete()
-            
-            # Крок 3: Створити нові слоти
-            for slot_data in slots_to_create:
-                ScheduleTemplate.objects.create(
-                    group=slot_data['group'],
-                    subject_id=slot_data['subject_id'],
-                    teacher_id=slot_data['teacher_id'],
-                    teaching_assignment=slot_data['assignment'],
-                    day_of_week=slot_data['day_of_week'],
-                    lesson_number=slot_data['lesson_number'],
-                    start_time=slot_data['start_time'],
-                    duration_minutes=slot_data['duration_minutes'],
-                    classroom=slot_data['classroom'],
-                    valid_from=date.today()
-                )
-        
-        return JsonResponse({
-            'status': 'success',
-            'message': f'Розклад для групи {group.name} оновлено'
-        })
+        # Пакетний конвеєр: попереднє завантаження, валідація тижня в пам'яті, bulk-запис
+        from main.services.schedule_service import save_group_week
+        result = save_group_week(group, schedule_entries, user=request.user)
+        return JsonResponse(result, status=200 if result['status'] == 'success' else 400)
     
     except json.JSONDecodeError:
         return JsonResponse({
@@ -1082,13 +930,137 @@ def schedule_editor_view(request: HttpRequest) -> HttpResponse:
     }
     return render(request, 'main/schedule_editor.html', context)
 
+def _version_payload(version) -> dict:
+    return {
+        'id': version.id,
+        'group_id': version.group_id,
+        'valid_from': version.valid_from.isoformat(),
+        'valid_to': version.valid_to.isoformat() if version.valid_to else None,
+        'slots_count': len(version.slots),
+        'created_by': version.created_by.full_name if version.created_by else None,
+        'created_at': version.created_at.isoformat(),
+    }
+
+
+@role_required('admin')
+def api_schedule_versions(request: HttpRequest, group_id: int) -> JsonResponse:
+    """
+    Історія розкладу групи. З ?as_of=YYYY-MM-DD — версія, чинна на дату,
+    разом зі слотами (з назвами предметів, викладачів та аудиторій).
+    """
+    from main.models import ScheduleVersion
+    from main.services.schedule_version_service import get_version_as_of, label_slots
+
+    group = get_object_or_404(StudyGroup, id=group_id)
+    if request.GET.get('as_of'):
+        try:
+            as_of = datetime.strptime(request.GET['as_of'], '%Y-%m-%d').date()
+        except ValueError:
+            return JsonResponse({'status': 'error', 'message': 'Невірна дата'}, status=400)
+        version = get_version_as_of(group.id, as_of)
+        if version is None:
+            return JsonResponse({'status': 'error', 'message': 'На цю дату версії розкладу немає'}, status=404)
+        return JsonResponse({
+            'status': 'success',
+            'version': {**_version_payload(version), 'slots': label_slots(version.slots)},
+        })
+
+    versions = ScheduleVersion.objects.filter(group=group).select_related('created_by').order_by('-valid_from')
+    return JsonResponse({'status': 'success', 'versions': [_version_payload(v) for v in versions]})
+
+
+@role_required('admin')
+def api_schedule_version_diff(request: HttpRequest, version_id: int) -> JsonResponse:
+    """
+    Зміни версії відносно попередньої версії групи або ?against=<id>
+    (будь-якої іншої версії тієї ж групи).
+    """
+    from main.models import ScheduleVersion
+    from main.services.schedule_version_service import diff_versions, label_diff
+
+    version = get_object_or_404(ScheduleVersion.objects.select_related('created_by'), id=version_id)
+    if request.GET.get('against'):
+        if not request.GET['against'].isdigit():
+            return JsonResponse({'status': 'error', 'message': 'Невірні параметри'}, status=400)
+        other = get_object_or_404(ScheduleVersion, id=request.GET['against'], group_id=version.group_id)
+    else:
+        other = ScheduleVersion.objects.filter(
+            group_id=version.group_id, valid_from__lt=version.valid_from,
+        ).order_by('-valid_from').first()
+
+    diff = label_diff(diff_versions(other, version))
+
+    return JsonResponse({
+        'status': 'success',
+        'version': _version_payload(version),
+        'against': _version_payload(other) if other else None,
+        **diff,
+    })
+
+
+@role_required('admin')
+def api_schedule_free_resources(request: HttpRequest) -> JsonResponse:
+    """
+    Вільні викладачі та аудиторії для слоту редактора (один запит на кожен довідник).
+
+    GET-параметри: day, start_time (HH:MM), duration, group_id та lesson_number
+    (слот, що редагується, не вважається зайнятим), subject_id і teacher_id
+    (необов'язково; спільна пара з ними не вважається зайнятістю).
+
+    Зайнятість і місткість — окремо: для аудиторії поле fits — чи вміщує
+    вона групу (None, якщо місткість чи розмір групи невідомі).
+    """
+    from main.services.schedule_service import get_available_classrooms, get_available_teachers
+
+    try:
+        day = int(request.GET['day'])
+        start_time = datetime.strptime(request.GET['start_time'], '%H:%M').time()
+        duration = int(request.GET.get('duration') or 50)
+        group_id = int(request.GET.get('group_id') or 0) or None
+        lesson_number = int(request.GET.get('lesson_number') or 0) or None
+        subject_id = int(request.GET.get('subject_id') or 0) or None
+        teacher_id = int(request.GET.get('teacher_id') or 0) or None
+    except (KeyError, ValueError):
+        return JsonResponse({'status': 'error', 'message': 'Невірні параметри'}, status=400)
+    if not 1 <= day <= 7 or duration <= 0:
+        return JsonResponse({'status': 'error', 'message': 'Невірні параметри'}, status=400)
+
+    exclude_id = None
+    group_size = None
+    if group_id:
+        if lesson_number:
+            exclude_id = ScheduleTemplate.objects.filter(
+                group_id=group_id, day_of_week=day, lesson_number=lesson_number
+            ).values_list('id', flat=True).first()
+        group_size = User.objects.filter(role='student', group_id=group_id).count() or None
+    subject = Subject.objects.filter(id=subject_id).first() if subject_id else None
+    teacher = User.objects.filter(id=teacher_id, role='teacher').first() if teacher_id else None
+
+    teachers = get_available_teachers(
+        day, start_time, duration, subject=subject, exclude_slot_id=exclude_id, filter_by_subject=False,
+    )
+    classrooms = get_available_classrooms(
+        day, start_time, duration, exclude_slot_id=exclude_id, subject=subject, teacher=teacher,
+    )
+    return JsonResponse({
+        'status': 'success',
+        'teachers': [{'id': t.id, 'name': t.full_name} for t in teachers],
+        'classrooms': [
+            {
+                'id': c.id, 'name': c.name, 'building': c.building, 'capacity': c.capacity, 'type': c.type,
+                'fits': c.capacity >= group_size if c.capacity and group_size else None,
+            }
+            for c in classrooms
+        ],
+    })
+
 @require_POST
 @role_required('admin')
 def api_save_schedule_slot(request: HttpRequest) -> JsonResponse:
     """API для збереження окремого слоту в ScheduleTemplate."""
     try:
         # Імпорт сервісу та форми
-        from main.services.schedule_service import validate_schedule_slot
+        from main.services.schedule_service import lock_schedule_resources, validate_schedule_slot
         from main.forms import ScheduleSlotForm
         
         data = json.loads(request.body)
@@ -1128,45 +1100,53 @@ def api_save_schedule_slot(request: HttpRequest) -> JsonResponse:
         if classroom_id:
             classroom = get_object_or_404(Classroom, id=classroom_id)
         
-        # Знайти існуючий слот (для виключення при валідації)
-        existing_slot = ScheduleTemplate.objects.filter(
-            group=group, 
-            day_of_week=day, 
-            lesson_number=lesson_num
-        ).first()
-        exclude_id = existing_slot.id if existing_slot else None
-        
-        # VALIDATION через сервіс (замість 60+ рядків коду!)
-        is_valid, error_message = validate_schedule_slot(
-            group=group,
-            day=day,
-            lesson_number=lesson_num,
-            start_time=start_time,
-            duration=duration,
-            subject=subject,
-            teacher=teacher,
-            classroom=classroom,
-            exclude_slot_id=exclude_id
-        )
-        
-        if not is_valid:
-            return JsonResponse({
-                'status': 'error', 
-                'message': f"Конфлікт: {error_message}"
-            }, status=400)
-
-        # 1. Знаходимо або створюємо TeachingAssignment (SSOT)
-        # У майбутньому це буде обов'язковим, зараз - забезпечуємо міграцію нових даних
-        assignment = None
-        if teacher:
-            assignment, _ = TeachingAssignment.objects.get_or_create(
+        # Перевірка й запис однією транзакцією під блокуванням ресурсів слоту,
+        # щоб паралельне збереження не зайняло їх між перевіркою та записом
+        with transaction.atomic():
+            lock_schedule_resources(
+                group_ids=[group.id],
+                teacher_ids=[teacher.id] if teacher else (),
+                classroom_names=[classroom.name] if classroom else (),
+            )
+
+            # Знайти існуючий слот (для виключення при валідації)
+            existing_slot = ScheduleTemplate.objects.filter(
+                group=group, 
+                day_of_week=day, 
+                lesson_number=lesson_num
+            ).first()
+            exclude_id = existing_slot.id if existing_slot else None
+            
+            # VALIDATION через сервіс (замість 60+ рядків коду!)
+            is_valid, error_message = validate_schedule_slot(
+                group=group,
+                day=day,
+                lesson_number=lesson_num,
+                start_time=start_time,
+                duration=duration,
                 subject=subject,
                 teacher=teacher,
-                group=group
+                classroom=classroom,
+                exclude_slot_id=exclude_id
             )
+            
+            if not is_valid:
+                return JsonResponse({
+                    'status': 'error', 
+                    'message': f"Конфлікт: {error_message}"
+                }, status=400)
 
-        # SAVE - з урахуванням можливості None для teacher
-        with transaction.atomic():
+            # 1. Знаходимо або створюємо TeachingAssignment (SSOT)
+            # У майбутньому це буде обов'язковим, зараз - забезпечуємо міграцію нових даних
+            assignment = None
+            if teacher:
+                assignment, _ = TeachingAssignment.objects.get_or_create(
+                    subject=subject,
+                    teacher=teacher,
+                    group=group
+                )
+
+            # SAVE - з урахуванням можливості None для teacher
             # Якщо викладач не вказаний, але є assignment (наприклад збережений раніше),
             # використаємо його викладача. Інакше залишимо None (модель дозволяє null тепер).
             teacher_to_save = teacher or (assignment.teacher if assignment else None)
@@ -1511,57 +1491,22 @@ def teacher_dashboard_view(request):
     Показує: розклад на сьогодні, проблемних студентів, статистику.
     """
     import json
-    from datetime import datetime, time as dtime
+    from main.services.dashboard_service import get_teacher_dashboard_snapshot
+    from main.services.upcoming_service import get_current_and_next_lesson
 
     teacher = request.user
     today = date.today()
-    now = datetime.now().time()
 
-    # 1. Розклад на СЬОГОДНІ
-    today_lessons = list(
-        Lesson.objects.filter(teacher=teacher, date=today)
-        .select_related('group', 'subject', 'classroom', 'evaluation_type')
-        .order_by('start_time')
-    )
+    # Знімок (пари на сьогодні, радар ризику, навантаження) — з кешу
+    snapshot = get_teacher_dashboard_snapshot(teacher.id, today)
+    today_lessons = snapshot['today_lessons']
+    risk_students = snapshot['risk_students']
+    weekly_by_day = snapshot['weekly_by_day']
 
-    # Поточна або наступна пара
-    current_lesson = None
-    next_lesson = None
-    for lesson in today_lessons:
-        if lesson.start_time <= now <= lesson.end_time:
-            current_lesson = lesson
-            break
-        elif lesson.start_time > now and next_lesson is None:
-            next_lesson = lesson
-
-    # 2. "Радар Ризику"
-    my_groups = TeachingAssignment.objects.filter(teacher=teacher).values_list('group', flat=True)
-
-    risk_students = []
-    students_in_danger = User.objects.filter(
-        group__in=my_groups,
-        role='student'
-    ).annotate(
-        absences_count=Count('studentperformance', filter=Q(studentperformance__absence__isnull=False))
-    ).filter(absences_count__gte=3).order_by('-absences_count')[:5]
-
-    for s in students_in_danger:
-        risk_students.append({
-            'name': s.full_name,
-            'group': s.group.name,
-            'issue': f"{s.absences_count} пропусків",
-            'severity': 'high' if s.absences_count > 5 else 'medium'
-        })
+    # Поточна або наступна пара — з індексу найближчих занять
+    current_lesson, next_lesson = get_current_and_next_lesson('teacher', teacher.id)
 
-    # 3. Навантаження по днях тижня (для графіку)
-    start_week = today - timedelta(days=today.weekday())
     day_names = ['Пн', 'Вт', 'Ср', 'Чт', 'Пт', 'Сб', 'Нд']
-    weekly_by_day = []
-    for i in range(7):
-        day = start_week + timedelta(days=i)
-        count = Lesson.objects.filter(teacher=teacher, date=day).count()
-        weekly_by_day.append(count)
-
     weekly_load = sum(weekly_by_day)
 
     context = {
@@ -1652,68 +1597,35 @@ def student_dashboard_view(request: HttpRequest) -> HttpResponse:
     """Дашборд студента з аналітикою та розкладом."""
     student = request.user
     from django.utils import timezone
-    now_aware = timezone.localtime(timezone.now())
-    today = now_aware.date()
-    now_time = now_aware.time()
-    
-    # 1. Загальна статистика (Середній бал)
-    performance_queryset = StudentPerformance.objects.filter(student=student)
-    
-    stats = performance_queryset.filter(
-        earned_points__isnull=False
-    ).aggregate(avg_score=Avg('earned_points'))
-    
-    # 2. Відвідуваність (для кругової діаграми)
-    total_lessons_count = performance_queryset.count()
-    absence_stats = performance_queryset.filter(absence__isnull=False).aggregate(
-        total_absences=Count('id'),
-        respectful=Count('id', filter=Q(absence__is_respectful=True)),
-        unrespectful=Count('id', filter=Q(absence__is_respectful=False))
-    )
-    
-    present_count = total_lessons_count - (absence_stats['total_absences'] or 0)
-    attendance_percent = round((present_count / total_lessons_count * 100), 1) if total_lessons_count > 0 else 0
-    
-    # 3. Дані для графіка (останні 30 оцінок)
-    chart_data = performance_queryset.filter(
-        earned_points__isnull=False
-    ).select_related('lesson', 'lesson__subject').order_by('lesson__date', 'lesson__start_time')[:30]
-    
-    graph_labels = [p.lesson.date.strftime("%d.%m") for p in chart_data]
-    graph_points = [float(p.earned_points) for p in chart_data]
+    now_local = timezone.make_naive(timezone.now())
     
-    # 4. Уроки (Зараз та Наступний)
-    lessons_today = Lesson.objects.filter(group=student.group, date=today).select_related('subject', 'classroom', 'teacher').order_by('start_time')
-    
-    current_lesson = None
-    next_lesson = None
+    # 1-3. Середній бал, відвідуваність та останні оцінки — з одного рядка зведення
+    from main.services.summary_service import get_student_summary
+    summary = get_student_summary(student.id)
+
+    recent_grades = summary.recent_grades
+    graph_labels = [date.fromisoformat(e['date']).strftime("%d.%m") for e in recent_grades]
+    graph_points = [e['points'] for e in recent_grades]
+
+    # 4. Уроки (Зараз та Наступний) — з індексу найближчих занять групи
+    from main.services.upcoming_service import get_current_and_next_lesson
+    current_lesson, next_lesson = get_current_and_next_lesson(
+        'group', student.group_id, now_local
+    )
     
-    for l in lessons_today:
-        if l.start_time <= now_time <= l.end_time:
-            current_lesson = l
-        elif l.start_time > now_time:
-            next_lesson = l
-            break
-            
-    if not next_lesson:
-        # Шукаємо наступний урок у майбутні дні
-        next_lesson = Lesson.objects.filter(
-            group=student.group,
-            date__gt=today
-        ).select_related('subject', 'classroom', 'teacher').order_by('date', 'start_time').first()
-    
-    # 5. Останні події (5 останніх оцінок)
-    recent_events = performance_queryset.filter(
-        earned_points__isnull=False
-    ).select_related('lesson', 'lesson__subject').order_by('-lesson__date', '-lesson__start_time')[:5]
+    # 5. Останні події (5 останніх оцінок) — хвіст буфера зведення
+    recent_events = [
+        {**e, 'date': date.fromisoformat(e['date'])}
+        for e in reversed(recent_grades[-5:])
+    ]
 
     context = {
-        'avg_score': round(stats['avg_score'] or 0, 1),
-        'attendance_percent': attendance_percent,
+        'avg_score': summary.avg_score,
+        'attendance_percent': summary.attendance_percent,
         'attendance_json': json.dumps({
-            'present': present_count,
-            'respectful': absence_stats['respectful'] or 0,
-            'unrespectful': absence_stats['unrespectful'] or 0
+            'present': summary.present_count,
+            'respectful': summary.respectful_absences,
+            'unrespectful': summary.unrespectful_absences
         }),
         'graph_labels_json': json.dumps(graph_labels),
         'graph_points_json': json.dumps(graph_points),
@@ -1724,6 +1636,41 @@ def student_dashboard_view(request: HttpRequest) -> HttpResponse:
     }
     return render(request, 'student_dashboard.html', context)
 
+
+@role_required('student')
+def api_student_grade_series(request: HttpRequest) -> HttpResponse:
+    """
+    Часові ряди оцінок студента по предметах, проріджені на сервері.
+
+    GET-параметри: points (бюджет точок на предмет), method (lttb|weekly), subject.
+    Підтримує If-None-Match: поки нових оцінок немає, повертає 304.
+    """
+    from main.services.timeseries_service import (
+        DEFAULT_POINT_BUDGET,
+        DOWNSAMPLE_METHODS,
+        MAX_POINT_BUDGET,
+        get_grade_series,
+        series_etag,
+    )
+    try:
+        budget = int(request.GET.get('points') or DEFAULT_POINT_BUDGET)
+        subject_id = int(request.GET.get('subject') or 0) or None
+    except ValueError:
+        return JsonResponse({'status': 'error', 'message': 'Невірні параметри'}, status=400)
+    budget = min(max(budget, 3), MAX_POINT_BUDGET)
+    method = request.GET.get('method', 'lttb')
+    if method not in DOWNSAMPLE_METHODS:
+        return JsonResponse({'status': 'error', 'message': 'Невідомий метод проріджування'}, status=400)
+
+    etag = f'"{series_etag(request.user.id, budget, method, subject_id)}"'
+    if etag in request.headers.get('If-None-Match', ''):
+        response = HttpResponse(status=304)
+    else:
+        response = JsonResponse(get_grade_series(request.user.id, budget, method, subject_id, etag=etag.strip('"')))
+    response['ETag'] = etag
+    response['Cache-Control'] = 'private, no-cache'
+    return response
+
 # =========================
 # 5. ЗВІТИ (АДМІН)
 # =========================
@@ -1732,6 +1679,138 @@ def student_dashboard_view(request: HttpRequest) -> HttpResponse:
 def admin_reports_view(request):
     return render(request, 'admin_reports.html', {'active_page': 'reports'})
 
+@role_required('admin')
+def schedule_health_view(request: HttpRequest) -> HttpResponse:
+    """Стан розкладу: перетини груп, викладачів та аудиторій (sweep line по всіх шаблонах)."""
+    from main.services.schedule_audit import audit_schedule
+    from main.services.schedule_index import RESOURCE_KINDS
+
+    kind = request.GET.get('kind')
+    report = audit_schedule()
+    conflicts = [c for c in report['conflicts'] if c['kind'] == kind] if kind in RESOURCE_KINDS else report['conflicts']
+
+    if request.GET.get('export') == 'json':
+        return JsonResponse({'templates': report['templates'], 'by_kind': report['by_kind'], 'conflicts': conflicts})
+
+    kind_labels = {'group': 'Групи', 'teacher': 'Викладачі', 'classroom': 'Аудиторії'}
+    return render(request, 'schedule_health.html', {
+        'templates_count': report['templates'],
+        'total_conflicts': len(report['conflicts']),
+        'kind_stats': [(k, kind_labels[k], report['by_kind'][k]) for k in RESOURCE_KINDS],
+        'kind_labels': kind_labels,
+        'selected_kind': kind,
+        'conflicts': conflicts,
+        'active_page': 'reports',
+    })
+
+@role_required('admin')
+def room_utilisation_view(request: HttpRequest) -> HttpResponse:
+    """
+    Завантаженість аудиторій за період (за замовчуванням — останні 4 тижні):
+    зайняті хвилини, пік одночасних занять, простій, відповідність місткості.
+    ?export=csv | json — вивантаження.
+    """
+    from django.utils import timezone
+    from main.services.room_utilisation_service import (
+        DEFAULT_DAY_END, DEFAULT_DAY_START, UTILISATION_CSV_HEADER, room_utilisation, utilisation_csv_rows,
+    )
+
+    today = timezone.localdate()
+    try:
+        date_from = datetime.strptime(request.GET['date_from'], '%Y-%m-%d').date() if request.GET.get('date_from') else today - timedelta(days=27)
+        date_to = datetime.strptime(request.GET['date_to'], '%Y-%m-%d').date() if request.GET.get('date_to') else today
+        day_start = datetime.strptime(request.GET['day_start'], '%H:%M').time() if request.GET.get('day_start') else DEFAULT_DAY_START
+        day_end = datetime.strptime(request.GET['day_end'], '%H:%M').time() if request.GET.get('day_end') else DEFAULT_DAY_END
+    except ValueError:
+        return JsonResponse({'status': 'error', 'message': 'Невірний формат дати чи часу'}, status=400)
+    if date_to < date_from or (date_to - date_from).days > 366 or day_end <= day_start:
+        return JsonResponse({'status': 'error', 'message': 'Невірний період'}, status=400)
+
+    building = request.GET.get('building') or None
+    report = room_utilisation(date_from, date_to, day_start, day_end, building=building)
+
+    export = request.GET.get('export')
+    if export == 'json':
+        return JsonResponse(report)
+    if export == 'csv':
+        return generate_csv_response(
+            f"rooms_{date_from:%Y%m%d}_{date_to:%Y%m%d}", UTILISATION_CSV_HEADER, utilisation_csv_rows(report)
+        )
+
+    from main.models import Classroom
+    return render(request, 'room_utilisation.html', {
+        'report': report,
+        'date_from': date_from,
+        'date_to': date_to,
+        'day_start': day_start,
+        'day_end': day_end,
+        'building': building or '',
+        'buildings': Classroom.objects.exclude(building='').values_list('building', flat=True).distinct().order_by('building'),
+        'query': request.GET.urlencode(),
+        'active_page': 'reports',
+    })
+
+
+@role_required('admin')
+def substitutions_view(request: HttpRequest) -> HttpResponse:
+    """
+    Заміни на час відсутності викладача: усі його уроки за період з рейтингом
+    вільних кваліфікованих викладачів (один план на весь період).
+    POST призначає обрані заміни (поля sub_<lesson_id>).
+    """
+    from django.utils import timezone
+    from main.services.substitution_service import apply_substitutions, get_substitution_window, plan_substitutions
+
+    params = request.POST if request.method == 'POST' else request.GET
+    teacher = None
+    if params.get('teacher_id'):
+        teacher = get_object_or_404(User, id=params['teacher_id'], role='teacher')
+    try:
+        date_from, date_to = get_substitution_window(
+            datetime.strptime(params['date_from'], '%Y-%m-%d').date() if params.get('date_from') else None,
+            datetime.strptime(params['date_to'], '%Y-%m-%d').date() if params.get('date_to') else None,
+            timezone.localdate(),
+        )
+    except ValueError:
+        messages.error(request, 'Невірний формат дати')
+        return redirect('substitutions')
+
+    if request.method == 'POST' and teacher:
+        assignments = {
+            int(key[4:]): int(value)
+            for key, value in request.POST.items()
+            if key.startswith('sub_') and key[4:].isdigit() and value.isdigit()
+        }
+        if assignments:
+            result = apply_substitutions(teacher.id, date_from, date_to, assignments)
+            (messages.success if result['status'] == 'success' else messages.error)(request, result['message'])
+        return redirect(
+            f"{request.path}?teacher_id={teacher.id}&date_from={date_from:%Y-%m-%d}&date_to={date_to:%Y-%m-%d}"
+        )
+
+    plan = plan_substitutions(teacher.id, date_from, date_to) if teacher else None
+    if plan is not None and request.GET.get('export') == 'json':
+        return JsonResponse({
+            'teacher_id': teacher.id,
+            'date_from': date_from.isoformat(),
+            'date_to': date_to.isoformat(),
+            'uncovered': plan['uncovered'],
+            'lessons': [
+                {**l, 'date': l['date'].isoformat(), 'start_time': l['start_time'].strftime('%H:%M'),
+                 'end_time': l['end_time'].strftime('%H:%M')}
+                for l in plan['lessons']
+            ],
+        })
+
+    return render(request, 'substitutions.html', {
+        'teachers': User.objects.filter(role='teacher', is_active=True).order_by('full_name').only('id', 'full_name'),
+        'teacher': teacher,
+        'date_from': date_from,
+        'date_to': date_to,
+        'plan': plan,
+        'active_page': 'reports',
+    })
+
 @role_required('admin')
 def report_absences_view(request):
     group_id = request.GET.get('group', '')
@@ -1975,6 +2054,32 @@ def report_weekly_absences_view(request):
     return render(request, 'report_absences.html', context)
 
 
+@role_required('admin')
+def report_performance_export_view(request):
+    """
+    Потоковий експорт фактів успішності (Parquet / NDJSON.gz).
+    GET: format=auto|parquet|ndjson, group, date_from, date_to
+    """
+    from django.http import StreamingHttpResponse
+    from main.services.export_service import export_file_extension, stream_performance_export
+
+    try:
+        export_format, stream = stream_performance_export(
+            export_format=request.GET.get('format') or None,
+            date_from=date.fromisoformat(request.GET['date_from']) if request.GET.get('date_from') else None,
+            date_to=date.fromisoformat(request.GET['date_to']) if request.GET.get('date_to') else None,
+            group_id=int(request.GET['group']) if request.GET.get('group') else None,
+        )
+    except ValueError as e:
+        return JsonResponse({'status': 'error', 'message': str(e)}, status=400)
+
+    content_type = 'application/vnd.apache.parquet' if export_format == 'parquet' else 'application/gzip'
+    response = StreamingHttpResponse(stream, content_type=content_type)
+    filename = f"performance_{date.today()}.{export_file_extension(export_format)}"
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
+
+
 # =========================
 # 5. EVALUATION TYPES MANAGEMENT
 # =========================
@@ -2129,6 +2234,9 @@ def get_evaluation_types_api(request):
 
 @login_required
 def timeline_schedule_view(request):
+    from django.utils import timezone
+    from main.services.timeline_service import apply_live_status, get_week_timeline, week_start
+
     user = request.user
     
     # Визначаємо групу
@@ -2136,81 +2244,88 @@ def timeline_schedule_view(request):
     if not group and request.GET.get('group_id'):
         group = get_object_or_404(StudyGroup, id=request.GET.get('group_id'))
 
-    # Отримуємо всі часові слоти
-    time_slots = TimeSlot.objects.all()
-    
-    # Дні тижня
-    days_data = []
-    days_names = {1: 'Понеділок', 2: 'Вівторок', 3: 'Середа', 4: 'Четвер', 5: 'П\'ятниця'}
-    
     # TIMEZONE FIX
-    from django.utils import timezone
-    now_aware = timezone.localtime(timezone.now())
-    current_time_minutes = now_aware.hour * 60 + now_aware.minute
-    current_day = now_aware.weekday() + 1 # 1=Monday
+    now_local = timezone.make_naive(timezone.now())
 
+    days_data = []
     if group:
-        # Беремо шаблони розкладу
-        templates = ScheduleTemplate.objects.filter(
-            group=group
-        ).select_related('subject', 'teacher', 'teaching_assignment')
-
-        # Дні тижня для таймлайну
-        today_date = now_aware.date()
-        start_week = today_date - timedelta(days=today_date.weekday())
-
-        for day_num, day_name in days_names.items():
-            day_lessons = []
-            current_day_date = start_week + timedelta(days=day_num - 1)
-            
-            # Шукаємо уроки в цей день (згенеровані)
-            lessons_in_db = Lesson.objects.filter(
-                group=group,
-                date=current_day_date
-            ).select_related('subject', 'teacher')
+        # Структура тижня — з кешу (2 запити при промаху), статус пар — на кожен запит
+        days = get_week_timeline(group.id, week_start(now_local.date()))
+        days_data = apply_live_status(days, now_local)
 
-            for slot in time_slots:
-                # Мапінг слота в урок за часом
-                lesson = lessons_in_db.filter(start_time=slot.start_time).first()
-                
-                start_min = slot.start_time.hour * 60 + slot.start_time.minute
-                end_min = slot.end_time.hour * 60 + slot.end_time.minute
-                duration = end_min - start_min
-                
-                status = 'future'
-                progress = 0
-                
-                if day_num < current_day:
-                    status = 'past'
-                elif day_num == current_day:
-                    if current_time_minutes > end_min:
-                        status = 'past'
-                    elif current_time_minutes >= start_min:
-                        status = 'current'
-                        passed = current_time_minutes - start_min
-                        progress = int((passed / duration) * 100) if duration > 0 else 0
-                
-                day_lessons.append({
-                    'slot': slot,
-                    'assignment': lesson if lesson else None,
-                    'status': status,
-                    'progress': min(max(progress, 0), 100),
-                    'duration': duration
-                })
-            
-            days_data.append({
-                'day_name': day_name,
-                'is_today': day_num == current_day,
-                'lessons': day_lessons
-            })
+    # Підписка на .ics: викладач — на власний розклад, інші — на розклад групи
+    feed_url = None
+    if user.role == 'teacher':
+        feed_url = _calendar_feed_url(request, 'teacher', user.id)
+    elif group:
+        feed_url = _calendar_feed_url(request, 'group', group.id)
 
     return render(request, 'timeline_schedule.html', {
         'days_data': days_data,
         'group': group,
         'all_groups': StudyGroup.objects.all().order_by('name') if user.role != 'student' else None,
+        'calendar_feed_url': feed_url,
         'active_page': 'schedule'
     })
 
+
+def _calendar_feed_url(request: HttpRequest, kind: str, object_id: int) -> str:
+    from django.urls import reverse
+    from main.services.calendar_feed_service import make_feed_token
+
+    return request.build_absolute_uri(reverse('calendar_feed', args=[make_feed_token(request.user, kind, object_id)]))
+
+
+@login_required
+@require_POST
+def api_reset_calendar_feeds(request: HttpRequest) -> JsonResponse:
+    """Відкликає всі посилання користувача на .ics-стрічки (напр. якщо посилання потрапило до сторонніх)."""
+    from main.services.calendar_feed_service import revoke_feed_tokens
+
+    revoke_feed_tokens(request.user)
+    return JsonResponse({'status': 'success', 'message': 'Попередні посилання на календар більше не діють'})
+
+
+@require_http_methods(['GET', 'HEAD'])
+def calendar_feed_view(request: HttpRequest, token: str) -> HttpResponse:
+    """
+    Підписна .ics-стрічка групи, викладача або аудиторії.
+
+    Доступ — за підписаним токеном користувача (календарні застосунки не
+    мають сесії); користувач може відкликати свої токени. ETag будується з
+    версії розкладу, тож повторне опитування без змін отримує 304 за два
+    агрегатні запити.
+    """
+    from django.http import Http404
+    from django.utils import timezone
+    from django.utils.cache import get_conditional_response, patch_cache_control
+    from main.models import Classroom
+    from main.services.calendar_feed_service import get_feed_body, get_feed_version, parse_feed_token
+
+    parsed = parse_feed_token(token)
+    if parsed is None:
+        raise Http404
+    kind, object_id = parsed
+    if kind == 'group':
+        name = get_object_or_404(StudyGroup, id=object_id).name
+    elif kind == 'teacher':
+        name = get_object_or_404(User, id=object_id, role='teacher').full_name
+    else:
+        name = f"Аудиторія {get_object_or_404(Classroom, id=object_id).name}"
+
+    today = timezone.localdate()
+    version = get_feed_version(kind, object_id, today)
+    etag = f'"{version["etag"]}"'
+
+    response = get_conditional_response(request, etag=etag)
+    if response is None:
+        body = get_feed_body(kind, object_id, today, version, name)
+        response = HttpResponse(body, content_type='text/calendar; charset=utf-8')
+        response['Content-Disposition'] = f'inline; filename="schedule-{kind}-{object_id}.ics"'
+    response['ETag'] = etag
+    patch_cache_control(response, private=True, max_age=0, must_revalidate=True)
+    return response
+
 @require_POST
 @role_required('teacher')
 def api_update_lesson(request: HttpRequest) -> JsonResponse:
@@ -2394,44 +2509,24 @@ def api_set_theme(request: HttpRequest) -> JsonResponse:
 
 @login_required
 def news_feed_view(request: HttpRequest) -> HttpResponse:
-    user = request.user
+    """Перша сторінка стрічки; далі — api_news_feed_page за курсором."""
+    from main.services.news_service import feed_group_ids, feed_queryset, get_feed_page
 
-    # Визначаємо групи, доступні користувачеві
+    user = request.user
+    group_ids = feed_group_ids(user)
     if user.role == 'admin':
-        group_ids = list(StudyGroup.objects.values_list('id', flat=True))
         teacher_groups = StudyGroup.objects.all().order_by('name')
     elif user.role == 'teacher':
-        group_ids = list(
-            TeachingAssignment.objects.filter(teacher=user, is_active=True)
-            .values_list('group_id', flat=True).distinct()
-        )
         teacher_groups = StudyGroup.objects.filter(id__in=group_ids).order_by('name')
     else:  # student
-        group_ids = [user.group_id] if user.group_id else []
         teacher_groups = None
 
-    # Загальні пости + пости для дозволених груп
-    posts = Post.objects.filter(
-        Q(post_type='general') | Q(group_id__in=group_ids)
-    ).select_related('author', 'group').prefetch_related(
-        Prefetch('comments', queryset=Comment.objects.select_related('author').order_by('created_at'))
-    ).order_by('-created_at')
-
-    # Фільтрація за вкладкою
     tab = request.GET.get('tab', 'all')
-    if tab == 'general':
-        posts = posts.filter(post_type='general')
-    elif tab == 'group' and user.role == 'student':
-        posts = posts.filter(post_type='group', group_id=user.group_id)
-    elif tab.startswith('group_') and user.role in ('teacher', 'admin'):
-        try:
-            gid = int(tab.split('_', 1)[1])
-            posts = posts.filter(post_type='group', group_id=gid)
-        except (ValueError, IndexError):
-            pass
+    page = get_feed_page(feed_queryset(user, group_ids, tab))
 
     context = {
-        'posts': posts,
+        'posts': page['posts'],
+        'next_cursor': page['next_cursor'],
         'teacher_groups': teacher_groups,
         'group_ids': group_ids,
         'active_tab': tab,
@@ -2441,6 +2536,56 @@ def news_feed_view(request: HttpRequest) -> HttpResponse:
     return render(request, 'news_feed.html', context)
 
 
+@login_required
+def api_news_feed_page(request: HttpRequest) -> JsonResponse:
+    """Наступна сторінка стрічки (?tab=&cursor=) як HTML-фрагмент карток."""
+    from django.template.loader import render_to_string
+    from main.services.news_service import InvalidCursor, feed_group_ids, feed_queryset, get_feed_page
+
+    user = request.user
+    try:
+        page = get_feed_page(
+            feed_queryset(user, feed_group_ids(user), request.GET.get('tab', 'all')),
+            cursor=request.GET.get('cursor') or None,
+        )
+    except InvalidCursor:
+        return JsonResponse({'error': 'Некоректний курсор'}, status=400)
+    html = ''.join(
+        render_to_string('news_post_card.html', {'post': post}, request=request) for post in page['posts']
+    )
+    return JsonResponse({'html': html, 'next_cursor': page['next_cursor']})
+
+
+@login_required
+def api_news_post_comments(request: HttpRequest, pk: int) -> JsonResponse:
+    """Коментарі допису після курсора ?after= (хронологічно)."""
+    from django.utils import timezone
+    from main.services.news_service import InvalidCursor, can_view_post, get_comments_page
+
+    post = get_object_or_404(Post, id=pk)
+    if not can_view_post(request.user, post):
+        return JsonResponse({'error': "Немає доступу."}, status=403)
+    try:
+        page = get_comments_page(post, cursor=request.GET.get('after') or None)
+    except InvalidCursor:
+        return JsonResponse({'error': 'Некоректний курсор'}, status=400)
+    user = request.user
+    return JsonResponse({
+        'comments': [
+            {
+                'id': c.id,
+                'author': c.author.full_name,
+                'author_role': c.author.role,
+                'content': c.content,
+                'created_at': timezone.localtime(c.created_at).strftime('%d.%m %H:%M'),
+                'can_delete': c.author_id == user.id or user.role == 'admin',
+            }
+            for c in page['comments']
+        ],
+        'next_cursor': page['next_cursor'],
+    })
+
+
 @login_required
 @require_POST
 def api_news_create_post(request: HttpRequest) -> JsonResponse:
@@ -2469,42 +2614,19 @@ def api_news_create_post(request: HttpRequest) -> JsonResponse:
     else:
         group = None
 
-    post = Post.objects.create(
-        author=request.user,
-        post_type=post_type,
-        group=group,
-        title=title,
-        content=content,
-    )
+    from main.services.notification_service import broadcast_post
 
-    # --- Сповіщення про нову публікацію ---
     role_label = "Адміністратор" if request.user.role == 'admin' else "Викладач"
-    author_label = f"{request.user.full_name} ({role_label})"
-    notif_title = post.title or content[:60]
-    if post_type == 'general':
-        recipients = list(
-            User.objects.filter(role__in=['student', 'teacher']).exclude(id=request.user.id)
-        )
-    else:
-        student_recips = list(User.objects.filter(role='student', group=group))
-        teacher_recips = list(
-            User.objects.filter(
-                role='teacher',
-                teachingassignment__group=group,
-                teachingassignment__is_active=True,
-            ).exclude(id=request.user.id).distinct()
-        )
-        recipients = student_recips + teacher_recips
-    Notification.objects.bulk_create([
-        Notification(
-            recipient=u,
-            notif_type='news',
-            title=f"Нова публікація від {author_label}",
-            message=notif_title,
-            post=post,
+    with transaction.atomic():
+        post = Post.objects.create(
+            author=request.user,
+            post_type=post_type,
+            group=group,
+            title=title,
+            content=content,
         )
-        for u in recipients
-    ])
+        # --- Сповіщення про нову публікацію: один запис, аудиторія — при читанні ---
+        broadcast_post(post, author_label=f"{request.user.full_name} ({role_label})")
 
     return JsonResponse({
         'id': post.id,
@@ -2533,25 +2655,27 @@ def api_news_create_comment(request: HttpRequest) -> JsonResponse:
         if post.post_type == 'group' and post.group_id != request.user.group_id:
             return JsonResponse({'error': "Немає доступу."}, status=403)
 
-    comment = Comment.objects.create(
-        post=post,
-        author=request.user,
-        content=content,
-    )
+    from main.services.outbox_service import enqueue_notification
 
-    # --- Сповіщення автору допису про новий коментар ---
-    if post.author != request.user:
-        _role_labels = {'admin': 'Адміністратор', 'teacher': 'Викладач', 'student': 'Студент'}
-        _role_label = _role_labels.get(request.user.role, '')
-        post_label = post.title or post.content[:40]
-        Notification.objects.create(
-            recipient=post.author,
-            notif_type='comment',
-            title=f"{request.user.full_name} ({_role_label}) прокоментував(ла) вашу публікацію",
-            message=f'"{post_label}": {content[:80]}',
+    with transaction.atomic():
+        comment = Comment.objects.create(
             post=post,
+            author=request.user,
+            content=content,
         )
 
+        # --- Сповіщення автору допису про новий коментар (через чергу) ---
+        if post.author_id != request.user.id:
+            _role_labels = {'admin': 'Адміністратор', 'teacher': 'Викладач', 'student': 'Студент'}
+            _role_label = _role_labels.get(request.user.role, '')
+            post_label = post.title or post.content[:40]
+            enqueue_notification(
+                post.author_id, 'comment',
+                title=f"{request.user.full_name} ({_role_label}) прокоментував(ла) вашу публікацію",
+                message=f'"{post_label}": {content[:80]}',
+                post_id=post.id,
+            )
+
     return JsonResponse({
         'id': comment.id,
         'author': comment.author.full_name,
@@ -2587,42 +2711,55 @@ def api_news_delete_comment(request: HttpRequest, pk: int) -> JsonResponse:
 
 @login_required
 def api_notifications_list(request: HttpRequest) -> JsonResponse:
-    """Повертає останні 30 сповіщень поточного користувача."""
-    notifications = (
-        Notification.objects
-        .filter(recipient=request.user)
-        .order_by('-created_at')[:30]
-    )
-    unread_count = Notification.objects.filter(recipient=request.user, is_read=False).count()
+    """Повертає останні 30 сповіщень поточного користувача (особисті та масові)."""
+    from main.services.notification_service import get_notifications
 
-    TYPE_ICONS = {
-        'news':    '📢',
-        'comment': '💬',
-        'grade':   '📊',
-        'absence': '⚠️',
-    }
+    return JsonResponse(get_notifications(request.user))
 
-    data = [
-        {
-            'id':         n.id,
-            'type':       n.notif_type,
-            'icon':       TYPE_ICONS.get(n.notif_type, '🔔'),
-            'title':      n.title,
-            'message':    n.message,
-            'is_read':    n.is_read,
-            'created_at': n.created_at.strftime('%d.%m.%Y %H:%M'),
-            'post_id':    n.post_id,
-        }
-        for n in notifications
-    ]
-    return JsonResponse({'notifications': data, 'unread_count': unread_count})
+
+@login_required
+def api_notifications_unread(request: HttpRequest) -> JsonResponse:
+    """
+    Кількість непрочитаних для опитування дзвіночком (режим без SSE).
+
+    ?token= — значення з попередньої відповіді: поки нічого не змінилось,
+    відповідь береться з кешу без запитів до БД.
+    """
+    from main.services.notification_service import poll_unread
+
+    return JsonResponse(poll_unread(request.user, request.GET.get('token', '')))
+
+
+@login_required
+async def api_notifications_stream(request: HttpRequest) -> HttpResponse:
+    """
+    Потік SSE з кількістю непрочитаних: подія при підключенні та при кожній
+    зміні. Очікування — на читанні версії в кеші, без запитів до БД.
+
+    Доступний лише з NOTIFICATIONS_SSE (ASGI-сервер): під WSGI Django
+    вичитує асинхронний потік повністю до відправки, займаючи робочий процес.
+    """
+    from django.conf import settings
+    from django.http import Http404, StreamingHttpResponse
+    from main.services.notification_service import notification_events
+
+    if not settings.NOTIFICATIONS_SSE:
+        raise Http404
+    user = await request.auser()
+    response = StreamingHttpResponse(notification_events(user), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'  # nginx не повинен буферизувати потік
+    return response
 
 
 @login_required
 @require_POST
 def api_notifications_mark_read(request: HttpRequest, pk: int) -> JsonResponse:
-    """Позначає одне сповіщення як прочитане."""
-    Notification.objects.filter(id=pk, recipient=request.user).update(is_read=True)
+    """Позначає одне сповіщення як прочитане (?kind=broadcast — масове)."""
+    from main.services.notification_service import mark_read
+
+    kind = 'broadcast' if request.GET.get('kind') == 'broadcast' else 'personal'
+    mark_read(request.user, pk, kind)
     return JsonResponse({'ok': True})
 
 
@@ -2630,7 +2767,9 @@ def api_notifications_mark_read(request: HttpRequest, pk: int) -> JsonResponse:
 @require_POST
 def api_notifications_mark_all_read(request: HttpRequest) -> JsonResponse:
     """Позначає всі сповіщення поточного користувача як прочитані."""
-    Notification.objects.filter(recipient=request.user, is_read=False).update(is_read=True)
+    from main.services.notification_service import mark_all_read
+
+    mark_all_read(request.user)
     return JsonResponse({'ok': True})
 
 
@@ -74,6 +74,7 @@ TEMPLATES = [
                 'django.template.context_processors.request',
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
+                'main.context_processors.notifications',
             ],
         },
     },
@@ -100,6 +101,27 @@ DATABASES = {
     }
 }
 
+# Спільний кеш усіх процесів (веб-воркери, run_outbox_worker): кешовані
+# дашборди, розклад і лічильники скидаються сигналами в процесі, що змінив
+# дані, тож кеш у пам'яті процесу (LocMem) лишав би інші процеси зі старими
+# значеннями. За замовчуванням — таблиця в БД (python manage.py createcachetable),
+# з REDIS_URL — Redis (потрібен пакет redis).
+if os.getenv('REDIS_URL'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.getenv('REDIS_URL'),
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+            'LOCATION': 'django_cache',
+            'OPTIONS': {'MAX_ENTRIES': 50000},
+        }
+    }
+
 # Hardware integration
 CARD_SCAN_API_KEY = os.getenv('CARD_SCAN_API_KEY', '')
 
@@ -108,6 +130,24 @@ TWILIO_ACCOUNT_SID  = os.getenv('TWILIO_ACCOUNT_SID', '')
 TWILIO_AUTH_TOKEN   = os.getenv('TWILIO_AUTH_TOKEN', '')
 TWILIO_FROM_NUMBER  = os.getenv('TWILIO_FROM_NUMBER', '')  # Наприклад: +14155552671
 
+# Потік SSE для лічильника сповіщень. Вмикати лише під ASGI-сервером
+# (uvicorn/daphne з mybosco_project.asgi): під WSGI потік займає робочий
+# процес і віддає події лише після закриття. Без нього — коротке опитування.
+NOTIFICATIONS_SSE = os.getenv('NOTIFICATIONS_SSE', 'False') == 'True'
+
+# Початок семестру (YYYY-MM-DD): тиждень, що його містить, — чисельник.
+# Єдина точка відліку чисельника/знаменника для materialize_lessons.
+SEMESTER_START = os.getenv('SEMESTER_START', '')
+
+# Зберігання сповіщень (днів) для python manage.py prune_notifications;
+# непрочитані зберігаються вдвічі довше. Невказані типи — значення за замовчуванням.
+NOTIFICATION_RETENTION_DAYS = {
+    'news':    90,
+    'comment': 180,
+    'grade':   365,
+    'absence': 365,
+}
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators